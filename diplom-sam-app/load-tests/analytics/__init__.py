@@ -0,0 +1,49 @@
+"""
+Load test analytics
+Shared parsing and aggregation layer used by the visualize-* scripts.
+Exports are imported on first use, so `import analytics` (and the headless
+`summary` command) does not pay for pandas until something needs it
+"""
+
+import importlib
+
+# Exported name: defining submodule
+_EXPORTS = {
+    'LatencySketch': 'sketch',
+    'LoadTestResults': 'results',
+    'RunAggregates': 'ingest',
+    'RunCache': 'cache',
+    'Timeline': 'timeline',
+    'SCENARIOS': 'results',
+    'frame_sketches': 'sketch',
+    'group_sketches': 'sketch',
+    'ingest_k6_json': 'ingest',
+    'load_aggregates': 'loaders',
+    'load_csv': 'loaders',
+    'load_json': 'loaders',
+    'load_results': 'results',
+    'load_run': 'loaders',
+    'open_cache': 'cache',
+    'TAG_KEYS': 'tags',
+    'ROLES': 'tags',
+    'OTHER': 'tags',
+    'add_tag_columns': 'tags',
+    'build_timeline': 'timeline',
+    'metric_groups': 'tags',
+    'split_tags': 'tags',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
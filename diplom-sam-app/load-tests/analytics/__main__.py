@@ -0,0 +1,10 @@
+import sys
+
+if sys.argv[1:2] == ['summary']:
+    # Headless fast path: skips the CLI's pandas-backed imports
+    from .summary import main
+    sys.exit(main(sys.argv[2:]))
+
+from .cli import main
+
+sys.exit(main())
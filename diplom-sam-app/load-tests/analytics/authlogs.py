@@ -0,0 +1,197 @@
+"""
+Authorizer cache analysis from CloudWatch logs
+authorizer.ts logs every lookup in its three per-container caches: STS
+credentials ([CACHE HIT]/[CACHE MISS] per tenant:role), tenant details
+([TENANT CACHE ...]) and JWT verifiers ([VERIFIER CACHE ...]), plus the
+AssumeRole time ([STS LATENCY]). The events are matched with precompiled
+regexes while streaming, joined to the invocation's REPORT duration and
+summarised as hit ratios per tenant/role, miss causes and miss cost
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .logs import iter_log_events, report_metrics
+
+# Mirrors of the constants in authorizer.ts
+CREDENTIALS_TTL_MS = 12 * 60 * 1000
+TENANT_TTL_MS = 5 * 60 * 1000
+MAX_CACHE_SIZE = 1000
+
+CACHE_TTLS = {'credentials': CREDENTIALS_TTL_MS, 'tenant': TENANT_TTL_MS, 'verifier': None}
+
+DEFAULT_FREQ = '5min'
+
+_PATTERNS = (
+    ('credentials', 'hit', re.compile(r'\[CACHE HIT\] Using cached credentials for (\S+)')),
+    ('credentials', 'miss', re.compile(r'\[CACHE MISS\] Fetching new credentials for (\S+)')),
+    ('tenant', 'hit', re.compile(r'\[TENANT CACHE HIT\] (\S+)')),
+    ('tenant', 'miss', re.compile(r'\[TENANT CACHE MISS\] (\S+)')),
+    ('verifier', 'hit', re.compile(r'\[VERIFIER CACHE HIT\] (\S+)')),
+    ('verifier', 'miss', re.compile(r'\[VERIFIER CACHE MISS\] Creating new verifier for (\S+)')),
+)
+_CACHE_SIZE = re.compile(r'\[CACHE (?:SET|CLEANUP)\].*?[Cc]ache size: (\d+)')
+_STS_LATENCY = re.compile(r'\[STS LATENCY\] (\S+) (\d+(?:\.\d+)?)ms')
+
+# Cheap substring filter applied before any regex
+_MARKERS = ('CACHE', 'STS LATENCY', 'REPORT RequestId', 'platform.report')
+
+
+def _split_key(cache, key):
+    """(tenant, role) of a cache key"""
+    if cache == 'credentials':
+        tenant, _, role = key.rpartition(':')
+        return tenant, role
+    if cache == 'tenant':
+        return key, None
+    return None, None
+
+
+def parse_auth_logs(filenames):
+    """(lookups, invocations) frames from authorizer log files
+
+    lookups: time, stream, request_id, cache, outcome, key, tenant, role
+    invocations: request_id, stream, duration_ms, init_ms, sts_ms, cache_size
+    """
+    lookups = []
+    invocations = {}
+
+    def invocation(event):
+        return invocations.setdefault(event.request_id, {
+            'request_id': event.request_id, 'stream': event.stream, 'time': event.time,
+            'duration_ms': np.nan, 'init_ms': np.nan, 'sts_ms': np.nan, 'cache_size': np.nan})
+
+    for event in iter_log_events(filenames, _MARKERS):
+        message = event.message
+        report = report_metrics(event)
+        if report is not None:
+            if event.request_id and 'duration_ms' in report:
+                row = invocation(event)
+                row['duration_ms'] = report['duration_ms']
+                row['init_ms'] = report.get('init_ms', np.nan)
+            continue
+        for cache, outcome, pattern in _PATTERNS:
+            match = pattern.search(message)
+            if match:
+                tenant, role = _split_key(cache, match.group(1))
+                lookups.append((event.time, event.stream, event.request_id, cache, outcome,
+                                match.group(1), tenant, role))
+                if event.request_id:
+                    invocation(event)
+                break
+        else:
+            match = _STS_LATENCY.search(message)
+            if match and event.request_id:
+                invocation(event)['sts_ms'] = float(match.group(2))
+                continue
+            match = _CACHE_SIZE.search(message)
+            if match and event.request_id:
+                invocation(event)['cache_size'] = float(match.group(1))
+
+    lookups = pd.DataFrame(lookups, columns=['time', 'stream', 'request_id', 'cache', 'outcome',
+                                             'key', 'tenant', 'role'])
+    lookups['datetime'] = pd.to_datetime(lookups['time'], unit='ms')
+    invocations = pd.DataFrame(list(invocations.values()),
+                               columns=['request_id', 'stream', 'time', 'duration_ms', 'init_ms',
+                                        'sts_ms', 'cache_size'])
+    return lookups, invocations
+
+
+def classify_misses(lookups):
+    """Add a `cause` column to the misses: cold, expired or evicted
+
+    Caches live per execution environment (log stream). The first miss of a
+    key in a stream is `cold`; one at least a TTL after the key's previous
+    miss in that stream is `expired`; anything else means the entry was
+    dropped early (`evicted`, e.g. MAX_CACHE_SIZE cleanup).
+    """
+    lookups = lookups.sort_values('time', kind='stable').copy()
+    misses = lookups['outcome'] == 'miss'
+    keys = ['stream', 'cache', 'key']
+    # Previous miss of the same key in the same container (when the entry was set)
+    last_miss = lookups[misses].groupby(keys, dropna=False)['time'].shift()
+    since = lookups.loc[misses, 'time'] - last_miss
+    ttl = lookups.loc[misses, 'cache'].map(CACHE_TTLS).astype(float)
+
+    # A miss with a previous miss but no TTL (verifiers) means the entry was dropped
+    cause = np.where(last_miss.isna(), 'cold', np.where(since >= ttl, 'expired', 'evicted'))
+    lookups['cause'] = None
+    lookups.loc[misses, 'cause'] = cause
+    return lookups
+
+
+def hit_ratios(lookups, by=('cache', 'tenant', 'role')):
+    """Lookups, hits, hit ratio and miss causes per group"""
+    lookups = classify_misses(lookups) if 'cause' not in lookups else lookups
+    counts = pd.DataFrame({'lookups': 1, 'hits': (lookups['outcome'] == 'hit').astype(int)},
+                          index=lookups.index)
+    for cause in ('cold', 'expired', 'evicted'):
+        counts[f'miss_{cause}'] = (lookups['cause'] == cause).astype(int)
+    table = counts.groupby([lookups[column] for column in by], dropna=False).sum()
+    table['hit_ratio'] = table['hits'] / table['lookups']
+    return table.reset_index()
+
+
+def hit_ratio_timeline(lookups, freq=DEFAULT_FREQ, cache='credentials', by=('tenant', 'role')):
+    """Hit ratio per time bucket (rows) and group (columns) for one cache"""
+    data = lookups[lookups['cache'] == cache]
+    if data.empty:
+        return pd.DataFrame()
+    keys = [data[column].astype(str).rename(column) for column in by]
+    hits = (data['outcome'] == 'hit').astype(float)
+    grouped = hits.groupby([data['datetime'].dt.floor(freq).rename('time')] + keys)
+    return grouped.mean().unstack(list(by))
+
+
+def miss_costs(lookups, invocations):
+    """Warm invocation duration with and without a miss, per cache
+
+    Cold starts are left out so the difference is the cache miss itself;
+    for the credentials cache the directly measured AssumeRole time is
+    reported next to it.
+    """
+    warm = invocations[invocations['init_ms'].isna() & invocations['duration_ms'].notna()]
+    rows = []
+    for cache in ('credentials', 'tenant', 'verifier'):
+        missed = set(lookups.loc[(lookups['cache'] == cache) & (lookups['outcome'] == 'miss'),
+                                 'request_id'])
+        looked_up = set(lookups.loc[lookups['cache'] == cache, 'request_id'])
+        in_cache = warm[warm['request_id'].isin(looked_up)]
+        miss = in_cache[in_cache['request_id'].isin(missed)]['duration_ms']
+        hit = in_cache[~in_cache['request_id'].isin(missed)]['duration_ms']
+        row = {'cache': cache, 'warm_hits': len(hit), 'warm_misses': len(miss),
+               'hit_p50_ms': hit.median() if len(hit) else np.nan,
+               'miss_p50_ms': miss.median() if len(miss) else np.nan}
+        row['miss_penalty_ms'] = row['miss_p50_ms'] - row['hit_p50_ms']
+        if cache == 'credentials':
+            sts = invocations['sts_ms'].dropna()
+            row['sts_p50_ms'] = sts.median() if len(sts) else np.nan
+            row['sts_p95_ms'] = sts.quantile(0.95) if len(sts) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def sizing_hints(lookups, invocations):
+    """Evidence for MAX_CACHE_SIZE and the TTLs as text lines"""
+    lines = []
+    credentials = lookups[lookups['cache'] == 'credentials']
+    if not credentials.empty:
+        per_stream = credentials.groupby('stream', dropna=False)['key'].nunique()
+        peak = invocations['cache_size'].max()
+        lines.append(f"🔑 {credentials['key'].nunique()} tenant:role keys, at most "
+                     f"{per_stream.max()} per container (MAX_CACHE_SIZE {MAX_CACHE_SIZE}"
+                     f"{f', peak logged size {peak:.0f}' if not np.isnan(peak) else ''})")
+    classified = classify_misses(lookups)
+    for cache, ttl in CACHE_TTLS.items():
+        misses = classified[(classified['cache'] == cache) & (classified['outcome'] == 'miss')]
+        if misses.empty:
+            continue
+        counts = misses['cause'].value_counts()
+        share = counts.get('expired', 0) / len(misses) * 100
+        ttl_text = f"TTL {ttl / 60000:.0f} min" if ttl else 'no TTL'
+        lines.append(f"⏱️  {cache}: {len(misses)} misses - {counts.get('cold', 0)} cold, "
+                     f"{counts.get('expired', 0)} expired ({share:.0f}%, {ttl_text}), "
+                     f"{counts.get('evicted', 0)} evicted")
+    return lines
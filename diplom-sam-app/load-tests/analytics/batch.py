@@ -0,0 +1,229 @@
+"""
+Cross-run aggregation over many k6 result files
+Each file is reduced to a RunBatch in a worker process: pooled request,
+throttle and error counts plus a latency sketch per scenario role, a
+fixed-bin histogram of the run's throttle rate and a sketch of its p95.
+Partial batches are merged pairwise, level by level (a tree reduction), in
+the same pool; raw samples never leave the worker that parsed them
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .results import load_results
+from .sketch import LatencySketch
+
+# Throttle rate histogram: 0.5 percentage point bins over 0..100 %
+THROTTLE_BINS = np.linspace(0.0, 100.0, 201)
+BATCH_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def expand_patterns(patterns):
+    """Sorted, de-duplicated files matching glob patterns (or plain paths)"""
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        files.update(match for match in matches if os.path.isfile(match))
+        if not matches and os.path.isfile(pattern):
+            files.add(pattern)
+    return sorted(files)
+
+
+class RoleAggregate:
+    """Counts and cross-run distributions of one scenario role"""
+
+    __slots__ = ('runs', 'requests', 'throttled', 'errors', 'latency', 'run_p95',
+                 'throttle_hist', 'throttle_min', 'throttle_max')
+
+    def __init__(self):
+        self.runs = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency = LatencySketch()
+        self.run_p95 = LatencySketch()
+        self.throttle_hist = np.zeros(len(THROTTLE_BINS) - 1, dtype=np.int64)
+        self.throttle_min = float('inf')
+        self.throttle_max = float('-inf')
+
+    def add_run(self, tenant):
+        self.runs += 1
+        self.requests += tenant.requests
+        self.throttled += tenant.throttled
+        self.errors += tenant.errors
+        self.latency.merge(tenant.latency)
+        self.run_p95.add(tenant.latency.quantile(0.95))
+        bin_index = np.searchsorted(THROTTLE_BINS, tenant.throttle_rate, side='right') - 1
+        self.throttle_hist[min(bin_index, len(self.throttle_hist) - 1)] += 1
+        self.throttle_min = min(self.throttle_min, tenant.throttle_rate)
+        self.throttle_max = max(self.throttle_max, tenant.throttle_rate)
+
+    def merge(self, other):
+        self.runs += other.runs
+        self.requests += other.requests
+        self.throttled += other.throttled
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+        self.run_p95.merge(other.run_p95)
+        self.throttle_hist += other.throttle_hist
+        self.throttle_min = min(self.throttle_min, other.throttle_min)
+        self.throttle_max = max(self.throttle_max, other.throttle_max)
+        return self
+
+    def throttle_quantiles(self, qs=BATCH_QUANTILES):
+        """Per-run throttle rate (%) quantiles: upper bin edge, clamped to the exact min/max"""
+        if not self.runs:
+            return np.full(len(qs), np.nan)
+        cumulative = np.cumsum(self.throttle_hist)
+        index = np.searchsorted(cumulative, np.asarray(qs) * (self.runs - 1), side='right')
+        edges = THROTTLE_BINS[np.minimum(index, len(self.throttle_hist) - 1) + 1]
+        return np.clip(edges, self.throttle_min, self.throttle_max)
+
+
+class RunBatch:
+    """Mergeable aggregate of any number of runs"""
+
+    def __init__(self):
+        self.roles = {}
+        self.operations = {}
+        self.rows = []
+        self.failed = []
+
+    @classmethod
+    def from_file(cls, filename, use_cache=True):
+        """Batch of a single k6 result file (runs in a worker)"""
+        batch = cls()
+        try:
+            results = load_results(filename, use_cache)
+        except (OSError, ValueError) as e:
+            batch.failed.append((filename, str(e)))
+            return batch
+        for result in results:
+            for tenant in (result.noisy, result.victim):
+                if not tenant.requests:
+                    continue
+                batch.roles.setdefault((result.key, tenant.role), RoleAggregate()).add_run(tenant)
+                batch.rows.append({'file': filename, 'scenario': result.key, 'role': tenant.role,
+                                   'tenant': tenant.name, 'tier': tenant.tier,
+                                   'requests': tenant.requests,
+                                   'throttle_rate': tenant.throttle_rate,
+                                   'p95': tenant.latency.quantile(0.95)})
+        for name, sketch in results.operations.items():
+            batch.operations.setdefault(name, LatencySketch()).merge(sketch)
+        return batch
+
+    def merge(self, other):
+        for key, role in other.roles.items():
+            self.roles.setdefault(key, RoleAggregate()).merge(role)
+        for name, sketch in other.operations.items():
+            self.operations.setdefault(name, LatencySketch()).merge(sketch)
+        self.rows.extend(other.rows)
+        self.failed.extend(other.failed)
+        return self
+
+    @property
+    def files(self):
+        return len({row['file'] for row in self.rows})
+
+    def table(self):
+        """One row per scenario role: pooled counts and cross-run quantiles"""
+        rows = []
+        for (scenario, role), agg in sorted(self.roles.items()):
+            throttle = agg.throttle_quantiles()
+            p95 = agg.run_p95.quantiles(BATCH_QUANTILES)
+            rows.append({'scenario': scenario, 'role': role, 'runs': agg.runs,
+                         'requests': agg.requests,
+                         'throttle_rate': agg.throttled / agg.requests * 100 if agg.requests else 0.0,
+                         'throttle_p50': throttle[0], 'throttle_p90': throttle[1],
+                         'throttle_p99': throttle[2],
+                         'pooled_p95': agg.latency.quantile(0.95),
+                         'p95_p50': p95[0], 'p95_p90': p95[1], 'p95_p99': p95[2]})
+        return pd.DataFrame(rows)
+
+
+def _merge_pair(left, right):
+    return left.merge(right)
+
+
+def tree_reduce(batches, pool=None):
+    """Merge batches pairwise, level by level, in `pool` when given"""
+    batches = list(batches)
+    if not batches:
+        return RunBatch()
+    while len(batches) > 1:
+        pairs = list(zip(batches[0::2], batches[1::2]))
+        odd = batches[-1:] if len(batches) % 2 else []
+        if pool is not None:
+            merged = [future.result() for future in
+                      [pool.submit(_merge_pair, left, right) for left, right in pairs]]
+        else:
+            merged = [left.merge(right) for left, right in pairs]
+        batches = merged + odd
+    return batches[0]
+
+
+def aggregate_files(files, jobs=None, use_cache=True):
+    """(RunBatch, seconds) of all files, parsed and reduced in a process pool"""
+    start = time.perf_counter()
+    jobs = jobs or min(len(files), os.cpu_count() or 1)
+    if jobs <= 1:
+        batch = tree_reduce(RunBatch.from_file(name, use_cache) for name in files)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            partials = list(pool.map(RunBatch.from_file, files, [use_cache] * len(files)))
+            batch = tree_reduce(partials, pool)
+    return batch, time.perf_counter() - start
+
+
+def format_batch(table):
+    """Human-readable cross-run table"""
+    lines = [f"{'Scenario':<18}{'Role':<8}{'Runs':>6}{'Requests':>11}{'429 %':>8}"
+             f"{'429 p50':>9}{'p90':>7}{'p99':>7}{'Pooled p95':>12}{'p95 p50':>9}{'p90':>8}"
+             f"{'p99':>8}"]
+    for row in table.to_dict('records'):
+        lines.append(f"{row['scenario']:<18}{row['role']:<8}{row['runs']:>6}{row['requests']:>11,}"
+                     f"{row['throttle_rate']:>7.1f}%{row['throttle_p50']:>8.1f}%"
+                     f"{row['throttle_p90']:>6.1f}%{row['throttle_p99']:>6.1f}%"
+                     f"{row['pooled_p95']:>10.0f}ms{row['p95_p50']:>7.0f}ms"
+                     f"{row['p95_p90']:>6.0f}ms{row['p95_p99']:>6.0f}ms")
+    return lines
+
+
+def create_batch_chart(batch, output_file='batch_runs.png'):
+    """Per-run throttle rate histograms and victim p95 box plots across runs"""
+    import matplotlib.pyplot as plt
+
+    keys = sorted(batch.roles)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    fig.suptitle(f'Cross-Run Distributions over {batch.files} Runs', fontsize=16,
+                 fontweight='bold')
+    centers = (THROTTLE_BINS[:-1] + THROTTLE_BINS[1:]) / 2
+    for scenario, role in keys:
+        hist = batch.roles[(scenario, role)].throttle_hist
+        last = max(int(np.flatnonzero(hist).max()) + 2 if hist.any() else 2, 2)
+        ax1.step(centers[:last], hist[:last], where='mid', label=f'{scenario} {role}',
+                 linestyle='-' if role == 'victim' else ':')
+    ax1.axvline(5.0, color='gray', linestyle='--', label='isolation threshold 5%')
+    ax1.set_xlabel('Throttle rate per run (%)')
+    ax1.set_ylabel('Runs')
+    ax1.set_title('Throttle Rate Distribution')
+    ax1.grid(alpha=0.3)
+    ax1.legend(fontsize=8)
+
+    victims = [key for key in keys if key[1] == 'victim']
+    stats = [batch.roles[key].run_p95.bxp_stats(key[0]) for key in victims]
+    if stats:
+        ax2.bxp(stats, showmeans=True)
+    ax2.set_ylabel('Victim p95 latency per run (ms)')
+    ax2.set_title('Victim p95 across Runs')
+    ax2.grid(alpha=0.3, axis='y')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {output_file}")
+    return output_file
@@ -0,0 +1,292 @@
+"""
+Benchmark suite for the analytics pipeline
+Synthetic k6 runs of a given size (analytics.synthetic) are generated once
+and kept in a data directory. Every stage (CSV/NDJSON parsing, streaming
+ingest, the run cache, timelines, sketches, the results model and the chart
+builders) then runs in a fresh spawned process, which reports its wall time
+and the growth of its peak RSS over the state before the timed call. Results
+are stored per run in SQLite next to the run history and compared with the
+median of the previous runs of the same size, so the tooling's own
+regressions show up like the API's
+"""
+
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from . import synthetic
+from .history import current_git_sha
+from .profiling import peak_rss_mb, reset_peak_rss
+
+_CACHE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+BENCH_DB = os.environ.get('K6_BENCH_DB') or os.path.join(_CACHE_ROOT, 'k6-bench.sqlite')
+BENCH_DATA_DIR = os.environ.get('K6_BENCH_DATA') or os.path.join(_CACHE_ROOT, 'bench-data')
+
+DEFAULT_SIZES = ('1M',)
+DEFAULT_SEED = 0
+
+# A stage is flagged when it is this much slower (or heavier) than the
+# median of the previous BASELINE_RUNS runs, and by at least MIN_SECONDS
+MAX_SLOWDOWN = 0.25
+MIN_SECONDS = 0.05
+BASELINE_RUNS = 5
+GENERATOR_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bench_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    git_sha TEXT,
+    label TEXT,
+    versions TEXT
+);
+CREATE TABLE IF NOT EXISTS bench_stages (
+    run_id INTEGER NOT NULL REFERENCES bench_runs(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    bytes INTEGER,
+    seconds REAL NOT NULL,
+    peak_rss_mb REAL,
+    rss_growth_mb REAL,
+    PRIMARY KEY (run_id, stage, rows)
+);
+"""
+
+
+# ---------- stages (run inside the spawned worker) ----------
+
+def _csv_frame(paths):
+    from .loaders import load_csv
+    return load_csv(paths['csv'])
+
+
+def _stage_csv_parse(paths):
+    from .loaders import parse_csv
+    return lambda: parse_csv(paths['csv'])
+
+
+def _stage_csv_cache_read(paths):
+    from .loaders import load_csv
+    load_csv(paths['csv'])
+    return lambda: load_csv(paths['csv'])
+
+
+def _stage_json_parse(paths):
+    from .loaders import parse_json
+    return lambda: parse_json(paths['json'])
+
+
+def _stage_json_ingest(paths):
+    from .ingest import ingest_k6_json
+    return lambda: ingest_k6_json(paths['json'])
+
+
+def _stage_timeline(paths):
+    from .timeline import build_timeline
+    frame = _csv_frame(paths)
+    return lambda: build_timeline(frame, by=('tenant', 'role'))
+
+
+def _stage_sketches(paths):
+    from .sketch import frame_sketches
+    frame = _csv_frame(paths)
+    return lambda: frame_sketches(frame)
+
+
+def _stage_results(paths):
+    from .results import LoadTestResults
+    frame = _csv_frame(paths)
+    return lambda: LoadTestResults.from_frame(frame)
+
+
+def _render_stage(figure):
+    def stage(paths):
+        from . import figures
+        data = figures.FigureData(paths['inputs'], paths['outputs']).load()
+        figures.init_worker(data)
+        figures.load_script(figures.FIGURES[figure].script)
+        return lambda: figures.render_figure(figure)
+    return stage
+
+
+# name: (input format, setup returning the timed call)
+STAGES = {
+    'csv-parse': ('csv', _stage_csv_parse),
+    'csv-cache-read': ('csv', _stage_csv_cache_read),
+    'json-parse': ('json', _stage_json_parse),
+    'json-ingest': ('json', _stage_json_ingest),
+    'timeline': ('csv', _stage_timeline),
+    'sketches': ('csv', _stage_sketches),
+    'results-model': ('csv', _stage_results),
+    'render:rate-limiting': ('csv', _render_stage('rate-limiting')),
+    'render:timeline': ('csv', _render_stage('timeline')),
+    'render:noisy-neighbor-charts': ('csv', _render_stage('noisy-neighbor-charts')),
+    'render:summary': ('json', _render_stage('summary')),
+}
+
+
+def run_stage(name, paths):
+    """Time one stage in the current process; returns (seconds, peak RSS MB, RSS growth MB)"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    call = STAGES[name][1](paths)
+    reset_peak_rss()
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    call()
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    return seconds, peak, peak - before
+
+
+# ---------- driver ----------
+
+_WRITERS = {'csv': synthetic.write_csv, 'json': synthetic.write_json}
+
+
+def data_files(rows, data_dir=BENCH_DATA_DIR, seed=DEFAULT_SEED, formats=('csv', 'json'),
+               progress=print):
+    """{format: path} of the synthetic run with `rows` points, generated on first use"""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {}
+    for fmt in formats:
+        path = os.path.join(data_dir, f'k6-{rows}-s{seed}-v{GENERATOR_VERSION}.{fmt}')
+        if not os.path.exists(path):
+            start = time.perf_counter()
+            tmp = f'{path}.tmp-{os.getpid()}'
+            _WRITERS[fmt](tmp, rows, seed=seed)
+            os.replace(tmp, path)
+            progress(f"🧪 Generated {path} ({os.path.getsize(path) / 1e6:,.0f} MB) "
+                     f"in {time.perf_counter() - start:.1f}s")
+        paths[fmt] = path
+    return paths
+
+
+def _stage_paths(files, workdir):
+    """Inputs laid out as the figure registry expects them"""
+    from .figures import INPUT_FILES
+
+    inputs = os.path.join(workdir, 'inputs')
+    os.makedirs(inputs, exist_ok=True)
+    for name, fmt in (('noisy_frame', 'csv'), ('results', 'json')):
+        target = os.path.join(inputs, INPUT_FILES[name])
+        if fmt in files and not os.path.exists(target):
+            os.symlink(os.path.abspath(files[fmt]), target)
+    return dict(files, inputs=inputs, outputs=os.path.join(workdir, 'outputs'))
+
+
+def run_suite(sizes, stages=None, data_dir=BENCH_DATA_DIR, seed=DEFAULT_SEED, progress=print):
+    """[{stage, rows, bytes, seconds, peak_rss_mb, rss_growth_mb}] for every size and stage
+
+    Each stage runs in its own spawned process with an empty run cache, so
+    no stage profits from the memory or cache of another.
+    """
+    names = list(stages or STAGES)
+    formats = sorted({STAGES[name][0] for name in names})
+    rows = []
+    for size in sizes:
+        files = data_files(size, data_dir, seed, formats, progress)
+        workdir = tempfile.mkdtemp(prefix='k6-bench-')
+        try:
+            paths = _stage_paths(files, workdir)
+            os.makedirs(paths['outputs'], exist_ok=True)
+            for name in names:
+                os.environ['K6_CACHE_DIR'] = os.path.join(workdir, 'cache')
+                shutil.rmtree(os.environ['K6_CACHE_DIR'], ignore_errors=True)
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                    seconds, peak, growth = pool.submit(run_stage, name, paths).result()
+                source = files[STAGES[name][0]]
+                row = {'stage': name, 'rows': size, 'bytes': os.path.getsize(source),
+                       'seconds': seconds, 'peak_rss_mb': peak, 'rss_growth_mb': growth}
+                rows.append(row)
+                progress(f"⏱️  {name:<30}{size:>12,} rows {seconds:8.2f}s  "
+                         f"peak {peak:8.0f} MB (+{growth:.0f})")
+        finally:
+            os.environ.pop('K6_CACHE_DIR', None)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+class BenchStore:
+    """SQLite store of benchmark runs"""
+
+    def __init__(self, path=BENCH_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, rows, git_sha=None, label=None):
+        import numpy
+        import pandas
+
+        versions = f'numpy {numpy.__version__}, pandas {pandas.__version__}'
+        with self.db:
+            cursor = self.db.execute(
+                'INSERT INTO bench_runs (recorded_at, git_sha, label, versions) VALUES (?, ?, ?, ?)',
+                (time.time(), git_sha, label, versions))
+            for row in rows:
+                self.db.execute(
+                    'INSERT INTO bench_stages (run_id, stage, rows, bytes, seconds, peak_rss_mb,'
+                    ' rss_growth_mb) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (cursor.lastrowid, row['stage'], row['rows'], row['bytes'], row['seconds'],
+                     row['peak_rss_mb'], row['rss_growth_mb']))
+        return cursor.lastrowid
+
+    def baseline(self, stage, rows, before_run=None, count=BASELINE_RUNS):
+        """Stage rows of the last `count` runs of the same size (before `before_run`)"""
+        query = ('SELECT s.* FROM bench_stages s JOIN bench_runs r ON r.id = s.run_id'
+                 ' WHERE s.stage = ? AND s.rows = ?')
+        params = [stage, rows]
+        if before_run is not None:
+            query += ' AND r.id < ?'
+            params.append(before_run)
+        query += ' ORDER BY r.id DESC LIMIT ?'
+        params.append(count)
+        return [dict(row) for row in self.db.execute(query, params)]
+
+
+def compare_runs(rows, store, before_run=None):
+    """Rows with baseline medians, change and a regression flag per stage"""
+    compared = []
+    for row in rows:
+        previous = store.baseline(row['stage'], row['rows'], before_run)
+        result = dict(row, base_seconds=None, base_rss_mb=None, change=None, regressed=False)
+        if previous:
+            base = statistics.median(item['seconds'] for item in previous)
+            base_rss = statistics.median(item['peak_rss_mb'] or 0.0 for item in previous)
+            result.update(base_seconds=base, base_rss_mb=base_rss,
+                          change=row['seconds'] / base - 1 if base else None)
+            slower = row['seconds'] > base * (1 + MAX_SLOWDOWN) and \
+                row['seconds'] - base >= MIN_SECONDS
+            heavier = base_rss and row['peak_rss_mb'] > base_rss * (1 + MAX_SLOWDOWN)
+            result['regressed'] = bool(slower or heavier)
+        compared.append(result)
+    return compared
+
+
+def format_bench(compared):
+    """Human-readable stage table with throughput and change vs the baseline"""
+    lines = [f"{'Stage':<30}{'Rows':>12}{'Seconds':>9}{'Rows/s':>12}{'MB/s':>8}"
+             f"{'Peak RSS':>10}{'Growth':>8}{'vs base':>9}"]
+    for row in compared:
+        throughput = row['rows'] / row['seconds'] if row['seconds'] else 0.0
+        mb_per_s = row['bytes'] / 1e6 / row['seconds'] if row['seconds'] else 0.0
+        change = f"{row['change'] * 100:+.0f}%" if row['change'] is not None else 'new'
+        marker = '  ⚠️ regression' if row['regressed'] else ''
+        lines.append(f"{row['stage']:<30}{row['rows']:>12,}{row['seconds']:>9.2f}"
+                     f"{throughput:>12,.0f}{mb_per_s:>8.1f}{row['peak_rss_mb']:>8.0f}MB"
+                     f"{row['rss_growth_mb']:>6.0f}MB{change:>9}{marker}")
+    return lines
+
+
+def record_sha():
+    return current_git_sha(os.path.dirname(os.path.abspath(__file__)))
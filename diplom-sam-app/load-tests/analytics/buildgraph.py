@@ -0,0 +1,191 @@
+"""
+Memoized figure builds
+Every figure gets a build key: the BLAKE2 hash of the chart code (its
+visualize script, the local and analytics modules that script imports, the
+figure registry with the analytics modules its FigureData loaders call, and
+the figure's draw function) together with a fingerprint of the aggregated
+inputs it draws from. Rendered PNGs are stored by key, so a figure whose key
+is unchanged is restored instead of redrawn, and only figures affected by a
+new run are rendered again. Stored outputs are evicted least recently used
+first over a size budget
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import time
+
+from .figures import SCRIPTS_DIR
+
+# Eviction budget for stored figures
+MAX_FIGURE_CACHE_BYTES = 256 * 1024 ** 2
+# 2: the manifest records size and mtime of every output next to its key
+FORMAT_VERSION = 2
+
+_MANIFEST_FILE = 'manifest.json'
+_LOCAL_IMPORT = re.compile(r'^\s*(?:from|import)\s+(visualize\w*)', re.M)
+_ANALYTICS_IMPORT = re.compile(r'^\s*from\s+analytics\.(\w+)\s+import', re.M)
+# Relative imports inside the package: `from .sketch import x` and `from . import a, b`
+_PACKAGE_IMPORT = re.compile(r'^\s*from\s+\.(\w*)\s+import\s+\(?([\w\s,]+)', re.M)
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _module_sources(module, seen):
+    """Add an analytics module and the package modules it imports, transitively"""
+    path = os.path.join(_PACKAGE_DIR, f'{module}.py')
+    if path in seen or not os.path.exists(path):
+        return
+    seen.add(path)
+    source = _read(path).decode('utf-8', 'replace')
+    for name, names in _PACKAGE_IMPORT.findall(source):
+        modules = [name] if name else [item.strip() for item in names.split(',')]
+        for imported in modules:
+            if imported:
+                _module_sources(imported, seen)
+
+
+def script_sources(script, seen=None):
+    """Paths of a visualize script and the repo modules it imports, transitively"""
+    seen = set() if seen is None else seen
+    path = os.path.join(SCRIPTS_DIR, script)
+    if path in seen or not os.path.exists(path):
+        return seen
+    seen.add(path)
+    source = _read(path).decode('utf-8', 'replace')
+    for module in _LOCAL_IMPORT.findall(source):
+        script_sources(f'{module}.py', seen)
+    for module in _ANALYTICS_IMPORT.findall(source):
+        _module_sources(module, seen)
+    return seen
+
+
+def code_digest(figure):
+    """Hash of everything that decides how a figure is drawn"""
+    digest = hashlib.blake2b(digest_size=16)
+    sources = script_sources(figure.script)
+    # FigureData prepares the drawn values (latency breakdown, verdicts) in the package
+    _module_sources('figures', sources)
+    for path in sorted(sources):
+        if os.path.exists(path):
+            digest.update(os.path.relpath(path, SCRIPTS_DIR).encode())
+            digest.update(_read(path))
+    digest.update(inspect.getsource(figure.draw).encode())
+    digest.update(f'{figure.name}|{figure.output}|{FORMAT_VERSION}'.encode())
+    return digest.hexdigest()
+
+
+def build_key(figure, data, code=None):
+    """Build key of a figure for the loaded inputs"""
+    payload = json.dumps({'code': code or code_digest(figure), 'data': figure.data_key(data)},
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """Rendered figures stored by build key, with an LRU size budget"""
+
+    def __init__(self, directory, max_bytes=MAX_FIGURE_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, _MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return self._empty_manifest()
+        if manifest.get('version') != FORMAT_VERSION:
+            return self._empty_manifest()
+        return manifest
+
+    @staticmethod
+    def _empty_manifest():
+        return {'version': FORMAT_VERSION, 'outputs': {}, 'entries': {}}
+
+    def _output_state(self, key, output_file):
+        stat = os.stat(output_file)
+        return {'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _is_current(self, key, output_file):
+        """True if output_file is still the file written or restored for `key`
+
+        Size and mtime are compared with the manifest, so an output replaced
+        behind the cache's back (git checkout, a manual script run) is not
+        trusted.
+        """
+        recorded = self.manifest['outputs'].get(os.path.abspath(output_file))
+        if not recorded or recorded['key'] != key:
+            return False
+        try:
+            return self._output_state(key, output_file) == recorded
+        except OSError:
+            return False
+
+    def save(self):
+        tmp = os.path.join(self.directory, f'{_MANIFEST_FILE}.{os.getpid()}')
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, os.path.join(self.directory, _MANIFEST_FILE))
+
+    def _blob(self, key, output_file):
+        return os.path.join(self.directory, key + os.path.splitext(output_file)[1])
+
+    def restore(self, key, output_file):
+        """True if output_file is (now) the build of `key`
+
+        An output already built from the key is left alone; otherwise a
+        stored copy is put in place.
+        """
+        entry = self.manifest['entries'].get(key)
+        blob = self._blob(key, output_file)
+        if entry is None or not os.path.exists(blob):
+            return False
+        entry['last_used'] = time.time()
+        if not self._is_current(key, output_file):
+            shutil.copyfile(blob, output_file)
+            self.manifest['outputs'][os.path.abspath(output_file)] = \
+                self._output_state(key, output_file)
+        return True
+
+    def store(self, key, output_file):
+        """Keep a copy of a freshly rendered output under its key"""
+        if not os.path.exists(output_file):
+            return False
+        blob = self._blob(key, output_file)
+        shutil.copyfile(output_file, blob)
+        self.manifest['entries'][key] = {'size': os.path.getsize(blob), 'last_used': time.time(),
+                                         'output': os.path.basename(output_file)}
+        self.manifest['outputs'][os.path.abspath(output_file)] = \
+            self._output_state(key, output_file)
+        return True
+
+    def evict(self):
+        """Drop least recently used stored figures until the total fits max_bytes"""
+        entries = sorted(self.manifest['entries'].items(), key=lambda item: item[1]['last_used'])
+        total = sum(entry['size'] for _, entry in entries)
+        removed = []
+        for key, entry in entries:
+            if total <= self.max_bytes:
+                break
+            blob = self._blob(key, entry['output'])
+            if os.path.exists(blob):
+                os.remove(blob)
+            del self.manifest['entries'][key]
+            total -= entry['size']
+            removed.append(key)
+        return removed
+
+
+def open_figure_cache(output_dir):
+    """FigureCache in .cache/figures of the output directory"""
+    return FigureCache(os.path.join(output_dir, '.cache', 'figures'))
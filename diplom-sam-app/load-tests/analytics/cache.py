@@ -0,0 +1,254 @@
+"""
+On-disk cache of parsed k6 runs
+Entries are keyed by the BLAKE2 hash of the raw result file together with a
+hash of the parser modules, so a parser change is not answered with frames it
+did not produce. Frames are stored column by column as .npy files
+(categoricals as integer codes, with their categories dtype) and opened with
+mmap, so re-rendering a chart skips CSV/JSON parsing and datetime conversion
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .profiling import stage
+
+CACHE_DIR = os.environ.get('K6_CACHE_DIR')
+
+# Eviction budget: total size and time since last use
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+MAX_CACHE_AGE = 30 * 24 * 3600
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+# 2: categories keep their dtype, string columns are restored as strings
+FORMAT_VERSION = 2
+
+# Modules that decide what a cached frame or aggregate holds
+PARSER_MODULES = ('cache', 'ingest', 'loaders', 'sketch', 'tags')
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_parser_digest = None
+
+_INDEX_FILE = 'index.json'
+_META_FILE = 'meta.json'
+
+
+def default_cache_dir(source):
+    """K6_CACHE_DIR, or .cache/k6-runs next to the result file"""
+    if CACHE_DIR:
+        return CACHE_DIR
+    return os.path.join(os.path.dirname(os.path.abspath(source)), '.cache', 'k6-runs')
+
+
+def parser_digest():
+    """BLAKE2 hash of the parser and aggregation modules (computed once)"""
+    global _parser_digest
+    if _parser_digest is None:
+        digest = hashlib.blake2b(digest_size=8)
+        for module in PARSER_MODULES:
+            with open(os.path.join(_PACKAGE_DIR, f'{module}.py'), 'rb') as f:
+                digest.update(f.read())
+        _parser_digest = digest.hexdigest()
+    return _parser_digest
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class RunCache:
+    """Content-addressed store of parsed runs"""
+
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES, max_age=MAX_CACHE_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    # ---------- keys ----------
+
+    def content_hash(self, source):
+        """BLAKE2 digest of the file, remembered per (path, size, mtime)"""
+        stat = os.stat(source)
+        path = os.path.abspath(source)
+        index = self._read_index()
+        known = index.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['digest']
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        index[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                       'digest': digest.hexdigest()}
+        self._write_index(index)
+        return index[path]['digest']
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        tmp = os.path.join(self.directory, f'{_INDEX_FILE}.{os.getpid()}')
+        with open(tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(self.directory, _INDEX_FILE))
+
+    def _entry(self, source, kind):
+        return os.path.join(self.directory,
+                            f'{self.content_hash(source)}-{kind}-{parser_digest()}')
+
+    # ---------- frames ----------
+
+    def get_frame(self, source, parse, kind='frame'):
+        """Cached frame for `source`, calling parse(source) on a miss"""
+        with stage('hash'):
+            entry = self._entry(source, kind)
+        with stage('cache read'):
+            frame = self._load_frame(entry)
+        if frame is None:
+            frame = parse(source)
+            with stage('cache write'):
+                self._store(entry, lambda tmp: self._write_frame(tmp, frame))
+        return frame
+
+    def _write_frame(self, tmp, df):
+        import pandas as pd
+
+        columns = []
+        for position, name in enumerate(df.columns):
+            column = df[name]
+            spec = {'name': name, 'file': f'{position}.npy'}
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                spec['kind'] = 'category'
+                spec['categories'] = column.cat.categories.tolist()
+                spec['categories_dtype'] = str(column.cat.categories.dtype)
+                spec['ordered'] = bool(column.cat.ordered)
+                data = column.cat.codes.values
+            elif pd.api.types.is_datetime64_any_dtype(column.dtype):
+                spec['kind'] = 'datetime'
+                spec['unit'] = np.datetime_data(column.values.dtype)[0]
+                data = column.values.view(np.int64)
+            elif column.dtype == object or pd.api.types.is_string_dtype(column.dtype):
+                # Free-form strings (url, name, ...) are stored dictionary-encoded too
+                codes, categories = pd.factorize(column)
+                spec['kind'] = 'strings'
+                spec['dtype'] = str(column.dtype)
+                spec['categories'] = categories.tolist()
+                spec['categories_dtype'] = str(categories.dtype)
+                data = codes.astype(np.int32)
+            else:
+                spec['kind'] = 'numeric'
+                data = column.values
+            np.save(os.path.join(tmp, spec['file']), np.ascontiguousarray(data))
+            columns.append(spec)
+        return {'rows': len(df), 'columns': columns}
+
+    def _load_frame(self, entry):
+        meta = self._read_meta(entry)
+        if meta is None:
+            return None
+        import pandas as pd
+
+        data = {}
+        for spec in meta['columns']:
+            values = np.load(os.path.join(entry, spec['file']), mmap_mode='r')
+            if spec['kind'] in ('category', 'strings'):
+                categories = pd.Index(spec['categories'], dtype=spec['categories_dtype'])
+                column = pd.Categorical.from_codes(values, categories=categories,
+                                                   ordered=spec.get('ordered', False))
+                # Strings decoded back to the column dtype (materialized, not mmapped)
+                data[spec['name']] = (column if spec['kind'] == 'category'
+                                      else pd.Series(column).astype(spec['dtype']))
+            elif spec['kind'] == 'datetime':
+                data[spec['name']] = values.view(f"M8[{spec['unit']}]")
+            else:
+                data[spec['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    # ---------- JSON objects (aggregates) ----------
+
+    def get_object(self, source, kind, build, to_dict, from_dict):
+        """Cached JSON-serializable object (e.g. RunAggregates) for `source`"""
+        with stage('hash'):
+            entry = self._entry(source, kind)
+        meta = self._read_meta(entry)
+        if meta is not None:
+            with stage('cache read'), open(os.path.join(entry, 'object.json')) as f:
+                return from_dict(json.load(f))
+
+        obj = build(source)
+
+        def write(tmp):
+            with open(os.path.join(tmp, 'object.json'), 'w') as f:
+                json.dump(to_dict(obj), f)
+            return {}
+
+        self._store(entry, write)
+        return obj
+
+    # ---------- entries ----------
+
+    def _read_meta(self, entry):
+        try:
+            with open(os.path.join(entry, _META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != FORMAT_VERSION:
+            return None
+        # Touch for age-based eviction (last use, not creation)
+        os.utime(os.path.join(entry, _META_FILE))
+        return meta
+
+    def _store(self, entry, write):
+        tmp = f'{entry}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        meta = write(tmp)
+        meta.update({'version': FORMAT_VERSION, 'created': time.time()})
+        with open(os.path.join(tmp, _META_FILE), 'w') as f:
+            # default=str for datetime categories, restored through their dtype
+            json.dump(meta, f, default=str)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def entries(self):
+        """[(path, size_bytes, last_used)] of all complete entries"""
+        result = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            meta = os.path.join(path, _META_FILE)
+            if os.path.isdir(path) and os.path.exists(meta):
+                result.append((path, _dir_size(path), os.path.getmtime(meta)))
+        return result
+
+    def evict(self):
+        """Drop entries unused for max_age, then least recently used over max_bytes"""
+        now = time.time()
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for path, size, last_used in entries:
+            if now - last_used > self.max_age or total > self.max_bytes:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                removed.append(path)
+        return removed
+
+
+def open_cache(source):
+    """RunCache in the default location for `source`"""
+    return RunCache(default_cache_dir(source))
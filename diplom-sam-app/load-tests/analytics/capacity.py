@@ -0,0 +1,209 @@
+"""
+DynamoDB consumed capacity accounting per tenant
+BaseRepo passes ReturnConsumedCapacity: "TOTAL" on every call and, with
+LOG_CONSUMED_CAPACITY=true, logs the result as a `consumed_capacity` JSON
+record (table, operation, shardId, tenant, tier, read/write units). The
+records are aggregated per tenant, tier, table and operation, priced per
+Lambda request, and bucketed per shard and second against the per-partition
+key limits, so a tenant saturating one shard shows up before DynamoDB starts
+throttling it
+"""
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from .logs import iter_log_events
+
+# DynamoDB limits for a single partition key value, per second
+PARTITION_RCU_LIMIT = 3000.0
+PARTITION_WCU_LIMIT = 1000.0
+
+# On-demand list price in USD per million request units (us-east-1)
+READ_PRICE_PER_MILLION = 0.25
+WRITE_PRICE_PER_MILLION = 1.25
+
+# Utilization of the partition limits reported as hot
+HOT_UTILIZATION = 0.8
+DEFAULT_FREQ = '1s'
+
+READ_OPERATIONS = ('get', 'query', 'scan')
+GROUP_COLUMNS = ('tenant', 'tier', 'table', 'operation')
+
+_RECORD = re.compile(r'\{"event":\s*"consumed_capacity"')
+
+
+def parse_capacity_logs(filenames, tiers=None):
+    """Frame of `consumed_capacity` records in Lambda logs
+
+    Columns: time, request_id, table, operation, shard, tenant, tier, rcu,
+    wcu. Records without a tenant take it from the `<tenant>-<n>` shard id;
+    `tiers` ({tenant: TIER}) fills in tiers the authorizer did not pass.
+    """
+    decoder = json.JSONDecoder()
+    rows = []
+    for event in iter_log_events(filenames, ('consumed_capacity',)):
+        match = _RECORD.search(event.message)
+        if not match:
+            continue
+        try:
+            record, _ = decoder.raw_decode(event.message[match.start():])
+        except ValueError:
+            continue
+        operation = record.get('operation')
+        units = float(record.get('capacityUnits') or 0.0)
+        read, write = record.get('readCapacityUnits'), record.get('writeCapacityUnits')
+        if read is None and write is None:
+            # TOTAL only reports CapacityUnits for some tables; split by operation
+            read, write = (units, 0.0) if operation in READ_OPERATIONS else (0.0, units)
+        rows.append((event.time, event.request_id, record.get('table'), operation,
+                     record.get('shardId'), record.get('tenantId'), record.get('tier'),
+                     float(read or 0.0), float(write or 0.0)))
+
+    frame = pd.DataFrame(rows, columns=['time', 'request_id', 'table', 'operation', 'shard',
+                                        'tenant', 'tier', 'rcu', 'wcu'])
+    from_shard = frame['shard'].astype(str).str.rpartition('-')[0].where(frame['shard'].notna())
+    frame['tenant'] = frame['tenant'].fillna(from_shard).fillna('unknown')
+    if tiers:
+        frame['tier'] = frame['tier'].fillna(frame['tenant'].map(tiers))
+    frame['tier'] = frame['tier'].fillna('UNKNOWN')
+    frame['datetime'] = pd.to_datetime(frame['time'], unit='ms')
+    return frame
+
+
+def capacity_table(frame, by=GROUP_COLUMNS):
+    """Calls, total and per-call RCU/WCU per group"""
+    table = frame.groupby(list(by), dropna=False).agg(
+        calls=('rcu', 'size'), rcu=('rcu', 'sum'), wcu=('wcu', 'sum')).reset_index()
+    table['rcu_per_call'] = table['rcu'] / table['calls']
+    table['wcu_per_call'] = table['wcu'] / table['calls']
+    return table.sort_values(['rcu', 'wcu'], ascending=False, ignore_index=True)
+
+
+def request_costs(frame, read_price=READ_PRICE_PER_MILLION, write_price=WRITE_PRICE_PER_MILLION):
+    """Capacity and on-demand cost of every Lambda request (all its DynamoDB calls)
+
+    `kind` names the calls the request made, e.g. `query×10` for a list
+    operation over 10 shards or `put` for a create.
+    """
+    data = frame.dropna(subset=['request_id'])
+    grouped = data.groupby('request_id', sort=False)
+    requests = grouped.agg(tenant=('tenant', 'first'), tier=('tier', 'first'),
+                           table=('table', 'first'), calls=('rcu', 'size'),
+                           rcu=('rcu', 'sum'), wcu=('wcu', 'sum'))
+    counts = data.groupby(['request_id', 'operation']).size()
+    kinds = {}
+    for (request_id, operation), count in counts.items():
+        kinds.setdefault(request_id, []).append(operation if count == 1 else f'{operation}×{count}')
+    requests['kind'] = pd.Series({key: '+'.join(sorted(value)) for key, value in kinds.items()})
+    requests['cost_usd'] = (requests['rcu'] * read_price + requests['wcu'] * write_price) / 1e6
+    return requests.reset_index()
+
+
+def cost_per_request(requests):
+    """Mean RCU/WCU and cost per request by tenant, tier and request kind"""
+    table = requests.groupby(['tenant', 'tier', 'kind'], dropna=False).agg(
+        requests=('cost_usd', 'size'), rcu=('rcu', 'mean'), wcu=('wcu', 'mean'),
+        cost_usd=('cost_usd', 'mean')).reset_index()
+    table['cost_per_million'] = table['cost_usd'] * 1e6
+    return table.sort_values('cost_per_million', ascending=False, ignore_index=True)
+
+
+def shard_load(frame, freq=DEFAULT_FREQ):
+    """Consumed units per shard and time bucket, as a fraction of the partition key limits
+
+    Columns: table, shard, bucket, rcu, wcu, utilization (the larger of the
+    read and write shares of the per-second limits).
+    """
+    data = frame.dropna(subset=['shard'])
+    seconds = pd.Timedelta(freq).total_seconds()
+    load = data.groupby(['table', 'shard', data['datetime'].dt.floor(freq).rename('bucket')]).agg(
+        rcu=('rcu', 'sum'), wcu=('wcu', 'sum')).reset_index()
+    load['utilization'] = np.maximum(load['rcu'] / seconds / PARTITION_RCU_LIMIT,
+                                     load['wcu'] / seconds / PARTITION_WCU_LIMIT)
+    return load
+
+
+def hot_shards(load, threshold=HOT_UTILIZATION):
+    """Peak per-second load per shard with the tenant's skew across its shards
+
+    `skew` is the shard's total load over the mean shard load of the same
+    tenant and table; well above 1 means one shard takes the tenant's traffic.
+    """
+    shards = load.groupby(['table', 'shard']).agg(
+        peak_rcu=('rcu', 'max'), peak_wcu=('wcu', 'max'), peak=('utilization', 'max'),
+        p99=('utilization', lambda values: values.quantile(0.99)),
+        total=('utilization', 'sum')).reset_index()
+    shards['tenant'] = shards['shard'].astype(str).str.rpartition('-')[0]
+    mean_load = shards.groupby(['table', 'tenant'])['total'].transform('mean')
+    shards['skew'] = shards['total'] / mean_load.where(mean_load > 0)
+    shards['hot'] = shards['peak'] >= threshold
+    return shards.drop(columns='total').sort_values('peak', ascending=False, ignore_index=True)
+
+
+def format_capacity(table, costs, shards, limit=15):
+    """Human-readable capacity, cost and hot shard tables"""
+    lines = [f"{'Tenant':<18}{'Tier':<10}{'Table':<22}{'Op':<8}{'Calls':>9}{'RCU':>10}"
+             f"{'WCU':>10}{'RCU/call':>10}{'WCU/call':>10}"]
+    for row in table.head(limit).to_dict('records'):
+        lines.append(f"{str(row['tenant']):<18}{str(row['tier']):<10}{str(row['table']):<22}"
+                     f"{str(row['operation']):<8}{row['calls']:>9,}{row['rcu']:>10.1f}"
+                     f"{row['wcu']:>10.1f}{row['rcu_per_call']:>10.2f}{row['wcu_per_call']:>10.2f}")
+    lines += ['', f"{'Tenant':<18}{'Tier':<10}{'Request':<22}{'Requests':>9}{'RCU':>8}{'WCU':>8}"
+                  f"{'$/1M req':>10}"]
+    for row in costs.head(limit).to_dict('records'):
+        lines.append(f"{str(row['tenant']):<18}{str(row['tier']):<10}{str(row['kind']):<22}"
+                     f"{row['requests']:>9,}{row['rcu']:>8.2f}{row['wcu']:>8.2f}"
+                     f"{row['cost_per_million']:>10.2f}")
+    lines += ['', f"{'Shard':<24}{'Table':<22}{'Peak RCU':>9}{'Peak WCU':>9}{'Peak':>7}"
+                  f"{'p99':>7}{'Skew':>6}"]
+    for row in shards.head(limit).to_dict('records'):
+        marker = '  🔥 near partition limit' if row['hot'] else ''
+        skew = f"{row['skew']:.1f}" if not np.isnan(row['skew']) else '-'
+        lines.append(f"{str(row['shard']):<24}{str(row['table']):<22}{row['peak_rcu']:>9.1f}"
+                     f"{row['peak_wcu']:>9.1f}{row['peak'] * 100:>6.1f}%{row['p99'] * 100:>6.1f}%"
+                     f"{skew:>6}{marker}")
+    return lines
+
+
+def create_capacity_chart(load, costs, output_file='dynamodb_capacity.png', max_shards=30):
+    """Shard x time utilization heatmap and cost per million requests per tenant"""
+    import matplotlib.pyplot as plt
+
+    peaks = load.groupby('shard')['utilization'].max().sort_values(ascending=False)
+    shards = list(peaks.index[:max_shards])
+    grid = (load[load['shard'].isin(shards)]
+            .pivot_table(index='shard', columns='bucket', values='utilization', aggfunc='max')
+            .reindex(shards).fillna(0.0))
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, max(5, 0.3 * len(shards) + 2)),
+                                   gridspec_kw={'width_ratios': [3, 2]})
+    fig.suptitle('DynamoDB Consumed Capacity per Tenant Shard', fontsize=16, fontweight='bold')
+    image = ax1.imshow(grid.values * 100, aspect='auto', cmap='YlOrRd', vmin=0,
+                       vmax=max(100, float(grid.values.max()) * 100), interpolation='nearest')
+    ax1.set_yticks(range(len(shards)))
+    ax1.set_yticklabels(shards, fontsize=8)
+    if len(grid.columns):
+        ticks = np.linspace(0, len(grid.columns) - 1, min(8, len(grid.columns))).astype(int)
+        ax1.set_xticks(ticks)
+        ax1.set_xticklabels([grid.columns[i].strftime('%H:%M:%S') for i in ticks],
+                            rotation=30, fontsize=8)
+    ax1.set_title('Partition key limit used per second (%)')
+    fig.colorbar(image, ax=ax1, label='% of 3000 RCU / 1000 WCU')
+
+    top = costs.head(15).iloc[::-1]
+    labels = [f"{row['tenant']} ({row['tier']})\n{row['kind']}" for row in top.to_dict('records')]
+    ax2.barh(labels, top['cost_per_million'], color='#4dabf7', edgecolor='black')
+    for y, value in enumerate(top['cost_per_million']):
+        ax2.text(value, y, f' ${value:.2f}', va='center', fontsize=9)
+    ax2.set_xlabel('On-demand cost per million requests (USD)')
+    ax2.set_title('DynamoDB Cost per Request')
+    ax2.tick_params(axis='y', labelsize=8)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {output_file}")
+    return output_file
@@ -0,0 +1,878 @@
+"""
+Command line entry point for the load test analytics
+    python -m analytics render [figure ...] [-j JOBS] [--input-dir DIR] [--output-dir DIR] [--force]
+    python -m analytics summary [results_file] [--crud FILE] [--json FILE]
+    python -m analytics verdict [results_file] [--baseline FILE] [--json FILE]
+    python -m analytics latency [results_file] [--expected-interval MS]
+    python -m analytics fanout [LOG ...] [--crud FILE] [--shards 1-20] [--chart FILE]
+    python -m analytics coldstart LOG|DIR ... [--k6 FILE ...] [--chart FILE]
+    python -m analytics capacity LOG ... [--tier TENANT=TIER ...] [--chart FILE]
+    python -m analytics partitions [--tenants 100,1000,10000] [--replay LOG ...] [--shards N]
+    python -m analytics plan [results_file ...] [--logs LOG ...] [--target 0.01] [--chart FILE]
+    python -m analytics authcache LOG ... [--freq 5min] [--timeline FILE]
+    python -m analytics report [results_file] [--by role|tenant|scenario] [--out FILE]
+    python -m analytics batch 'runs/**/*.json' ... [-j JOBS] [--csv FILE] [--chart FILE]
+    python -m analytics record FILE ... [--label TEXT] [--sha SHA]
+    python -m analytics history [--suite NAME]
+    python -m analytics compare [RUN_A] [RUN_B] [--baseline N] [--json FILE]
+    python -m analytics loadgen [--rate STREAM=RPS ...] [--duration S] [--out FILE] [--standin]
+    python -m analytics standin [--port PORT] [--template FILE] [--stats FILE]
+    python -m analytics synth FILE [--rows 10M] [--seed N]
+    python -m analytics bench [--rows 1M,10M] [--stages NAME ...] [--fail-on-regression]
+Inputs are loaded once, then every figure whose build key changed is
+rendered in a process pool with the Agg backend. Every command takes
+--profile [--profile-out FILE] for a per-stage time and memory table
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import (authlogs, batch, bench, buildgraph, capacity, coldstart, fanout, figures, history,
+               html_report, partitions, planner, profiling, standin, synthetic)
+from .loadgen import DEFAULT_OUTPUT, MAX_CONNECTIONS, MAX_IN_FLIGHT
+from .results import DEFAULT_RESULTS_FILE, REQUEST_METRIC
+from .verdict import ALPHA, DEFAULT_SCRIPT, evaluate_run, format_verdicts
+
+
+def _render_serial(names, data):
+    figures.init_worker(data)
+    for name in names:
+        try:
+            yield figures.render_figure(name) + (None,)
+        except Exception as exc:
+            yield name, None, None, exc
+
+
+def _render_parallel(names, data, jobs):
+    # With fork the workers inherit the already imported scripts and matplotlib
+    if multiprocessing.get_start_method() == 'fork':
+        figures.init_worker(data)
+        for script in {figures.FIGURES[name].script for name in names}:
+            figures.load_script(script)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=figures.init_worker,
+                             initargs=(data,)) as pool:
+        futures = {pool.submit(figures.render_figure, name): name for name in names}
+        for future in as_completed(futures):
+            try:
+                yield future.result() + (None,)
+            except Exception as exc:
+                yield futures[future], None, None, exc
+
+
+def render(names=None, input_dir='.', output_dir='.', jobs=None, force=False):
+    """Render the selected figures (all by default)
+
+    Figures whose build key (chart code and input fingerprint) is unchanged
+    are restored from the figure cache unless `force` is set. A figure that
+    fails is reported and the others are still rendered. Returns
+    ({name: seconds}, [failed figure names]).
+    """
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    start = time.perf_counter()
+    data = figures.FigureData(input_dir, output_dir)
+
+    selected = []
+    for name in names or figures.FIGURES:
+        missing = figures.FIGURES[name].missing(data)
+        if missing:
+            print(f"⚠️  {name}: {', '.join(missing)} not found - skipping")
+        else:
+            selected.append(name)
+    if not selected:
+        return {}, []
+
+    os.makedirs(output_dir, exist_ok=True)
+    data.load()
+    load_time = time.perf_counter() - start
+    print(f"📥 Inputs loaded in {load_time:.2f}s")
+
+    cache = buildgraph.open_figure_cache(output_dir)
+    keys = {name: buildgraph.build_key(figures.FIGURES[name], data) for name in selected}
+    stale = []
+    for name in selected:
+        output_file = os.path.join(output_dir, figures.FIGURES[name].output)
+        if not force and cache.restore(keys[name], output_file):
+            print(f"⏭️  {name:<22} up to date  {output_file}")
+        else:
+            stale.append(name)
+    if not stale:
+        cache.save()
+        print(f"📊 All {len(selected)} figures up to date ({time.perf_counter() - start:.2f}s)")
+        return {}, []
+
+    jobs = jobs or min(len(stale), os.cpu_count() or 1)
+    if profiling.enabled() and jobs > 1:
+        # Stages are only recorded in this process
+        print('⏱️  Profiling: rendering in-process instead of with a pool')
+        jobs = 1
+    rendered = (_render_serial(stale, data) if jobs == 1
+                else _render_parallel(stale, data, jobs))
+    timings = {}
+    failed = []
+    for name, output_file, elapsed, error in rendered:
+        if error is not None:
+            # Not stored, so the next run retries it
+            failed.append(name)
+            print(f"❌ {name:<22} {type(error).__name__}: {error}")
+            continue
+        timings[name] = elapsed
+        cache.store(keys[name], output_file)
+        print(f"✅ {name:<22} {elapsed:6.2f}s  {output_file}")
+    cache.evict()
+    cache.save()
+
+    print(f"📊 {len(timings)} figures in {time.perf_counter() - start:.2f}s "
+          f"(load {load_time:.2f}s, {jobs} worker{'s' if jobs > 1 else ''})")
+    if failed:
+        print(f"❌ {len(failed)} figure(s) failed: {', '.join(sorted(failed))}")
+    return timings, failed
+
+
+def _assignment(metavar, convert=str):
+    """argparse type for repeatable KEY=VALUE options, parsed to (key, convert(value))"""
+    def parse(text):
+        key, sep, value = text.partition('=')
+        if not sep or not key.strip() or not value.strip():
+            raise argparse.ArgumentTypeError(f"expected {metavar}, got {text!r}")
+        try:
+            return key.strip(), convert(value.strip())
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"{value.strip()!r} in {text!r} is not a valid {metavar.partition('=')[2]}")
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m analytics',
+                                     description='Load test analytics and chart rendering')
+    commands = parser.add_subparsers(dest='command')
+
+    render_cmd = commands.add_parser('render', help='render report figures in parallel')
+    render_cmd.add_argument('figures', nargs='*', metavar='figure',
+                            help=f"figures to render (default: all): {', '.join(figures.FIGURES)}")
+    render_cmd.add_argument('-j', '--jobs', type=int, default=None,
+                            help='worker processes (default: one per CPU, 1 renders in-process)')
+    render_cmd.add_argument('--input-dir', default='.', help='directory with the k6 result files')
+    render_cmd.add_argument('--output-dir', default='.', help='directory for the PNG files')
+    render_cmd.add_argument('--list', action='store_true', help='list figures and exit')
+    render_cmd.add_argument('--force', action='store_true',
+                            help='render every figure, even if its inputs and code are unchanged')
+
+    # Listed for --help only; main() hands summary to analytics.summary before parsing
+    commands.add_parser('summary', add_help=False,
+                        help='noisy/victim and CRUD percentile tables, no plotting imports')
+
+    verdict_cmd = commands.add_parser('verdict', help='pass/fail isolation verdict per scenario')
+    verdict_cmd.add_argument('results_file', nargs='?', default=DEFAULT_RESULTS_FILE)
+    verdict_cmd.add_argument('--script', default=DEFAULT_SCRIPT,
+                             help='k6 script whose options.thresholds are checked')
+    verdict_cmd.add_argument('--baseline',
+                             help='k6 result file of a victim-only run (no noisy load); '
+                                  'the latency shift is only tested against one')
+    verdict_cmd.add_argument('--alpha', type=float, default=ALPHA,
+                             help='significance level of the latency shift test')
+    verdict_cmd.add_argument('--json', metavar='FILE', help="write verdicts as JSON ('-' for stdout)")
+
+    latency_cmd = commands.add_parser('latency',
+                                      help='raw vs coordinated-omission-corrected percentiles')
+    latency_cmd.add_argument('results_file', nargs='?', default=DEFAULT_RESULTS_FILE)
+    latency_cmd.add_argument('--metric', default=REQUEST_METRIC, help='latency metric to correct')
+    latency_cmd.add_argument('--expected-interval', type=float, metavar='MS',
+                             help='interval between a VU\'s iterations (default: median per role)')
+    latency_cmd.add_argument('--csv', metavar='FILE', help='write the table as CSV')
+
+    fanout_cmd = commands.add_parser('fanout',
+                                     help='predict list-operation latency vs shard count')
+    fanout_cmd.add_argument('logs', nargs='*', metavar='log_file',
+                            help='Lambda logs with shard_query records (LOG_SHARD_TIMINGS=true); '
+                                 'without logs a lognormal stand-in is used')
+    fanout_cmd.add_argument('--table', help='only shard queries of this DynamoDB table')
+    fanout_cmd.add_argument('--operation', choices=sorted(fanout.READ_METRICS),
+                            default='getAllProducts')
+    fanout_cmd.add_argument('--crud', default=figures.CRUD_RESULTS_FILE,
+                            help='k6 CRUD results used to calibrate the fixed overhead')
+    fanout_cmd.add_argument('--overhead-ms', type=float,
+                            help='fixed per-request overhead (default: calibrated from --crud)')
+    fanout_cmd.add_argument('--shards', default='1-20', help="shard counts, e.g. '1-20' or '4,8,10,16'")
+    fanout_cmd.add_argument('--median-ms', type=float, default=fanout.STANDIN_MEDIAN_MS,
+                            help='stand-in per-shard median without logs')
+    fanout_cmd.add_argument('--sigma', type=float, default=fanout.STANDIN_SIGMA,
+                            help='stand-in lognormal sigma without logs')
+    fanout_cmd.add_argument('--chart', metavar='FILE', help='save a p50/p95/p99 vs shards chart')
+    fanout_cmd.add_argument('--csv', metavar='FILE', help='write the sweep as CSV')
+
+    coldstart_cmd = commands.add_parser('coldstart',
+                                        help='cold start / execution / gateway split per operation')
+    coldstart_cmd.add_argument('logs', nargs='+', metavar='log',
+                               help="Lambda log files or directories named after the function, "
+                                    "or FUNCTION=FILE")
+    coldstart_cmd.add_argument('--k6', nargs='+', metavar='FILE',
+                               default=[figures.CRUD_RESULTS_FILE, DEFAULT_RESULTS_FILE],
+                               help='k6 results with the operation trends (missing files are skipped)')
+    coldstart_cmd.add_argument('--template', default=coldstart.DEFAULT_TEMPLATE,
+                               help='SAM template mapping routes to functions')
+    coldstart_cmd.add_argument('--skew-ms', type=float, default=coldstart.DEFAULT_SKEW_MS,
+                               help='allowed clock difference between k6 and Lambda')
+    coldstart_cmd.add_argument('--chart', metavar='FILE', help='save the stacked breakdown chart')
+    coldstart_cmd.add_argument('--csv', metavar='FILE', help='write the breakdown as CSV')
+
+    capacity_cmd = commands.add_parser('capacity',
+                                       help='DynamoDB RCU/WCU, cost per request and hot shards')
+    capacity_cmd.add_argument('logs', nargs='+', metavar='log_file',
+                              help='Lambda logs with consumed_capacity records '
+                                   '(LOG_CONSUMED_CAPACITY=true)')
+    capacity_cmd.add_argument('--tier', action='append', default=[], metavar='TENANT=TIER',
+                              type=_assignment('TENANT=TIER'),
+                              help='tier of a tenant the authorizer did not report')
+    capacity_cmd.add_argument('--freq', default=capacity.DEFAULT_FREQ,
+                              help='time bucket of the shard load')
+    capacity_cmd.add_argument('--read-price', type=float, default=capacity.READ_PRICE_PER_MILLION,
+                              help='USD per million read request units')
+    capacity_cmd.add_argument('--write-price', type=float,
+                              default=capacity.WRITE_PRICE_PER_MILLION,
+                              help='USD per million write request units')
+    capacity_cmd.add_argument('--chart', metavar='FILE',
+                              help='save the hot shard heatmap and cost per request chart')
+    capacity_cmd.add_argument('--csv', metavar='FILE', help='write the per-group table as CSV')
+
+    partitions_cmd = commands.add_parser('partitions',
+                                         help='simulate per-shard load against partition limits')
+    partitions_cmd.add_argument('--tenants',
+                                default=','.join(map(str, partitions.DEFAULT_TENANT_COUNTS)),
+                                help='tenant counts to sweep, e.g. 100,1000,10000')
+    partitions_cmd.add_argument('--rate-per-tenant', type=float,
+                                default=partitions.DEFAULT_RATE_PER_TENANT,
+                                help='mean requests/s per tenant')
+    partitions_cmd.add_argument('--duration', type=int, default=partitions.DEFAULT_DURATION_S,
+                                help='simulated seconds')
+    partitions_cmd.add_argument('--write-share', type=float, default=partitions.DEFAULT_WRITE_SHARE)
+    partitions_cmd.add_argument('--skew', type=float, default=partitions.DEFAULT_SKEW,
+                                help='Zipf exponent of tenant popularity')
+    partitions_cmd.add_argument('--shards', type=int, default=fanout.CURRENT_SHARDS,
+                                help='shards per tenant (randSuffix range)')
+    partitions_cmd.add_argument('--partitions', type=int,
+                                help='also report this many physical partitions')
+    partitions_cmd.add_argument('--replay', nargs='+', metavar='LOG',
+                                help='replay consumed_capacity records instead of a synthetic stream')
+    partitions_cmd.add_argument('--top', type=int, default=10, help='hottest keys to list')
+    partitions_cmd.add_argument('--csv', metavar='FILE', help='write the per-key table as CSV')
+
+    plan_cmd = commands.add_parser('plan',
+                                   help='solve usage plan limits from observed per-tenant load')
+    plan_cmd.add_argument('results', nargs='*', metavar='results_file',
+                          help=f'k6 result files with tenant/tier/role tags '
+                               f'(default: {DEFAULT_RESULTS_FILE})')
+    plan_cmd.add_argument('--logs', nargs='+', metavar='LOG',
+                          help='use consumed_capacity records of Lambda logs as the arrivals')
+    plan_cmd.add_argument('--tier', action='append', default=[], metavar='TENANT=TIER',
+                          type=_assignment('TENANT=TIER'),
+                          help='tier of a tenant the authorizer did not report (with --logs)')
+    plan_cmd.add_argument('--target', type=float, default=planner.DEFAULT_TARGET,
+                          help='acceptable share of throttled victim requests')
+    plan_cmd.add_argument('--confidence', type=float, default=planner.DEFAULT_CONFIDENCE,
+                          help='share of bootstrap replicates that must meet the target')
+    plan_cmd.add_argument('--tick-ms', type=int, default=planner.DEFAULT_TICK_MS,
+                          help='token bucket time step')
+    plan_cmd.add_argument('--horizon', type=int, default=planner.DEFAULT_HORIZON_S,
+                          help='seconds per bootstrap replicate')
+    plan_cmd.add_argument('--replicates', type=int, default=planner.DEFAULT_REPLICATES)
+    plan_cmd.add_argument('--rates', default='{:g}-{:g}'.format(*planner.DEFAULT_RATES),
+                          help='rate limit search range in req/s, LOW-HIGH')
+    plan_cmd.add_argument('--burst-factors',
+                          default=','.join(f'{factor:g}' for factor in planner.DEFAULT_BURST_FACTORS),
+                          help='burst limits to try, as multiples of the rate')
+    plan_cmd.add_argument('--script', default=DEFAULT_SCRIPT,
+                          help='k6 script whose rateLimit values are the testing limits')
+    plan_cmd.add_argument('--template', default=coldstart.DEFAULT_TEMPLATE,
+                          help='SAM template with the deployed usage plans')
+    plan_cmd.add_argument('--seed', type=int, default=0)
+    plan_cmd.add_argument('--chart', metavar='FILE',
+                          help='save throttle probability vs rate limit per tier')
+    plan_cmd.add_argument('--csv', metavar='FILE', help='write every evaluated candidate as CSV')
+
+    authcache_cmd = commands.add_parser('authcache',
+                                        help='authorizer cache hit ratios and miss cost from logs')
+    authcache_cmd.add_argument('logs', nargs='+', metavar='log_file',
+                               help='authorizer CloudWatch logs (text or NDJSON, optionally .gz)')
+    authcache_cmd.add_argument('--freq', default=authlogs.DEFAULT_FREQ,
+                               help='time bucket of the hit ratio timeline')
+    authcache_cmd.add_argument('--timeline', metavar='FILE',
+                               help='write the credentials hit ratio timeline as CSV')
+    authcache_cmd.add_argument('--csv', metavar='FILE', help='write the hit ratio table as CSV')
+
+    report_cmd = commands.add_parser('report',
+                                     help='interactive HTML report with multi-resolution timelines')
+    report_cmd.add_argument('results_file', nargs='?', default=DEFAULT_RESULTS_FILE)
+    report_cmd.add_argument('--by', default=html_report.DEFAULT_GROUP_BY,
+                            help='tag (or comma-separated tags) to draw one series per value of')
+    report_cmd.add_argument('--metric', default=REQUEST_METRIC, help='latency metric to plot')
+    report_cmd.add_argument('--out', default=html_report.DEFAULT_REPORT_FILE,
+                            help='HTML file to write')
+    report_cmd.add_argument('--title', help='page title')
+
+    batch_cmd = commands.add_parser('batch',
+                                    help='aggregate many k6 result files into cross-run distributions')
+    batch_cmd.add_argument('patterns', nargs='+', metavar='pattern',
+                           help="result files or glob patterns, e.g. 'runs/**/*.csv'")
+    batch_cmd.add_argument('-j', '--jobs', type=int, default=None,
+                           help='worker processes (default: one per CPU, 1 runs in-process)')
+    batch_cmd.add_argument('--no-cache', action='store_true',
+                           help='parse every file instead of reading the run cache')
+    batch_cmd.add_argument('--csv', metavar='FILE', help='write the per-run rows as CSV')
+    batch_cmd.add_argument('--chart', metavar='FILE',
+                           help='save throttle rate histograms and victim p95 box plots')
+
+    record_cmd = commands.add_parser('record', help='store k6 result files in the run history')
+    record_cmd.add_argument('files', nargs='+', metavar='results_file')
+    record_cmd.add_argument('--label', help='free-form note stored with the run')
+    record_cmd.add_argument('--sha', help='git commit under test (default: $GIT_SHA or HEAD)')
+    record_cmd.add_argument('--db', default=history.HISTORY_DB, help='history database')
+
+    history_cmd = commands.add_parser('history', help='list recorded runs')
+    history_cmd.add_argument('--suite', help='only runs of this suite (result file name)')
+    history_cmd.add_argument('-n', '--limit', type=int, default=20)
+    history_cmd.add_argument('--db', default=history.HISTORY_DB, help='history database')
+
+    compare_cmd = commands.add_parser('compare', help='flag p95/p99 and throttle regressions')
+    compare_cmd.add_argument('runs', nargs='*', type=int, metavar='run',
+                             help='[base] new run ids (default: the latest run)')
+    compare_cmd.add_argument('--baseline', type=int, default=5, metavar='N',
+                             help='with one run: compare against the merged N previous runs')
+    compare_cmd.add_argument('--alpha', type=float, default=history.ALPHA)
+    compare_cmd.add_argument('--min-change', type=float, default=history.MIN_CHANGE,
+                             help='smallest relative latency increase reported (0.05 = 5%%)')
+    compare_cmd.add_argument('--json', metavar='FILE', help="write rows as JSON ('-' for stdout)")
+    compare_cmd.add_argument('--db', default=history.HISTORY_DB, help='history database')
+
+    loadgen_cmd = commands.add_parser('loadgen',
+                                      help='open-model (constant arrival rate) noisy neighbor load')
+    loadgen_cmd.add_argument('--script', default=DEFAULT_SCRIPT,
+                             help='k6 script the tenants and scenarios are read from')
+    loadgen_cmd.add_argument('--base-url', help='API base URL (default: BASE_URL of the script)')
+    loadgen_cmd.add_argument('--rate', action='append', default=[], metavar='STREAM=RPS',
+                             type=_assignment('STREAM=RPS', float),
+                             help='offered req/s of one stream (k6 scenario name), repeatable')
+    loadgen_cmd.add_argument('--only', nargs='+', metavar='STREAM', help='run only these streams')
+    loadgen_cmd.add_argument('--duration', type=float, help='seconds per stream (default: maxDuration)')
+    loadgen_cmd.add_argument('--out', default=DEFAULT_OUTPUT, help='k6 NDJSON output file')
+    loadgen_cmd.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT,
+                             help='pending requests per stream before arrivals are dropped')
+    loadgen_cmd.add_argument('--connections', type=int, default=MAX_CONNECTIONS,
+                             help='keep-alive connection pool size')
+    loadgen_cmd.add_argument('--dry-run', action='store_true', help='print the load plan and exit')
+    loadgen_cmd.add_argument('--standin', action='store_true',
+                             help='run against an in-process usage plan stand-in instead of the API')
+    loadgen_cmd.add_argument('--template', help='with --standin: use the tier limits of this SAM template')
+    loadgen_cmd.add_argument('--stats', metavar='FILE', help='with --standin: write ground truth JSON')
+
+    standin_cmd = commands.add_parser('standin', help='local API Gateway usage plan stand-in')
+    standin_cmd.add_argument('--script', default=DEFAULT_SCRIPT,
+                             help='k6 script the API keys and testing limits are read from')
+    standin_cmd.add_argument('--template', help='use the tier limits of this SAM template instead')
+    standin_cmd.add_argument('--host', default=standin.DEFAULT_HOST)
+    standin_cmd.add_argument('--port', type=int, default=standin.DEFAULT_PORT)
+    standin_cmd.add_argument('--quota', type=int, default=standin.DEFAULT_QUOTA,
+                             help='daily quota per key with the testing limits')
+    standin_cmd.add_argument('--latency-ms', type=float, default=standin.DEFAULT_LATENCY_MS,
+                             help='median simulated backend latency of admitted requests')
+    standin_cmd.add_argument('--stats', metavar='FILE', help='write ground truth JSON on exit')
+
+    synth_cmd = commands.add_parser('synth', help='write a synthetic k6 result file')
+    synth_cmd.add_argument('out', help='output file, NDJSON for .json/.ndjson, CSV otherwise')
+    synth_cmd.add_argument('--rows', default='1M', help='points to write, e.g. 250k, 10M')
+    synth_cmd.add_argument('--rate', type=float, default=synthetic.DEFAULT_RATE,
+                           help='simulated requests per second')
+    synth_cmd.add_argument('--seed', type=int, default=0)
+
+    bench_cmd = commands.add_parser('bench', help='benchmark the analytics stages on synthetic runs')
+    bench_cmd.add_argument('--rows', default=','.join(bench.DEFAULT_SIZES),
+                           help='comma-separated run sizes, e.g. 1M,10M,100M')
+    bench_cmd.add_argument('--stages', nargs='+', choices=list(bench.STAGES), metavar='STAGE',
+                           help=f"stages to run (default: all of {', '.join(bench.STAGES)})")
+    bench_cmd.add_argument('--seed', type=int, default=bench.DEFAULT_SEED)
+    bench_cmd.add_argument('--data-dir', default=bench.BENCH_DATA_DIR,
+                           help='where generated runs are kept between benchmarks')
+    bench_cmd.add_argument('--label', help='free-form note stored with the benchmark')
+    bench_cmd.add_argument('--no-record', action='store_true',
+                           help='compare with the stored runs without recording this one')
+    bench_cmd.add_argument('--fail-on-regression', action='store_true',
+                           help='exit status 1 if a stage regressed')
+    bench_cmd.add_argument('--db', default=bench.BENCH_DB, help='benchmark database')
+    return parser
+
+
+def verdict(args):
+    """Print verdicts; exit status 1 if any scenario fails"""
+    verdicts = evaluate_run(args.results_file, args.script, args.alpha, args.baseline)
+    if args.json == '-':
+        print(json.dumps(verdicts, indent=2))
+    else:
+        if not args.baseline:
+            print("⚠️  No --baseline run: noisy and victim tenants run concurrently, so the "
+                  "latency shift under noisy load is not checked")
+        print('\n'.join(format_verdicts(verdicts)))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(verdicts, f, indent=2)
+    return 0 if verdicts and all(v['passed'] for v in verdicts) else 1
+
+
+def latency(args):
+    from .loaders import load_run
+    from .omission import format_omission, omission_table
+
+    table = omission_table(load_run(args.results_file), args.metric, args.expected_interval)
+    print('\n'.join(format_omission(table)))
+    if args.csv and table is not None:
+        table.to_csv(args.csv, index=False)
+    return 0 if table is not None else 1
+
+
+def _shard_counts(text):
+    counts = set()
+    for part in text.split(','):
+        low, _, high = part.partition('-')
+        counts.update(range(int(low), int(high or low) + 1))
+    return sorted(count for count in counts if count > 0)
+
+
+def run_fanout(args):
+    """Print the shard count sweep for measured (or stand-in) shard timings"""
+    scaling = None
+    if args.logs:
+        timings = fanout.load_shard_logs(args.logs)
+        if args.table:
+            timings = timings[timings['table'] == args.table]
+        if timings.empty:
+            print(f"❌ No shard_query records in {', '.join(args.logs)}")
+            return 1
+        durations = timings['durationMs'].values
+        scaling = fanout.ItemScaling.fit(timings)
+        print(f"📥 {len(durations):,} shard queries")
+        if scaling:
+            print(f"📈 Per-shard time = {scaling.intercept:.1f} ms + {scaling.slope:.3f} ms/item "
+                  f"({scaling.total_items:.0f} items per tenant)")
+    else:
+        durations = fanout.standin_shard_timings(median_ms=args.median_ms, sigma=args.sigma)
+        print(f"⚠️  No logs given - stand-in shard times (lognormal, median {args.median_ms:.0f} ms)")
+
+    overhead = args.overhead_ms
+    if overhead is None:
+        observed = fanout.observed_read_p50(args.crud, args.operation)
+        overhead = fanout.calibrate_overhead(durations, observed) if observed else 0.0
+        if observed:
+            print(f"🎯 Overhead {overhead:.0f} ms calibrated to observed {args.operation} "
+                  f"p50 {observed:.0f} ms at {fanout.CURRENT_SHARDS} shards")
+
+    table = fanout.sweep(durations, _shard_counts(args.shards), overhead_ms=overhead,
+                         scaling=scaling)
+    print('\n'.join(fanout.format_sweep(table)))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    if args.chart:
+        fanout.create_sweep_chart(table, args.chart, title=args.operation)
+    return 0
+
+
+def run_coldstart(args):
+    """Print the per-function REPORT summary and the per-operation latency breakdown"""
+    from .loaders import load_run
+
+    frames = [load_run(name) for name in args.k6 if os.path.exists(name)]
+    table, summary, joined = coldstart.latency_breakdown(frames, args.logs, args.template,
+                                                         args.skew_ms)
+    if summary.empty:
+        print(f"❌ No REPORT lines in {', '.join(args.logs)}")
+        return 1
+    print(f"📥 {summary['invocations'].sum():,} invocations, {len(joined):,} k6 requests, "
+          f"{int(joined['matched'].sum()) if len(joined) else 0:,} matched")
+    print('\n'.join(coldstart.format_breakdown(table, summary)))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    if args.chart and not table.empty:
+        figures.load_script('visualize_all_results.py').create_latency_breakdown_chart(
+            table, args.chart)
+    return 0
+
+
+def run_capacity(args):
+    """Print consumed capacity per tenant, cost per request and the hottest shards"""
+    frame = capacity.parse_capacity_logs(args.logs, dict(args.tier))
+    if frame.empty:
+        print(f"❌ No consumed_capacity records in {', '.join(args.logs)}")
+        return 1
+    print(f"📥 {len(frame):,} DynamoDB calls in {frame['request_id'].nunique():,} requests")
+
+    table = capacity.capacity_table(frame)
+    costs = capacity.cost_per_request(capacity.request_costs(frame, args.read_price,
+                                                             args.write_price))
+    load = capacity.shard_load(frame, args.freq)
+    shards = capacity.hot_shards(load)
+    print('\n'.join(capacity.format_capacity(table, costs, shards)))
+    hot = shards[shards['hot']]
+    if len(hot):
+        print(f"\n⚠️  {len(hot)} shard(s) above {capacity.HOT_UTILIZATION:.0%} of a partition limit")
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    if args.chart:
+        capacity.create_capacity_chart(load, costs, args.chart)
+    return 0
+
+
+def run_partitions(args):
+    """Replay a recorded or synthetic stream through the shard layout"""
+    start = time.perf_counter()
+    names = None
+    if args.replay:
+        stream = partitions.RecordedStream(capacity.parse_capacity_logs(args.replay), args.shards)
+        if not stream.events:
+            print(f"❌ No consumed_capacity records in {', '.join(args.replay)}")
+            return 1
+        load, names = partitions.simulate(stream, args.partitions), stream.names
+        print(f"🔁 Replayed {load.events:,} requests of {stream.tenants} tenants "
+              f"over {load.seconds} s at {args.shards} shards")
+        if stream.scans:
+            print(f"ℹ️  {stream.scans:,} table scans skipped: they read no tenant shard key")
+    else:
+        table, load = partitions.growth_sweep(
+            _shard_counts(args.tenants), args.partitions, rate_per_tenant=args.rate_per_tenant,
+            duration_s=args.duration, write_share=args.write_share, skew=args.skew,
+            shards=args.shards)
+        print('\n'.join(partitions.format_sweep(table)))
+        print(f"\nHottest keys at {load.tenants:,} tenants:")
+    print(f"⏱️  {load.events:,} events simulated in {time.perf_counter() - start:.2f}s")
+
+    keys = load.key_table(names)
+    print('\n'.join(partitions.format_keys(keys.head(args.top))))
+    print(f"💡 One tenant sustains about {partitions.max_tenant_write_rate(args.shards):,.0f} "
+          f"writes/s across {args.shards} shards; every list read costs RCU on all of them")
+    if args.partitions:
+        print(f"🧱 Busiest of {args.partitions} physical partitions: "
+              f"{load.partition_peak.max() * 100:.0f}% of its throughput")
+    if args.csv:
+        keys.to_csv(args.csv, index=False)
+    return 0
+
+
+def run_plan(args):
+    """Recommend usage plan rate/burst limits per tier from recorded arrivals"""
+    from .loaders import load_run
+
+    if args.logs:
+        arrivals = planner.arrivals_from_logs(args.logs, dict(args.tier))
+        sources = args.logs
+    else:
+        sources = args.results or [DEFAULT_RESULTS_FILE]
+        arrivals = pd.concat([planner.arrivals_from_frame(load_run(name)) for name in sources],
+                             ignore_index=True)
+    if arrivals.empty:
+        print(f"❌ No tenant-tagged requests in {', '.join(sources)}")
+        return 1
+    try:
+        profile = planner.ArrivalProfile(arrivals, args.tick_ms)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📥 {len(arrivals):,} requests of {len(profile.streams)} tenant streams "
+          f"over {profile.seconds} s")
+    for (tenant, tier, role), rate in profile.rates().items():
+        print(f"   {tenant:<20}{tier:<10}{role:<8}{rate:>8.1f} req/s")
+
+    low, high = (float(value) for value in args.rates.split('-', 1))
+    grid = planner.candidate_grid(low, high, burst_factors=[float(value) for value in
+                                                            args.burst_factors.split(',')])
+    start = time.perf_counter()
+    table = planner.plan(profile, args.horizon, args.replicates, args.target, args.confidence,
+                         grid, planner.current_limits(args.script, args.template), args.seed)
+    recommended = planner.recommend(table, args.confidence)
+    print(f"⏱️  {len(table):,} candidates x {args.replicates} replicates of {args.horizon} s "
+          f"in {time.perf_counter() - start:.2f}s\n")
+    print('\n'.join(planner.format_plan(table, recommended, args.target, args.confidence)))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    if args.chart:
+        planner.create_plan_chart(table, recommended, args.chart, args.target)
+    return 0
+
+
+def authcache(args):
+    """Print authorizer cache hit ratios, miss causes and miss cost"""
+    start = time.perf_counter()
+    lookups, invocations = authlogs.parse_auth_logs(args.logs)
+    print(f"📥 {len(lookups):,} cache lookups in {len(invocations):,} invocations "
+          f"({time.perf_counter() - start:.2f}s)")
+    if lookups.empty:
+        print('⚠️  No authorizer cache events found')
+        return 1
+
+    table = authlogs.hit_ratios(lookups)
+    print(f"\n{'Cache':<13}{'Tenant':<16}{'Role':<16}{'Lookups':>9}{'Hit %':>8}"
+          f"{'Cold':>7}{'Expired':>9}{'Evicted':>9}")
+    for row in table.to_dict('records'):
+        tenant, role = ('-' if pd.isna(row[key]) else row[key] for key in ('tenant', 'role'))
+        print(f"{row['cache']:<13}{tenant:<16}{role:<16}"
+              f"{row['lookups']:>9,}{row['hit_ratio'] * 100:>7.1f}%{row['miss_cold']:>7,}"
+              f"{row['miss_expired']:>9,}{row['miss_evicted']:>9,}")
+
+    costs = authlogs.miss_costs(lookups, invocations)
+    print(f"\n{'Cache':<13}{'Warm hit p50':>14}{'Miss p50':>10}{'Penalty':>10}")
+    for row in costs.to_dict('records'):
+        if not row['warm_hits'] or not row['warm_misses']:
+            continue
+        print(f"{row['cache']:<13}{row['hit_p50_ms']:>12.1f}ms{row['miss_p50_ms']:>8.1f}ms"
+              f"{row['miss_penalty_ms']:>+8.1f}ms")
+        if row['cache'] == 'credentials' and not np.isnan(row.get('sts_p50_ms', np.nan)):
+            print(f"{'':<13}AssumeRole p50 {row['sts_p50_ms']:.0f} ms, p95 {row['sts_p95_ms']:.0f} ms")
+    print()
+    print('\n'.join(authlogs.sizing_hints(lookups, invocations)))
+
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    if args.timeline:
+        authlogs.hit_ratio_timeline(lookups, args.freq).to_csv(args.timeline)
+    return 0
+
+
+def report(args):
+    """Write the self-contained HTML report of one result file"""
+    from .loaders import load_run
+
+    start = time.perf_counter()
+    by = args.by.split(',') if ',' in args.by else args.by
+    written = html_report.write_report(load_run(args.results_file), args.out, by, args.metric,
+                                       args.title, args.results_file)
+    if written is None:
+        print(f"❌ No {args.metric} points in {args.results_file}")
+        return 1
+    output_file, points, levels = written
+    print(f"✅ Saved: {output_file} ({points:,} requests, "
+          f"{', '.join(html_report.LEVELS[:len(levels)])} levels, "
+          f"{os.path.getsize(output_file) / 1e6:.1f} MB, {time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+def run_batch(args):
+    """Aggregate many result files in a process pool and print cross-run distributions"""
+    files = batch.expand_patterns(args.patterns)
+    if not files:
+        print(f"❌ No result files match {' '.join(args.patterns)}")
+        return 1
+    runs, elapsed = batch.aggregate_files(files, args.jobs, not args.no_cache)
+    for filename, error in runs.failed:
+        print(f"⚠️  {filename}: {error}")
+    if not runs.roles:
+        print('❌ No scenario results in the matched files')
+        return 1
+    print(f"📚 {runs.files} of {len(files)} runs aggregated in {elapsed:.2f}s\n")
+    print('\n'.join(batch.format_batch(runs.table())))
+    if args.csv:
+        pd.DataFrame(runs.rows).to_csv(args.csv, index=False)
+    if args.chart:
+        batch.create_batch_chart(runs, args.chart)
+    return 0
+
+
+def record(args):
+    store = history.RunHistory(args.db)
+    for filename in args.files:
+        if not os.path.exists(filename):
+            print(f"⚠️  {filename} not found - skipping")
+            continue
+        run_id, created = history.record_file(filename, store, args.sha, args.label)
+        print(f"{'💾 Recorded' if created else '♻️  Already recorded'} {filename} as run #{run_id}")
+    store.close()
+    return 0
+
+
+def list_history(args):
+    store = history.RunHistory(args.db)
+    for run in store.runs(args.suite, args.limit):
+        recorded = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['recorded_at']))
+        print(f"#{run['id']:<5}{recorded:<18}{(run['git_sha'] or '-')[:10]:<12}"
+              f"{run['suite']:<32}{run['label'] or ''}")
+    store.close()
+    return 0
+
+
+def compare(args):
+    """Compare two runs (or a run against a rolling baseline); exit status 1 on regressions"""
+    store = history.RunHistory(args.db)
+    try:
+        if len(args.runs) > 2:
+            print('❌ compare takes at most two run ids')
+            return 2
+        if args.runs:
+            new_id = args.runs[-1]
+        else:
+            latest = store.runs(limit=1)
+            if not latest:
+                print(f"❌ No runs recorded in {args.db}")
+                return 2
+            new_id = latest[0]['id']
+        new = store.snapshot(new_id)
+        if len(args.runs) == 2:
+            base = store.snapshot(args.runs[0])
+        else:
+            base = store.baseline(new_id, args.baseline)
+            if base is None:
+                print(f"⚠️  No earlier {new.info['suite']} runs to compare run #{new_id} with")
+                return 0
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 2
+    finally:
+        store.close()
+
+    rows = history.compare_snapshots(base, new, args.alpha, args.min_change)
+    if args.json == '-':
+        print(json.dumps(rows, indent=2))
+    else:
+        print('\n'.join(history.format_comparison(base, new, rows)))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(rows, f, indent=2)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+def loadgen(args):
+    """Run the open-model load and print the per-scenario results"""
+    from . import loadgen as lg
+    from .follow import dashboard_lines
+    from .results import LoadTestResults
+
+    base_url, _, streams = lg.parse_script(args.script)
+    base_url = args.base_url or base_url
+    if args.only:
+        streams = [stream for stream in streams if stream.name in args.only]
+    try:
+        lg.apply_rates(streams, dict(args.rate), args.duration)
+    except ValueError as e:
+        print(f"❌ --rate: {e}")
+        return 2
+    print('\n'.join(lg.plan_lines('(stand-in)' if args.standin else base_url, streams,
+                                    check_tokens=not args.standin)))
+    if args.dry_run or not streams:
+        return 0
+
+    server = None
+    if args.standin:
+        server = standin.StandInServer(standin.load_keys(args.script, args.template), port=0)
+    print(f"\n🚀 Running{' against the usage plan stand-in' if server else ''}, writing {args.out}")
+    run, stats, connections = lg.run_load(base_url, streams, args.out, args.max_in_flight,
+                                          args.connections, server)
+    results = LoadTestResults.from_aggregates(run, source=args.out)
+    print('\n'.join(dashboard_lines(results, run, stats)))
+    print(f"🔌 {connections} connections opened")
+    if server:
+        print('\n🛡️  Stand-in ground truth')
+        print('\n'.join(standin.stats_lines(server.stats())))
+        if args.stats:
+            with open(args.stats, 'w') as f:
+                json.dump(server.stats(), f, indent=2)
+    return 0
+
+
+def run_standin(args):
+    keys = standin.load_keys(args.script, args.template, args.quota)
+    server = standin.StandInServer(keys, args.host, args.port, args.latency_ms)
+    try:
+        asyncio.run(standin.serve(server, args.stats))
+    except KeyboardInterrupt:
+        print('\n⏹️  Stopped')
+    print('\n'.join(standin.stats_lines(server.stats())))
+    return 0
+
+
+def synth(args):
+    start = time.perf_counter()
+    rows = synthetic.write_run(args.out, synthetic.parse_count(args.rows),
+                               rate=args.rate, seed=args.seed)
+    print(f"🧪 Wrote {rows:,} points to {args.out} ({os.path.getsize(args.out) / 1e6:,.0f} MB) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def run_bench(args):
+    """Run the stage benchmarks, store them and flag regressions against earlier runs"""
+    sizes = [synthetic.parse_count(size) for size in args.rows.split(',') if size.strip()]
+    rows = bench.run_suite(sizes, args.stages, args.data_dir, args.seed)
+    store = bench.BenchStore(args.db)
+    try:
+        run_id = None if args.no_record else store.record(rows, bench.record_sha(), args.label)
+        compared = bench.compare_runs(rows, store, run_id)
+    finally:
+        store.close()
+    print()
+    print('\n'.join(bench.format_bench(compared)))
+    if run_id is not None:
+        print(f"\n💾 Recorded benchmark #{run_id} in {args.db}")
+    regressed = [row['stage'] for row in compared if row['regressed']]
+    if regressed:
+        print(f"⚠️  Slower or heavier than the last {bench.BASELINE_RUNS} runs: {', '.join(regressed)}")
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+def main(argv=None):
+    argv = profiling.setup_from_argv(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ['summary']:
+        from .summary import main as summary
+        return summary(argv[1:])
+    # `render` is the default command
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'render')
+    args = build_parser().parse_args(argv)
+    if args.command == 'verdict':
+        return verdict(args)
+    if args.command == 'latency':
+        return latency(args)
+    if args.command == 'fanout':
+        return run_fanout(args)
+    if args.command == 'coldstart':
+        return run_coldstart(args)
+    if args.command == 'capacity':
+        return run_capacity(args)
+    if args.command == 'partitions':
+        return run_partitions(args)
+    if args.command == 'plan':
+        return run_plan(args)
+    if args.command == 'authcache':
+        return authcache(args)
+    if args.command == 'report':
+        return report(args)
+    if args.command == 'batch':
+        return run_batch(args)
+    if args.command == 'record':
+        return record(args)
+    if args.command == 'history':
+        return list_history(args)
+    if args.command == 'compare':
+        return compare(args)
+    if args.command == 'loadgen':
+        return loadgen(args)
+    if args.command == 'standin':
+        return run_standin(args)
+    if args.command == 'synth':
+        return synth(args)
+    if args.command == 'bench':
+        return run_bench(args)
+
+    if args.list:
+        for figure in figures.FIGURES.values():
+            print(f"{figure.name:<22} {figure.output:<36} {figure.script}")
+        return 0
+
+    unknown = [name for name in args.figures if name not in figures.FIGURES]
+    if unknown:
+        print(f"❌ Unknown figure(s): {', '.join(unknown)}")
+        return 2
+    _, failed = render(args.figures, args.input_dir, args.output_dir, args.jobs, args.force)
+    return 1 if failed else 0
@@ -0,0 +1,295 @@
+"""
+Cold start vs warm execution vs gateway decomposition of request latency
+Lambda logs a REPORT line (or a platform.report record) per invocation with
+its Duration, Billed Duration, Max Memory Used and, for the first invocation
+after INIT_START, the Init Duration of the cold start. The invocations of
+each function in the SAM template are joined by time to the k6 samples of the
+operation routed to it: a request matches the invocation that ran inside its
+send/receive window. Whatever the invocation does not explain is gateway
+overhead (API Gateway, authorizer, network), so every matched request splits
+into gateway + execution + init
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .logs import is_init_start, iter_log_events, report_metrics
+
+DEFAULT_TEMPLATE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'template.yaml')
+
+# k6 Trend of each API operation and the (method, path) route it calls
+OPERATION_ROUTES = {
+    'create_product_latency': ('POST', '/product'),
+    'get_products_latency': ('GET', '/products'),
+    'create_order_latency': ('POST', '/order'),
+    'get_orders_latency': ('GET', '/orders'),
+    'registration_latency': ('POST', '/registration'),
+}
+
+# Allowed clock difference between the k6 host and Lambda
+DEFAULT_SKEW_MS = 50.0
+
+COMPONENTS = ('gateway_ms', 'execution_ms', 'init_ms')
+
+# Matching rounds for requests that lost their nearest invocation to another
+MATCH_PASSES = 4
+
+_MARKERS = ('REPORT RequestId', 'INIT_START', 'platform.report', 'platform.initStart')
+_FUNCTION = re.compile(r'^  (\w+):\n    Type: AWS::Serverless::Function\n(.*?)(?=^  \w+:\n|\Z)',
+                       re.M | re.S)
+_ROUTE = re.compile(r'Path:\s*"?([^",\s}]+)"?\s*,?\s*Method:\s*(\w+)')
+_FUNCTION_NAME = re.compile(r'FunctionName:\s*(\S+)')
+_LOG_SUFFIXES = ('.gz', '.log', '.txt', '.json', '.ndjson')
+
+
+def template_functions(template=DEFAULT_TEMPLATE):
+    """{logical id: {'name': FunctionName or None, 'routes': [(METHOD, path)]}}"""
+    with open(template, encoding='utf-8') as f:
+        source = f.read()
+    functions = {}
+    for logical_id, body in _FUNCTION.findall(source):
+        name = _FUNCTION_NAME.search(body)
+        functions[logical_id] = {
+            'name': name.group(1) if name else None,
+            'routes': [(method.upper(), path) for path, method in _ROUTE.findall(body)],
+        }
+    return functions
+
+
+def operation_functions(functions, operations=OPERATION_ROUTES):
+    """{k6 operation metric: logical id of the function serving its route}"""
+    by_route = {route: logical_id for logical_id, function in functions.items()
+                for route in function['routes']}
+    return {metric: by_route[route] for metric, route in operations.items() if route in by_route}
+
+
+def function_for_file(filename, functions):
+    """Logical id a log file belongs to: `Function=path`, or the id in its file name
+
+    Physical function names are `<stack>-<LogicalId>-<suffix>`, so a log file
+    named after the log group also resolves.
+    """
+    stem = os.path.basename(filename)
+    while stem.endswith(_LOG_SUFFIXES):
+        stem = os.path.splitext(stem)[0]
+    lowered = stem.lower()
+    for logical_id in sorted(functions, key=len, reverse=True):
+        names = (logical_id, functions[logical_id]['name'] or logical_id)
+        if any(name.lower() in lowered for name in names):
+            return logical_id
+    return stem
+
+
+def log_sources(paths, functions):
+    """[(function, filename)] from `Function=path` arguments, files and directories"""
+    sources = []
+    for path in paths:
+        function, _, filename = path.rpartition('=') if '=' in path else ('', '', path)
+        if os.path.isdir(filename):
+            filenames = sorted(os.path.join(filename, name) for name in os.listdir(filename))
+        else:
+            filenames = [filename]
+        for name in filenames:
+            sources.append((function or function_for_file(name, functions), name))
+    return sources
+
+
+def parse_reports(sources):
+    """(invocations, environments) from (function, log file) pairs
+
+    invocations: function, stream, request_id, end_ms, start_ms, duration_ms,
+    billed_ms, init_ms (NaN when warm), memory_mb, max_memory_mb, cold.
+    environments: INIT_START count per function.
+    """
+    rows = []
+    environments = {}
+    for function, filename in sources:
+        for event in iter_log_events(filename, _MARKERS):
+            if is_init_start(event):
+                environments[function] = environments.get(function, 0) + 1
+                continue
+            metrics = report_metrics(event)
+            if not metrics or 'duration_ms' not in metrics or event.time is None:
+                continue
+            rows.append((function, event.stream, event.request_id, float(event.time),
+                         metrics['duration_ms'], metrics.get('billed_ms', np.nan),
+                         metrics.get('init_ms', np.nan), metrics.get('memory_mb', np.nan),
+                         metrics.get('max_memory_mb', np.nan)))
+    invocations = pd.DataFrame(rows, columns=['function', 'stream', 'request_id', 'end_ms',
+                                              'duration_ms', 'billed_ms', 'init_ms', 'memory_mb',
+                                              'max_memory_mb'])
+    invocations['cold'] = invocations['init_ms'].notna()
+    invocations['start_ms'] = (invocations['end_ms'] - invocations['duration_ms']
+                               - invocations['init_ms'].fillna(0.0))
+    return invocations, pd.Series(environments, dtype=float, name='environments')
+
+
+def function_summary(invocations, environments=None):
+    """Invocations, cold start share, init/duration percentiles and memory per function"""
+    rows = []
+    for function, data in invocations.groupby('function', sort=True):
+        init = data['init_ms'].dropna()
+        rows.append({
+            'function': function,
+            'invocations': len(data),
+            'environments': int(environments.get(function, 0)) if environments is not None else 0,
+            'cold': int(data['cold'].sum()),
+            'cold_share': float(data['cold'].mean()),
+            'init_p50': init.median() if len(init) else np.nan,
+            'init_p95': init.quantile(0.95) if len(init) else np.nan,
+            'duration_p50': data['duration_ms'].median(),
+            'duration_p95': data['duration_ms'].quantile(0.95),
+            'billed_p50': data['billed_ms'].median(),
+            'memory_mb': data['memory_mb'].max(),
+            'max_memory_mb': data['max_memory_mb'].max(),
+        })
+    return pd.DataFrame(rows)
+
+
+def operation_requests(frames, operations=OPERATION_ROUTES):
+    """k6 samples of the operation trends: operation, send_ms, recv_ms, latency_ms, resolution_ms
+
+    k6 stamps a sample when the response arrives; CSV runs only keep whole
+    seconds, which widens the match window by `resolution_ms`.
+    """
+    parts = []
+    for df in frames:
+        points = df[df['metric_name'].isin(list(operations))]
+        if points.empty:
+            continue
+        recv = points['datetime'].values.astype('datetime64[ns]').view(np.int64) / 1e6
+        part = pd.DataFrame({'operation': points['metric_name'].astype(str).values,
+                             'recv_ms': recv,
+                             'latency_ms': points['metric_value'].values.astype(np.float64)})
+        part['resolution_ms'] = 1000.0 if np.all(recv % 1000 == 0) else 0.0
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=['operation', 'send_ms', 'recv_ms', 'latency_ms',
+                                     'resolution_ms'])
+    requests = pd.concat(parts, ignore_index=True)
+    requests['send_ms'] = requests['recv_ms'] - requests['latency_ms']
+    return requests
+
+
+def _match_pass(requests, invocations, skew_ms):
+    """One nearest-midpoint matching round: the closest fitting request per invocation"""
+    merged = pd.merge_asof(requests, invocations, on='mid_ms', direction='nearest')
+    slack = skew_ms + merged['resolution_ms']
+    fits = ((merged['start_ms'] >= merged['send_ms'] - slack)
+            & (merged['end_ms'] <= merged['recv_ms'] + slack))
+    # merge_asof keeps only the left key, so the distance comes from the bounds
+    merged['distance'] = ((merged['start_ms'] + merged['end_ms']) / 2
+                          - merged['mid_ms']).abs().where(fits)
+    return (merged.dropna(subset=['distance']).sort_values('distance')
+            .drop_duplicates('invocation_key'))
+
+
+def join_requests(requests, invocations, functions_by_operation, skew_ms=DEFAULT_SKEW_MS):
+    """Requests with their matched invocation and the gateway/execution/init split
+
+    Each request is paired with the invocation whose midpoint is nearest to
+    its own, provided the invocation fits inside the request window (plus
+    clock skew and timestamp resolution). An invocation serves one request at
+    most; requests without a match keep NaN components.
+    """
+    joined = []
+    for operation, function in functions_by_operation.items():
+        req = requests[requests['operation'] == operation].copy()
+        if req.empty:
+            continue
+        req['function'] = function
+        req['request_key'] = np.arange(len(req))
+        req['mid_ms'] = (req['send_ms'] + req['recv_ms']) / 2
+        inv = invocations[invocations['function'] == function]
+        inv = inv.assign(mid_ms=(inv['start_ms'] + inv['end_ms']) / 2,
+                         invocation_key=np.arange(len(inv)))
+        inv = inv.sort_values('mid_ms')[['mid_ms', 'invocation_key', 'start_ms', 'end_ms',
+                                         'duration_ms', 'init_ms', 'cold']]
+
+        # Concurrent requests can share a nearest invocation; losers retry on the rest
+        pairs, pending = [], req.sort_values('mid_ms')
+        for _ in range(MATCH_PASSES):
+            if pending.empty or inv.empty:
+                break
+            best = _match_pass(pending, inv, skew_ms)
+            if best.empty:
+                break
+            pairs.append(best)
+            pending = pending[~pending['request_key'].isin(best['request_key'])]
+            inv = inv[~inv['invocation_key'].isin(best['invocation_key'])]
+        pairs = (pd.concat(pairs) if pairs else
+                 pd.DataFrame(columns=['request_key', 'duration_ms', 'init_ms', 'cold']))
+        req = req.merge(pairs[['request_key', 'duration_ms', 'init_ms', 'cold']],
+                        on='request_key', how='left')
+        req['matched'] = req['duration_ms'].notna()
+        req['cold'] = req['cold'].fillna(False).astype(bool)
+        joined.append(req)
+    if not joined:
+        return pd.DataFrame(columns=['operation', 'function', 'latency_ms', 'matched', 'cold']
+                            + list(COMPONENTS))
+    joined = pd.concat(joined, ignore_index=True)
+    joined['execution_ms'] = joined['duration_ms']
+    joined['init_ms'] = np.where(joined['matched'], joined['init_ms'].fillna(0.0), np.nan)
+    joined['gateway_ms'] = (joined['latency_ms'] - joined['execution_ms']
+                            - joined['init_ms']).clip(lower=0)
+    return joined[['operation', 'function', 'send_ms', 'recv_ms', 'latency_ms', 'matched', 'cold']
+                  + list(COMPONENTS)]
+
+
+def breakdown(joined):
+    """Mean gateway/execution/init ms per operation, warm and cold requests apart
+
+    Means are used so the stacked components add up to the mean latency.
+    """
+    rows = []
+    for operation, data in joined.groupby('operation', sort=False):
+        matched = data[data['matched']]
+        for start, part in (('warm', matched[~matched['cold']]), ('cold', matched[matched['cold']])):
+            if part.empty:
+                continue
+            row = {'operation': operation, 'function': data['function'].iloc[0], 'start': start,
+                   'requests': len(part), 'matched_share': len(matched) / len(data)}
+            for component in COMPONENTS:
+                row[component] = part[component].mean()
+            row['latency_mean'] = part['latency_ms'].mean()
+            row['latency_p50'] = part['latency_ms'].median()
+            row['latency_p95'] = part['latency_ms'].quantile(0.95)
+            rows.append(row)
+    return pd.DataFrame(rows, columns=['operation', 'function', 'start', 'requests',
+                                       'matched_share', *COMPONENTS, 'latency_mean',
+                                       'latency_p50', 'latency_p95'])
+
+
+def latency_breakdown(frames, log_paths, template=DEFAULT_TEMPLATE, skew_ms=DEFAULT_SKEW_MS):
+    """(breakdown, function summary, joined requests) for k6 frames and Lambda logs"""
+    functions = template_functions(template)
+    invocations, environments = parse_reports(log_sources(log_paths, functions))
+    requests = operation_requests(frames)
+    joined = join_requests(requests, invocations, operation_functions(functions), skew_ms)
+    return breakdown(joined), function_summary(invocations, environments), joined
+
+
+def format_breakdown(table, summary):
+    """Human-readable function summary and per-operation breakdown"""
+    lines = [f"{'Function':<28}{'Invocations':>12}{'Cold':>7}{'Init p50':>10}{'Init p95':>10}"
+             f"{'Dur p50':>9}{'Dur p95':>9}{'Memory':>12}"]
+    for row in summary.to_dict('records'):
+        init = (f"{row['init_p50']:>8.0f}ms{row['init_p95']:>8.0f}ms"
+                if not np.isnan(row['init_p50']) else f"{'-':>10}{'-':>10}")
+        memory = (f"{row['max_memory_mb']:.0f}/{row['memory_mb']:.0f}MB"
+                  if not np.isnan(row['memory_mb']) else '-')
+        lines.append(f"{row['function']:<28}{row['invocations']:>12,}{row['cold']:>7,}{init}"
+                     f"{row['duration_p50']:>7.0f}ms{row['duration_p95']:>7.0f}ms{memory:>12}")
+    lines.append('')
+    lines.append(f"{'Operation':<24}{'Start':<6}{'Requests':>9}{'Matched':>9}{'Gateway':>9}"
+                 f"{'Exec':>8}{'Init':>8}{'Mean':>8}{'p95':>8}")
+    for row in table.to_dict('records'):
+        lines.append(f"{row['operation']:<24}{row['start']:<6}{row['requests']:>9,}"
+                     f"{row['matched_share'] * 100:>8.0f}%{row['gateway_ms']:>7.0f}ms"
+                     f"{row['execution_ms']:>6.0f}ms{row['init_ms']:>6.0f}ms"
+                     f"{row['latency_mean']:>6.0f}ms{row['latency_p95']:>6.0f}ms")
+    return lines
@@ -0,0 +1,180 @@
+"""
+Shard fan-out latency model for getAllProducts / getAllOrders
+Both list operations query every shard of the tenant in parallel
+(allShardsForTenant, 10 shards) and wait for the slowest one, so the read
+latency is an overhead plus the maximum of N per-shard query times. With F
+the per-shard latency distribution, that maximum has distribution F^N and its
+q-quantile is F^-1(q^(1/N)), read straight off a latency sketch of measured
+shard timings. Sweeping N shows the p50/p99 cost of each extra shard
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .sketch import LatencySketch
+
+# allShardsForTenant(tenantId) default range: shards 1..10
+CURRENT_SHARDS = 10
+DEFAULT_SHARD_COUNTS = tuple(range(1, 21))
+REPORT_QUANTILES = (0.50, 0.95, 0.99)
+
+# k6 trends of the list operations in crud-latency-results.csv
+READ_METRICS = {'getAllProducts': 'get_products_latency', 'getAllOrders': 'get_orders_latency'}
+
+# Stand-in per-shard query time (lognormal) when no logs are available
+STANDIN_MEDIAN_MS = 45.0
+STANDIN_SIGMA = 0.45
+
+_JSON_START = re.compile(r'\{"event":\s*"shard_query"')
+
+
+def parse_shard_log(lines):
+    """Frame of `shard_query` records (LOG_SHARD_TIMINGS=true) in Lambda log lines
+
+    Accepts raw CloudWatch lines ("<time>\\t<request id>\\tINFO\\t{...}") as
+    well as exported JSON events whose "message" holds the record.
+    """
+    records = []
+    decoder = json.JSONDecoder()
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        if line.startswith('{"') and '"message"' in line:
+            try:
+                line = json.loads(line).get('message', '')
+            except ValueError:
+                pass
+        match = _JSON_START.search(line)
+        if not match:
+            continue
+        try:
+            record, _ = decoder.raw_decode(line[match.start():])
+        except ValueError:
+            continue
+        records.append(record)
+    frame = pd.DataFrame(records, columns=['table', 'shardId', 'durationMs', 'items'])
+    frame['durationMs'] = pd.to_numeric(frame['durationMs'], errors='coerce')
+    frame['items'] = pd.to_numeric(frame['items'], errors='coerce')
+    return frame.dropna(subset=['durationMs'])
+
+
+def load_shard_logs(filenames):
+    """parse_shard_log over several log files"""
+    frames = []
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            frames.append(parse_shard_log(f))
+    return pd.concat(frames, ignore_index=True) if frames else parse_shard_log([])
+
+
+def standin_shard_timings(count=20000, median_ms=STANDIN_MEDIAN_MS, sigma=STANDIN_SIGMA, seed=0):
+    """Lognormal per-shard timings for planning without measured logs"""
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(np.log(median_ms), sigma, count)
+
+
+class ItemScaling:
+    """Least-squares fit durationMs = intercept + slope * items"""
+
+    def __init__(self, intercept, slope, total_items):
+        self.intercept = intercept
+        self.slope = slope
+        self.total_items = total_items
+
+    @classmethod
+    def fit(cls, timings, current_shards=CURRENT_SHARDS):
+        """Fit on logged timings; None without enough item counts or a positive slope"""
+        data = timings.dropna(subset=['items'])
+        if len(data) < 10 or data['items'].nunique() < 2:
+            return None
+        slope, intercept = np.polyfit(data['items'].values, data['durationMs'].values, 1)
+        if slope <= 0:
+            return None
+        return cls(float(intercept), float(slope), float(data['items'].mean()) * current_shards)
+
+    def shift_ms(self, shards, current_shards=CURRENT_SHARDS):
+        """Change in per-shard time when the tenant's items spread over `shards`"""
+        return self.slope * (self.total_items / shards - self.total_items / current_shards)
+
+
+def fanout_quantiles(sketch, shards, quantiles=REPORT_QUANTILES):
+    """Quantiles of the max of `shards` independent draws from the sketch"""
+    return sketch.quantiles([q ** (1.0 / shards) for q in quantiles])
+
+
+def sweep(durations, shard_counts=DEFAULT_SHARD_COUNTS, quantiles=REPORT_QUANTILES,
+          overhead_ms=0.0, scaling=None):
+    """Frame of predicted read latency quantiles per shard count
+
+    `overhead_ms` is added to every prediction (API Gateway, authorizer,
+    Lambda). With an ItemScaling, per-shard times move with the items per
+    shard as the shard count changes.
+    """
+    sketch = LatencySketch().add_many(durations)
+    rows = []
+    for shards in shard_counts:
+        shift = scaling.shift_ms(shards) if scaling else 0.0
+        row = {'shards': shards, 'per_shard_p50': sketch.quantile(0.5) + shift}
+        for q, value in zip(quantiles, fanout_quantiles(sketch, shards, quantiles)):
+            row[f'p{q * 100:g}'] = value + shift + overhead_ms
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def calibrate_overhead(durations, observed_p50, shards=CURRENT_SHARDS):
+    """Overhead that makes the model's p50 match an observed end-to-end p50"""
+    predicted = fanout_quantiles(LatencySketch().add_many(durations), shards, (0.5,))[0]
+    return max(0.0, float(observed_p50 - predicted))
+
+
+def observed_read_p50(crud_file, operation='getAllProducts'):
+    """p50 of a list operation's k6 trend in a CRUD results file, or None"""
+    from .loaders import load_run
+    from .sketch import frame_sketches
+
+    if not crud_file or not os.path.exists(crud_file):
+        return None
+    sketch = frame_sketches(load_run(crud_file)).get(READ_METRICS[operation])
+    return sketch.quantile(0.5) if sketch is not None and sketch.count else None
+
+
+def format_sweep(table, current_shards=CURRENT_SHARDS):
+    """Human-readable sweep table, marking the current shard count"""
+    columns = [column for column in table.columns if column.startswith('p')
+               and column != 'per_shard_p50']
+    lines = [f"{'Shards':>7}{'Shard p50':>11}" + ''.join(f"{column:>9}" for column in columns)]
+    for row in table.to_dict('records'):
+        marker = '  ◀ current' if row['shards'] == current_shards else ''
+        lines.append(f"{row['shards']:>7}{row['per_shard_p50']:>10.0f} "
+                     + ''.join(f"{row[column]:>9.0f}" for column in columns) + marker)
+    return lines
+
+
+def create_sweep_chart(table, output_file='shard_fanout_sweep.png', current_shards=CURRENT_SHARDS,
+                       title='getAllProducts'):
+    """Line chart of predicted p50/p95/p99 read latency vs shard count"""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    colors = {'p50': '#3498DB', 'p95': '#F39C12', 'p99': '#E74C3C'}
+    for column, color in colors.items():
+        if column in table:
+            ax.plot(table['shards'], table[column], marker='o', color=color, linewidth=2,
+                    label=f'{column} read latency')
+    ax.axvline(current_shards, color='gray', linestyle='--', alpha=0.7,
+               label=f'current ({current_shards} shards)')
+    ax.set_xlabel('Shards per tenant')
+    ax.set_ylabel('Predicted latency (ms)')
+    ax.set_title(f'{title}: fan-out latency vs shard count (max of N shard queries)',
+                 fontweight='bold')
+    ax.grid(alpha=0.3)
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {output_file}")
+    return output_file
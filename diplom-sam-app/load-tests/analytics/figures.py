@@ -0,0 +1,299 @@
+"""
+Figure registry for the chart rendering pipeline
+Each figure names the visualize script and function that draws it, the inputs
+it needs and its default output file. Inputs are loaded once per run and
+shared with the render workers
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+
+from .profiling import instrument_savefig, stage
+from .results import DEFAULT_RESULTS_FILE
+
+# Directory holding the visualize-*.py / visualize_*.py scripts
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# k6 result files the figures are drawn from
+NOISY_CSV_FILE = 'noisy-neighbor-results.csv'
+CRUD_RESULTS_FILE = 'crud-latency-results.csv'
+# Lambda logs, one file per function named after it (analytics.coldstart)
+LAMBDA_LOGS_DIR = 'lambda-logs'
+
+INPUT_FILES = {
+    'results': DEFAULT_RESULTS_FILE,
+    'noisy_frame': NOISY_CSV_FILE,
+    'crud_frame': CRUD_RESULTS_FILE,
+    'lambda_logs': LAMBDA_LOGS_DIR,
+}
+
+
+class FigureData:
+    """Inputs of one report run, loaded once and shared with the workers"""
+
+    def __init__(self, input_dir='.', output_dir='.'):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.results = None
+        self.crud_results = None
+        self._frames = {}
+        self._verdicts = None
+        self._breakdown = None
+
+    def path(self, name):
+        return os.path.join(self.input_dir, INPUT_FILES[name])
+
+    def available(self, name):
+        return os.path.exists(self.path(name))
+
+    def load(self):
+        """Load the results models and warm the frame cache for the CSV inputs"""
+        from .results import load_results
+
+        if self.available('results'):
+            self.results = load_results(self.path('results'))
+        if self.available('crud_frame'):
+            self.crud_results = load_results(self.path('crud_frame'))
+        for name in ('noisy_frame', 'crud_frame'):
+            if self.available(name):
+                self.frame(name)
+        return self
+
+    def frame(self, name):
+        """Point frame of a CSV input, served from the run cache"""
+        if name not in self._frames:
+            from .loaders import load_csv
+            self._frames[name] = load_csv(self.path(name))
+        return self._frames[name]
+
+    def input_digest(self, name):
+        """Content hash of an input file (or of every file of an input directory)"""
+        from .cache import open_cache
+
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        if not os.path.isdir(path):
+            return open_cache(path).content_hash(path)
+        digest = hashlib.blake2b(digest_size=16)
+        for root, _, files in sorted(os.walk(path)):
+            for filename in sorted(files):
+                member = os.path.join(root, filename)
+                digest.update(os.path.relpath(member, path).encode())
+                digest.update(open_cache(member).content_hash(member).encode())
+        return digest.hexdigest()
+
+    def verdicts(self):
+        """Isolation verdicts of the results file (computed on first use)"""
+        if self._verdicts is None:
+            from .verdict import evaluate_run
+            self._verdicts = evaluate_run(self.path('results'))
+        return self._verdicts
+
+    def latency_breakdown(self):
+        """Cold/warm/gateway breakdown per operation from lambda-logs, or None without logs"""
+        if self._breakdown is None and self.available('lambda_logs'):
+            from .coldstart import latency_breakdown
+            from .loaders import load_run
+            # CRUD trends plus registration_latency of the main results file
+            frames = [self.frame('crud_frame')] if self.available('crud_frame') else []
+            if self.available('results'):
+                frames.append(load_run(self.path('results')))
+            self._breakdown = latency_breakdown(frames, [self.path('lambda_logs')])[0]
+        return self._breakdown
+
+    def __getstate__(self):
+        # Frames are re-opened from the mmap cache instead of being pickled
+        state = dict(self.__dict__)
+        state['_frames'] = {}
+        return state
+
+
+class Figure:
+    """One chart: drawing function, required inputs and output file"""
+
+    def __init__(self, name, script, draw, inputs, output, fingerprint=None):
+        self.name = name
+        self.script = script
+        self.draw = draw
+        self.inputs = inputs
+        self.output = output
+        self.fingerprint = fingerprint
+
+    def data_key(self, data):
+        """What the figure is drawn from: its own fingerprint or the input file hashes"""
+        if self.fingerprint is not None:
+            return self.fingerprint(data)
+        return {name: data.input_digest(name) for name in self.inputs}
+
+    def missing(self, data):
+        """Input files this figure needs that do not exist"""
+        return [data.path(name) for name in self.inputs if not data.available(name)]
+
+
+def _tenant_digest(tenant):
+    return {'name': tenant.name, 'tier': tenant.tier, 'throttled': tenant.throttled,
+            'errors': tenant.errors, 'latency': tenant.latency.to_dict()}
+
+
+def _scenario_fingerprint(key):
+    # Only the aggregates of one scenario: other scenarios of a new run do not matter
+    def fingerprint(data):
+        result = data.results.scenarios.get(key)
+        return result and {role: _tenant_digest(getattr(result, role))
+                           for role in ('noisy', 'victim')}
+    return fingerprint
+
+
+def _results_fingerprint(data):
+    return {key: {role: _tenant_digest(getattr(result, role)) for role in ('noisy', 'victim')}
+            for key, result in data.results.scenarios.items()}
+
+
+def _file_digest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _breakdown_fingerprint(data):
+    # The breakdown reads lambda-logs, the CRUD and registration trends and the
+    # function routes of template.yaml
+    from .coldstart import DEFAULT_TEMPLATE
+
+    digest = {name: data.input_digest(name) for name in ('lambda_logs', 'crud_frame', 'results')}
+    digest['template'] = _file_digest(DEFAULT_TEMPLATE)
+    return digest
+
+
+def _load_test_summary_fingerprint(data):
+    # Verdicts also depend on the thresholds of the k6 script
+    from .verdict import DEFAULT_SCRIPT
+
+    return {'results': data.input_digest('results'), 'crud': data.input_digest('crud_frame'),
+            'script': _file_digest(DEFAULT_SCRIPT)}
+
+
+def _scenario(key):
+    def draw(module, data, output_file):
+        if key in data.results.scenarios:
+            module.create_scenario_chart(data.results[key], output_file)
+    return draw
+
+
+def _summary(module, data, output_file):
+    module.create_summary_chart(data.results, output_file)
+
+
+def _noisy_neighbor(module, data, output_file):
+    module.create_noisy_neighbor_chart(data.results, output_file)
+
+
+def _noisy_neighbor_charts(module, data, output_file):
+    module.create_visualizations(data.frame('noisy_frame'), output_file)
+
+
+def _rate_limiting(module, data, output_file):
+    module.create_rate_limiting_chart(data.frame('noisy_frame'), output_file)
+
+
+def _timeline(module, data, output_file):
+    module.create_timeline_chart(data.frame('noisy_frame'), output_file)
+
+
+def _latency(module, data, output_file):
+    module.create_latency_chart(data.frame('crud_frame'), output_file)
+
+
+def _registration(module, data, output_file):
+    module.create_registration_latency_chart(
+        output_file, data.latency_breakdown(),
+        module.registration_sketch(data.results, data.crud_results))
+
+
+def _latency_breakdown(module, data, output_file):
+    breakdown = data.latency_breakdown()
+    if breakdown is not None and not breakdown.empty:
+        module.create_latency_breakdown_chart(breakdown, output_file)
+
+
+def _load_test_summary(module, data, output_file):
+    module.create_combined_summary(data.results, data.crud_results, output_file,
+                                   verdicts=data.verdicts())
+
+
+FIGURES = {figure.name: figure for figure in (
+    Figure('scenario1', 'visualize_scenario.py', _scenario('basic_standard'),
+           ('results',), 'scenario1_basic_standard.png', _scenario_fingerprint('basic_standard')),
+    Figure('scenario2', 'visualize_scenario.py', _scenario('basic_platinum'),
+           ('results',), 'scenario2_basic_platinum.png', _scenario_fingerprint('basic_platinum')),
+    Figure('scenario3', 'visualize_scenario.py', _scenario('premium_premium'),
+           ('results',), 'scenario3_premium_premium.png',
+           _scenario_fingerprint('premium_premium')),
+    Figure('summary', 'visualize_summary.py', _summary,
+           ('results',), 'summary_all_scenarios.png', _results_fingerprint),
+    Figure('noisy-neighbor', 'visualize-noisy-neighbor.py', _noisy_neighbor,
+           ('results',), 'noisy-neighbor-results.png', _results_fingerprint),
+    Figure('noisy-neighbor-charts', 'visualize-results.py', _noisy_neighbor_charts,
+           ('noisy_frame',), 'noisy-neighbor-charts.png'),
+    Figure('rate-limiting', 'visualize-all.py', _rate_limiting,
+           ('noisy_frame',), 'rate-limiting-results.png'),
+    Figure('timeline', 'visualize-all.py', _timeline,
+           ('noisy_frame',), 'timeline-results.png'),
+    Figure('latency', 'visualize-all.py', _latency,
+           ('crud_frame',), 'latency-results.png'),
+    Figure('registration', 'visualize_all_results.py', _registration,
+           (), 'registration_latency_results.png', _breakdown_fingerprint),
+    Figure('latency-breakdown', 'visualize_all_results.py', _latency_breakdown,
+           ('crud_frame', 'lambda_logs'), 'latency_breakdown.png', _breakdown_fingerprint),
+    Figure('load-test-summary', 'visualize_all_results.py', _load_test_summary,
+           ('results',), 'load_test_summary.png', _load_test_summary_fingerprint),
+)}
+
+
+_modules = {}
+
+
+def load_script(script):
+    """Import a visualize script by file name (several contain dashes)"""
+    if script not in _modules:
+        if SCRIPTS_DIR not in sys.path:
+            sys.path.insert(0, SCRIPTS_DIR)
+        name = os.path.splitext(script)[0].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS_DIR, script))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _modules[script] = module
+    return _modules[script]
+
+
+_data = None
+
+
+def init_worker(data):
+    """Process pool initializer: Agg backend and the shared inputs"""
+    global _data
+    import matplotlib
+    matplotlib.use('Agg')
+    instrument_savefig()
+    _data = data
+
+
+def render_figure(name):
+    """Render one registered figure; returns (name, output_file, seconds)"""
+    import matplotlib.pyplot as plt
+
+    figure = FIGURES[name]
+    output_file = os.path.join(_data.output_dir, figure.output)
+    start = time.perf_counter()
+    try:
+        with stage(name):
+            figure.draw(load_script(figure.script), _data, output_file)
+    finally:
+        plt.close('all')
+    return name, output_file, time.perf_counter() - start
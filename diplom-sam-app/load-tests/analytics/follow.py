@@ -0,0 +1,146 @@
+"""
+Live tailing of in-progress k6 `--out json` runs
+The growing NDJSON file is read from the last byte offset on every poll, new
+Points are folded into the running RunAggregates and a terminal (and optional
+HTML) dashboard is refreshed, so a bad run can be aborted early
+"""
+
+import html
+import os
+import sys
+import time
+
+from .ingest import CHUNK_SIZE, IngestStats, RunAggregates, _ChunkBatch, fold_lines
+from .results import ISOLATION_THRESHOLD, LoadTestResults
+
+DEFAULT_INTERVAL = 3.0
+
+# k6 writes continuously while running; this long without growth means it is done
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+
+class FileTail:
+    """Reads complete lines appended to a file since the previous call"""
+
+    def __init__(self, filename, chunk_size=CHUNK_SIZE):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.remainder = b''
+        self.inode = None
+
+    def check(self):
+        """True if the file was replaced or truncated since the last read (reading restarts at 0)"""
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return False
+        restarted = False
+        if self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.offset):
+            self.offset = 0
+            self.remainder = b''
+            restarted = True
+        self.inode = stat.st_ino
+        return restarted
+
+    def read_chunks(self):
+        """Yield the complete lines of each chunk appended since the previous call
+
+        One chunk is held at a time, so starting on a large existing file
+        costs no more memory than following a small one.
+        """
+        try:
+            f = open(self.filename, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                lines = (self.remainder + chunk).split(b'\n')
+                # The last part may be a line k6 is still writing
+                self.remainder = lines.pop()
+                yield lines
+
+
+def follow_k6_json(filename, interval=DEFAULT_INTERVAL, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Yield (run, stats) every `interval` seconds while `filename` grows
+
+    Stops once the file has not grown for `idle_timeout` seconds (None waits
+    until interrupted). A replaced or truncated file starts a fresh run.
+    """
+    tail = FileTail(filename)
+    run, stats, batch = RunAggregates(), IngestStats(), _ChunkBatch()
+    started = last_growth = time.monotonic()
+
+    while True:
+        if tail.check():
+            run, stats, batch = RunAggregates(), IngestStats(), _ChunkBatch()
+        for lines in tail.read_chunks():
+            last_growth = time.monotonic()
+            stats.bytes = tail.offset
+            fold_lines(lines, run, batch, stats)
+            batch.flush(run)
+        stats.elapsed = time.monotonic() - started
+        yield run, stats
+
+        if idle_timeout is not None and time.monotonic() - last_growth > idle_timeout:
+            return
+        time.sleep(interval)
+
+
+def dashboard_lines(results, run, stats):
+    """Plain-text dashboard rows for the current state of a run"""
+    lines = [f"📡 {results.source}  {run.start or '-'} → {run.end or '-'}",
+             f"   {stats}", '']
+    lines.append(f"{'Scenario':<22}{'Role':<8}{'Tenant':<20}{'Requests':>10}"
+                 f"{'429':>8}{'Throttle':>10}{'p95 ms':>10}")
+    for result in results:
+        for tenant in (result.noisy, result.victim):
+            lines.append(f"{result.scenario.title:<22}{tenant.role:<8}{str(tenant.name):<20}"
+                         f"{tenant.requests:>10,}{tenant.throttled:>8,}"
+                         f"{tenant.throttle_rate:>9.1f}%{tenant.latency.quantile(0.95):>10.0f}")
+    affected = [r for r in results if r.victim.requests and not r.isolated]
+    lines.append('')
+    if affected:
+        for result in affected:
+            lines.append(f"⚠️  {result.scenario.title}: victim throttled "
+                         f"{result.victim.throttle_rate:.1f}% (> {ISOLATION_THRESHOLD:.0f}%)"
+                         f" - consider aborting the run")
+    elif len(results):
+        lines.append('✅ All victims isolated so far')
+    else:
+        lines.append('⏳ Waiting for scenario data...')
+    return lines
+
+
+def write_html_dashboard(path, lines, interval=DEFAULT_INTERVAL):
+    """Self-refreshing HTML page with the dashboard text"""
+    body = html.escape('\n'.join(lines))
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{max(1, round(interval))}">
+<title>k6 live results</title>
+<style>body {{ font-family: monospace; background: #f8f9fa; padding: 1em; }}</style>
+</head><body><pre>{body}</pre></body></html>
+""")
+    os.replace(tmp, path)
+
+
+def follow(filename, interval=DEFAULT_INTERVAL, idle_timeout=DEFAULT_IDLE_TIMEOUT, html_file=None):
+    """Tail a running k6 JSON output with a live dashboard; returns the final RunAggregates"""
+    clear = '\033[H\033[2J' if sys.stdout.isatty() else ''
+    run = RunAggregates()
+    try:
+        for run, stats in follow_k6_json(filename, interval, idle_timeout):
+            lines = dashboard_lines(LoadTestResults.from_aggregates(run, source=filename), run, stats)
+            print(clear + '\n'.join(lines), flush=True)
+            if html_file:
+                write_html_dashboard(html_file, lines, interval)
+    except KeyboardInterrupt:
+        print('\n⏹️  Stopped following')
+    return run
@@ -0,0 +1,325 @@
+"""
+Run history store and regression comparison
+Every recorded k6 run keeps its latency sketches (per operation and per
+scenario tenant) and throttle counts in a local SQLite database, keyed by git
+SHA and time. Two runs - or a run and a rolling baseline of merged earlier
+runs - are compared with bootstrap CIs of the p95/p99 shift and a
+two-proportion test on throttle rates
+"""
+
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import time
+
+from .results import LoadTestResults, REQUEST_METRIC
+from .sketch import LatencySketch
+from .verdict import BOOTSTRAP_SAMPLES, bootstrap_sketch_shift
+
+HISTORY_DB = os.environ.get('K6_HISTORY_DB') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'k6-history.sqlite')
+
+# Regression flags: significant at ALPHA and at least MIN_CHANGE slower
+ALPHA = 0.01
+MIN_CHANGE = 0.05
+COMPARE_QUANTILES = (0.95, 0.99)
+
+# Throttle rate increase (percentage points) worth flagging
+MIN_THROTTLE_CHANGE = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    git_sha TEXT,
+    label TEXT,
+    source TEXT,
+    content_hash TEXT UNIQUE,
+    started TEXT,
+    ended TEXT
+);
+CREATE TABLE IF NOT EXISTS sketches (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50 REAL, p95 REAL, p99 REAL,
+    sketch TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS throttles (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scenario TEXT NOT NULL,
+    role TEXT NOT NULL,
+    tenant TEXT,
+    tier TEXT,
+    requests INTEGER NOT NULL,
+    throttled INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    PRIMARY KEY (run_id, scenario, role)
+);
+CREATE INDEX IF NOT EXISTS runs_suite ON runs (suite, recorded_at);
+"""
+
+
+def current_git_sha(directory=None):
+    """Commit under test: $GIT_SHA / $GITHUB_SHA, else `git rev-parse HEAD`"""
+    sha = os.environ.get('GIT_SHA') or os.environ.get('GITHUB_SHA')
+    if sha:
+        return sha
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directory, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def suite_name(filename):
+    """Suite a result file belongs to (file name without extension)"""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+class RunSnapshot:
+    """Sketches and throttle counts of one recorded run (or a merged baseline)"""
+
+    def __init__(self, info, sketches, throttles):
+        self.info = info
+        self.sketches = sketches
+        self.throttles = throttles
+
+    @property
+    def label(self):
+        if 'merged' in self.info:
+            return f"baseline of {len(self.info['merged'])} runs"
+        sha = (self.info.get('git_sha') or '')[:8]
+        return f"#{self.info['id']} {sha} {self.info.get('label') or ''}".strip()
+
+    @classmethod
+    def merge(cls, snapshots):
+        """Rolling baseline: sketches and counts of several runs added together"""
+        sketches, throttles = {}, {}
+        for snapshot in snapshots:
+            for name, sketch in snapshot.sketches.items():
+                sketches.setdefault(name, LatencySketch()).merge(sketch)
+            for key, row in snapshot.throttles.items():
+                merged = throttles.setdefault(key, dict(row, requests=0, throttled=0, errors=0))
+                for field in ('requests', 'throttled', 'errors'):
+                    merged[field] += row[field]
+        info = {'merged': [snapshot.info['id'] for snapshot in snapshots]}
+        return cls(info, sketches, throttles)
+
+
+def results_sketches(results):
+    """{name: LatencySketch} recorded for a LoadTestResults
+
+    Scenario roles are recorded once, as http_req_duration/<scenario>/<role>;
+    the per-stream trends of the same requests are left out so compare does
+    not report (and count) each role twice.
+    """
+    sketches = {name: sketch for name, sketch in results.operations.items()
+                if name not in results.role_trends}
+    for result in results:
+        for tenant in (result.noisy, result.victim):
+            if tenant.requests:
+                sketches[f'{REQUEST_METRIC}/{result.key}/{tenant.role}'] = tenant.latency
+    return sketches
+
+
+class RunHistory:
+    """SQLite-backed history of recorded runs"""
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ---------- recording ----------
+
+    def record(self, results, suite, git_sha=None, label=None, content_hash=None, run=None):
+        """Store a LoadTestResults; returns (run_id, created)"""
+        if content_hash:
+            existing = self.db.execute('SELECT id FROM runs WHERE content_hash = ?',
+                                       (content_hash,)).fetchone()
+            if existing:
+                return existing['id'], False
+
+        with self.db:
+            cursor = self.db.execute(
+                'INSERT INTO runs (suite, recorded_at, git_sha, label, source, content_hash,'
+                ' started, ended) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (suite, time.time(), git_sha, label, results.source, content_hash,
+                 run.start if run else None, run.end if run else None))
+            run_id = cursor.lastrowid
+            for name, sketch in results_sketches(results).items():
+                p50, p95, p99 = (sketch.quantiles([0.50, 0.95, 0.99]).tolist()
+                                 if sketch.count else (None, None, None))
+                self.db.execute(
+                    'INSERT INTO sketches (run_id, name, count, p50, p95, p99, sketch)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, name, sketch.count, p50, p95, p99, json.dumps(sketch.to_dict())))
+            for result in results:
+                for tenant in (result.noisy, result.victim):
+                    self.db.execute(
+                        'INSERT INTO throttles (run_id, scenario, role, tenant, tier, requests,'
+                        ' throttled, errors) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (run_id, result.key, tenant.role, tenant.name, tenant.tier,
+                         tenant.requests, tenant.throttled, tenant.errors))
+        return run_id, True
+
+    # ---------- queries ----------
+
+    def runs(self, suite=None, limit=None):
+        """Run rows, newest first"""
+        query = 'SELECT * FROM runs'
+        params = []
+        if suite:
+            query += ' WHERE suite = ?'
+            params.append(suite)
+        query += ' ORDER BY recorded_at DESC, id DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self.db.execute(query, params)]
+
+    def run_info(self, run_id):
+        row = self.db.execute('SELECT * FROM runs WHERE id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f'no recorded run #{run_id}')
+        return dict(row)
+
+    def snapshot(self, run_id):
+        info = self.run_info(run_id)
+        sketches = {row['name']: LatencySketch.from_dict(json.loads(row['sketch']))
+                    for row in self.db.execute('SELECT name, sketch FROM sketches WHERE run_id = ?',
+                                               (run_id,))}
+        throttles = {(row['scenario'], row['role']): dict(row)
+                     for row in self.db.execute('SELECT * FROM throttles WHERE run_id = ?',
+                                                (run_id,))}
+        return RunSnapshot(info, sketches, throttles)
+
+    def previous_runs(self, run_id, count):
+        """Up to `count` runs of the same suite recorded before run_id"""
+        info = self.run_info(run_id)
+        rows = self.db.execute(
+            'SELECT id FROM runs WHERE suite = ? AND (recorded_at < ? OR'
+            ' (recorded_at = ? AND id < ?)) ORDER BY recorded_at DESC, id DESC LIMIT ?',
+            (info['suite'], info['recorded_at'], info['recorded_at'], run_id, count))
+        return [row['id'] for row in rows]
+
+    def baseline(self, run_id, count):
+        """Rolling baseline merged from the `count` runs before run_id"""
+        previous = self.previous_runs(run_id, count)
+        if not previous:
+            return None
+        return RunSnapshot.merge([self.snapshot(previous_id) for previous_id in previous])
+
+
+# ---------- comparison ----------
+
+def _proportion_test(base_hits, base_total, new_hits, new_total):
+    """Two-sided two-proportion z-test p-value"""
+    if base_total == 0 or new_total == 0:
+        return float('nan')
+    pooled = (base_hits + new_hits) / (base_total + new_total)
+    variance = pooled * (1 - pooled) * (1 / base_total + 1 / new_total)
+    if variance <= 0:
+        return 1.0
+    z = (new_hits / new_total - base_hits / base_total) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def compare_snapshots(base, new, alpha=ALPHA, min_change=MIN_CHANGE,
+                      quantiles=COMPARE_QUANTILES, samples=BOOTSTRAP_SAMPLES):
+    """Latency and throttle comparison rows; rows with 'regression' True are flagged
+
+    A latency quantile regresses when the bootstrap CI (1 - alpha) of its shift
+    lies entirely above zero and the change exceeds min_change. Throttle rates
+    regress when they rise by MIN_THROTTLE_CHANGE points with p < alpha.
+    """
+    rows = []
+    for name in sorted(set(base.sketches) & set(new.sketches)):
+        base_sketch, new_sketch = base.sketches[name], new.sketches[name]
+        if not base_sketch.count or not new_sketch.count:
+            continue
+        for q in quantiles:
+            shift, low, high = bootstrap_sketch_shift(base_sketch, new_sketch, q, samples,
+                                                      confidence=1 - alpha)
+            before = base_sketch.quantile(q)
+            change = shift / before if before else float('nan')
+            rows.append({
+                'kind': 'latency',
+                'name': name,
+                'statistic': f'p{q * 100:g}',
+                'base': before,
+                'new': new_sketch.quantile(q),
+                'change': change,
+                'ci': [low, high],
+                'regression': bool(low > 0 and change > min_change),
+                'improvement': bool(high < 0 and change < -min_change),
+            })
+
+    for key in sorted(set(base.throttles) & set(new.throttles)):
+        b, n = base.throttles[key], new.throttles[key]
+        base_rate = b['throttled'] / b['requests'] * 100 if b['requests'] else 0.0
+        new_rate = n['throttled'] / n['requests'] * 100 if n['requests'] else 0.0
+        p_value = _proportion_test(b['throttled'], b['requests'], n['throttled'], n['requests'])
+        # Noisy tenants are meant to be throttled; only victims can regress
+        rows.append({
+            'kind': 'throttle',
+            'name': '/'.join(key),
+            'statistic': 'throttle %',
+            'base': base_rate,
+            'new': new_rate,
+            'change': new_rate - base_rate,
+            'p_value': p_value,
+            'regression': bool(key[1] == 'victim' and new_rate - base_rate > MIN_THROTTLE_CHANGE
+                               and p_value < alpha),
+            'improvement': False,
+        })
+    return rows
+
+
+def format_comparison(base, new, rows):
+    """Human-readable comparison table"""
+    lines = [f"🔍 {base.label}  →  {new.label}", '']
+    for row in rows:
+        flag = '❌ REGRESSION' if row['regression'] else ('✅ improved' if row['improvement'] else '')
+        if row['kind'] == 'latency':
+            low, high = row['ci']
+            lines.append(f"{row['name']:<48}{row['statistic']:>6} {row['base']:9.0f} → "
+                         f"{row['new']:7.0f} ms {row['change']:+7.1%}  "
+                         f"CI [{low:+.0f}, {high:+.0f}]  {flag}")
+        else:
+            lines.append(f"{row['name']:<48}{'429':>6} {row['base']:8.1f}% → {row['new']:6.1f}% "
+                         f"{row['change']:+6.1f}pp  p={row['p_value']:.2g}  {flag}")
+    regressions = sum(row['regression'] for row in rows)
+    lines += ['', f"❌ {regressions} regression(s)" if regressions else '✅ No significant regressions']
+    return lines
+
+
+def record_file(filename, history=None, git_sha=None, label=None, use_cache=True):
+    """Load a k6 result file and record it; returns (run_id, created)"""
+    from .cache import open_cache
+    from .ingest import RunAggregates
+    from .loaders import load_aggregates, load_csv
+
+    if os.path.splitext(filename)[1].lower() in ('.json', '.ndjson'):
+        run = load_aggregates(filename, use_cache)
+    else:
+        run = RunAggregates.from_frame(load_csv(filename, use_cache))
+    results = LoadTestResults.from_aggregates(run, source=os.path.abspath(filename))
+
+    history = history or RunHistory()
+    content_hash = open_cache(filename).content_hash(filename)
+    return history.record(results, suite_name(filename),
+                          git_sha or current_git_sha(os.path.dirname(os.path.abspath(filename))),
+                          label, content_hash, run)
@@ -0,0 +1,436 @@
+"""
+Self-contained interactive HTML report
+Request points are reduced to a pyramid of time buckets (1s, 5s, 15s, 1min)
+per tag group: request and 429 counts, exact min/max and p50/p95/p99 from
+sketch-bin histograms. Only the 1s level is computed from the samples;
+every coarser level re-aggregates the sparse histogram of the level below,
+so the cost is one pass over the points. Each level is embedded as its own
+JSON block and parsed by the page only when the zoom needs it, so a long
+soak opens from a single file without a server
+"""
+
+import html
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .ingest import _group_codes, _numeric_status
+from .results import REQUEST_METRIC
+from .sketch import N_BUCKETS, bucket_index, bucket_values
+
+# Bucket widths of the pyramid, finest first
+LEVELS = ('1s', '5s', '15s', '1min')
+REPORT_QUANTILES = (0.50, 0.95, 0.99)
+DEFAULT_GROUP_BY = 'role'
+DEFAULT_REPORT_FILE = 'load-test-report.html'
+
+
+class Level:
+    """One pyramid level: sparse (group, bucket) cells with counts and a latency histogram"""
+
+    def __init__(self, step_s, n_buckets, cells, requests, throttled, mins, maxs,
+                 hist_keys, hist_counts):
+        self.step_s = step_s
+        self.n_buckets = n_buckets
+        self.cells = cells
+        self.requests = requests
+        self.throttled = throttled
+        self.mins = mins
+        self.maxs = maxs
+        self.hist_keys = hist_keys
+        self.hist_counts = hist_counts
+
+    @classmethod
+    def from_points(cls, groups, seconds, values, throttled):
+        """1s level from per-point group codes, whole seconds since start and values"""
+        n_buckets = int(seconds.max()) + 1
+        cells, inverse = np.unique(groups * n_buckets + seconds, return_inverse=True)
+        requests = np.bincount(inverse, minlength=len(cells))
+        throttles = np.bincount(inverse, weights=throttled, minlength=len(cells)).astype(np.int64)
+        valid = ~np.isnan(values)
+        mins = np.full(len(cells), np.inf)
+        maxs = np.full(len(cells), -np.inf)
+        np.minimum.at(mins, inverse[valid], values[valid])
+        np.maximum.at(maxs, inverse[valid], values[valid])
+        keys = cells[inverse[valid]] * N_BUCKETS + bucket_index(values[valid])
+        hist_keys, hist_counts = np.unique(keys, return_counts=True)
+        return cls(1, n_buckets, cells, requests, throttles, mins, maxs, hist_keys, hist_counts)
+
+    def coarsen(self, step_s):
+        """Level with `step_s`-second buckets, aggregated from this one"""
+        factor = step_s // self.step_s
+        n_buckets = -(-self.n_buckets // factor)
+
+        def regroup(cells):
+            return cells // self.n_buckets * n_buckets + cells % self.n_buckets // factor
+
+        cells, inverse = np.unique(regroup(self.cells), return_inverse=True)
+        mins = np.full(len(cells), np.inf)
+        maxs = np.full(len(cells), -np.inf)
+        np.minimum.at(mins, inverse, self.mins)
+        np.maximum.at(maxs, inverse, self.maxs)
+        keys = regroup(self.hist_keys // N_BUCKETS) * N_BUCKETS + self.hist_keys % N_BUCKETS
+        hist_keys, hist_inverse = np.unique(keys, return_inverse=True)
+        hist_counts = np.bincount(hist_inverse, weights=self.hist_counts,
+                                  minlength=len(hist_keys)).astype(np.int64)
+        requests = np.bincount(inverse, weights=self.requests, minlength=len(cells))
+        throttled = np.bincount(inverse, weights=self.throttled, minlength=len(cells))
+        return Level(step_s, n_buckets, cells, requests.astype(np.int64),
+                     throttled.astype(np.int64), mins, maxs, hist_keys, hist_counts)
+
+    def quantiles(self, qs=REPORT_QUANTILES):
+        """{q: value per cell} from the histogram, clamped to the exact min/max"""
+        result = {q: np.full(len(self.cells), np.nan) for q in qs}
+        if not len(self.hist_keys):
+            return result
+        hist_cells = self.hist_keys // N_BUCKETS
+        owners, starts = np.unique(hist_cells, return_index=True)
+        totals = np.add.reduceat(self.hist_counts, starts)
+        cumulative = np.cumsum(self.hist_counts)
+        before = cumulative[starts] - self.hist_counts[starts]
+        position = np.searchsorted(self.cells, owners)
+        for q in qs:
+            index = np.searchsorted(cumulative, before + q * (totals - 1), side='right')
+            values = bucket_values(self.hist_keys[np.minimum(index, len(cumulative) - 1)]
+                                   % N_BUCKETS)
+            result[q][position] = np.clip(values, self.mins[position], self.maxs[position])
+        return result
+
+
+def build_pyramid(df, by=DEFAULT_GROUP_BY, metric=REQUEST_METRIC, levels=LEVELS):
+    """(origin datetime, group names, [Level]) for one metric's points"""
+    points = df[df['metric_name'] == metric]
+    if len(points) == 0:
+        return None, [], []
+    columns = (by,) if isinstance(by, str) else tuple(by)
+    codes, keys = _group_codes(points, columns)
+    names = ['/'.join(str(part) for part in key if part is not None) or 'all' for key in keys]
+
+    stamps = points['datetime'].values.astype('datetime64[ns]').view(np.int64)
+    origin = stamps.min() // 10 ** 9 * 10 ** 9
+    seconds = (stamps - origin) // 10 ** 9
+    status = _numeric_status(points['status']) if 'status' in points.columns \
+        else np.full(len(points), np.nan)
+    values = points['metric_value'].values.astype(np.float64)
+
+    pyramid = [Level.from_points(codes.astype(np.int64), seconds, values,
+                                 (status == 429).astype(np.float64))]
+    for freq in levels[1:]:
+        pyramid.append(pyramid[-1].coarsen(int(pd.Timedelta(freq).total_seconds())))
+    return pd.Timestamp(origin), names, pyramid
+
+
+def _rounded(values, decimals):
+    values = np.round(np.asarray(values, dtype=np.float64), decimals)
+    result = values.tolist()
+    for index in np.flatnonzero(~np.isfinite(values)).tolist():
+        result[index] = None
+    return result
+
+
+def level_payload(level, names, qs=REPORT_QUANTILES):
+    """JSON-ready series per group of one level"""
+    quantiles = level.quantiles(qs)
+    group_of = level.cells // level.n_buckets
+    series = {}
+    for code, name in enumerate(names):
+        mask = group_of == code
+        data = {'t': (level.cells[mask] % level.n_buckets).tolist(),
+                'n': level.requests[mask].tolist(), 'thr': level.throttled[mask].tolist(),
+                'min': _rounded(level.mins[mask], 1), 'max': _rounded(level.maxs[mask], 1)}
+        for q, values in quantiles.items():
+            data[f'p{q * 100:g}'] = _rounded(values[mask], 1)
+        series[name] = data
+    return {'step': level.step_s, 'series': series}
+
+
+def write_report(df, output_file=DEFAULT_REPORT_FILE, by=DEFAULT_GROUP_BY, metric=REQUEST_METRIC,
+                 title=None, source=None):
+    """Write the HTML report; returns (output_file, points, levels) or None without points"""
+    origin, names, pyramid = build_pyramid(df, by, metric)
+    if origin is None:
+        return None
+    blocks = []
+    for freq, level in zip(LEVELS, pyramid):
+        payload = json.dumps(level_payload(level, names), separators=(',', ':'))
+        # "</" would end the script element early
+        payload = payload.replace('</', '<\\/')
+        blocks.append(f'<script type="application/json" id="level-{freq}">{payload}</script>')
+    meta = {'origin': int(origin.value // 10 ** 6), 'groups': names, 'metric': metric,
+            'levels': [f'level-{freq}' for freq in LEVELS],
+            'steps': [level.step_s for level in pyramid],
+            'quantiles': [f'p{q * 100:g}' for q in REPORT_QUANTILES]}
+    title = title or f"Load test report - {os.path.basename(source) if source else metric}"
+    page = (_TEMPLATE.replace('__TITLE__', html.escape(title))
+            .replace('__SUBTITLE__', html.escape(
+                f"{int(pyramid[0].requests.sum()):,} requests, grouped by {by}, "
+                f"generated {time.strftime('%Y-%m-%d %H:%M')}"))
+            .replace('__META__', json.dumps(meta))
+            .replace('__LEVELS__', '\n'.join(blocks)))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return output_file, int(pyramid[0].requests.sum()), pyramid
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; margin: 16px 24px;
+         color: #222; }
+  h1 { font-size: 20px; margin: 0 0 4px; }
+  .sub, .status { color: #666; font-size: 13px; }
+  .bar { display: flex; gap: 12px; align-items: center; margin: 10px 0; flex-wrap: wrap; }
+  .legend span { display: inline-flex; align-items: center; margin-right: 14px; font-size: 13px; }
+  .legend i { width: 14px; height: 4px; margin-right: 5px; display: inline-block; }
+  canvas { display: block; width: 100%; border: 1px solid #ddd; margin-bottom: 8px;
+           cursor: grab; }
+  #tip { position: fixed; pointer-events: none; background: rgba(255,255,255,0.95);
+         border: 1px solid #aaa; padding: 6px 8px; font-size: 12px; display: none;
+         white-space: pre; font-family: monospace; }
+  button, select { font-size: 13px; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div class="sub">__SUBTITLE__</div>
+<div class="bar">
+  <button id="reset">Reset zoom</button>
+  <label>Latency line <select id="quantile"></select></label>
+  <span class="legend" id="legend"></span>
+  <span class="status" id="status"></span>
+</div>
+<canvas id="rps" height="200"></canvas>
+<canvas id="throttle" height="160"></canvas>
+<canvas id="latency" height="260"></canvas>
+<div class="sub">Wheel to zoom, drag to pan, double-click to reset. The latency band is the
+min..max of each bucket.</div>
+<div id="tip"></div>
+__LEVELS__
+<script>
+const META = __META__;
+const COLORS = ['#e74c3c', '#2ecc71', '#3498db', '#f39c12', '#9b59b6', '#1abc9c', '#7f8c8d',
+                '#d35400'];
+const parsed = {};
+function level(i) {
+  // Levels are parsed on first use only
+  if (!parsed[i]) {
+    const data = JSON.parse(document.getElementById(META.levels[i]).textContent);
+    for (const s of Object.values(data.series)) {
+      s.ms = s.t.map(t => META.origin + t * data.step * 1000);
+    }
+    parsed[i] = data;
+  }
+  return parsed[i];
+}
+const coarsest = level(META.levels.length - 1);
+let fullStart = Infinity, fullEnd = -Infinity;
+for (const s of Object.values(coarsest.series)) {
+  if (s.ms.length) {
+    fullStart = Math.min(fullStart, s.ms[0]);
+    fullEnd = Math.max(fullEnd, s.ms[s.ms.length - 1] + coarsest.step * 1000);
+  }
+}
+let view = [fullStart, fullEnd];
+const qSelect = document.getElementById('quantile');
+for (const q of META.quantiles) qSelect.add(new Option(q, q));
+qSelect.value = META.quantiles.includes('p95') ? 'p95' : META.quantiles[0];
+document.getElementById('legend').innerHTML = META.groups.map((g, i) =>
+  `<span><i style="background:${COLORS[i % COLORS.length]}"></i>${g}</span>`).join('');
+
+const PAD = {left: 64, right: 16, top: 22, bottom: 24};
+const canvases = ['rps', 'throttle', 'latency'].map(id => document.getElementById(id));
+
+function pickLevel() {
+  const width = canvases[0].clientWidth - PAD.left - PAD.right;
+  for (let i = 0; i < META.steps.length; i++) {
+    if ((view[1] - view[0]) / (META.steps[i] * 1000) <= width) return i;
+  }
+  return META.steps.length - 1;
+}
+function lowerBound(array, value) {
+  let lo = 0, hi = array.length;
+  while (lo < hi) { const mid = (lo + hi) >> 1; if (array[mid] < value) lo = mid + 1; else hi = mid; }
+  return lo;
+}
+function visible(s, step) {
+  const from = Math.max(0, lowerBound(s.ms, view[0] - step * 1000) - 1);
+  const to = Math.min(s.ms.length, lowerBound(s.ms, view[1]) + 1);
+  return [from, to];
+}
+function series(data, field) {
+  const step = data.step;
+  return META.groups.map(g => {
+    const s = data.series[g];
+    const [from, to] = visible(s, step);
+    const out = [];
+    for (let k = from; k < to; k++) {
+      let y;
+      if (field === 'rps') y = s.n[k] / step;
+      else if (field === 'throttle') y = s.n[k] ? 100 * s.thr[k] / s.n[k] : null;
+      else y = s[field][k];
+      out.push([s.ms[k], y, s.t[k], s, k]);
+    }
+    return out;
+  });
+}
+function setup(canvas) {
+  const ratio = window.devicePixelRatio || 1;
+  const width = canvas.clientWidth, height = canvas.height / (canvas._ratio || 1);
+  canvas._ratio = ratio;
+  canvas.width = width * ratio;
+  canvas.height = height * ratio;
+  canvas.style.height = height + 'px';
+  const ctx = canvas.getContext('2d');
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+  return [ctx, width, height];
+}
+function axes(ctx, width, height, ymax, label) {
+  const plotH = height - PAD.top - PAD.bottom, plotW = width - PAD.left - PAD.right;
+  ctx.strokeStyle = '#eee'; ctx.fillStyle = '#666'; ctx.font = '11px sans-serif';
+  for (let i = 0; i <= 4; i++) {
+    const y = PAD.top + plotH * (1 - i / 4);
+    ctx.beginPath(); ctx.moveTo(PAD.left, y); ctx.lineTo(width - PAD.right, y); ctx.stroke();
+    ctx.textAlign = 'right'; ctx.fillText(+(ymax * i / 4).toPrecision(3), PAD.left - 6, y + 4);
+  }
+  ctx.textAlign = 'center';
+  for (let i = 0; i <= 6; i++) {
+    const t = view[0] + (view[1] - view[0]) * i / 6;
+    const d = new Date(t);
+    const text = (view[1] - view[0]) > 2 * 86400e3 ? d.toISOString().slice(5, 16).replace('T', ' ')
+      : d.toISOString().slice(11, (view[1] - view[0]) < 120e3 ? 23 : 19);
+    ctx.fillText(text, PAD.left + plotW * i / 6, height - 6);
+  }
+  ctx.textAlign = 'left'; ctx.fillStyle = '#222'; ctx.font = 'bold 12px sans-serif';
+  ctx.fillText(label, PAD.left, 14);
+  return [plotW, plotH];
+}
+function xOf(t, plotW) { return PAD.left + (t - view[0]) / (view[1] - view[0]) * plotW; }
+function line(ctx, points, plotW, plotH, ymax, step, color, width, dash) {
+  ctx.strokeStyle = color; ctx.lineWidth = width; ctx.setLineDash(dash || []);
+  ctx.beginPath();
+  let previous = null;
+  for (const [t, y, bucket] of points) {
+    if (y === null) { previous = null; continue; }
+    const x = xOf(t + step * 500, plotW), yy = PAD.top + plotH * (1 - y / ymax);
+    if (previous === null || bucket - previous > 1) ctx.moveTo(x, yy); else ctx.lineTo(x, yy);
+    previous = bucket;
+  }
+  ctx.stroke(); ctx.setLineDash([]);
+}
+function band(ctx, lows, highs, plotW, plotH, ymax, step, color) {
+  ctx.fillStyle = color; ctx.globalAlpha = 0.12;
+  for (let k = 0; k < lows.length; k++) {
+    const [t, lo] = lows[k], hi = highs[k][1];
+    if (lo === null || hi === null) continue;
+    const x0 = xOf(t, plotW), x1 = xOf(t + step * 1000, plotW);
+    const y0 = PAD.top + plotH * (1 - Math.min(hi, ymax) / ymax);
+    const y1 = PAD.top + plotH * (1 - lo / ymax);
+    ctx.fillRect(x0, y0, Math.max(1, x1 - x0), Math.max(1, y1 - y0));
+  }
+  ctx.globalAlpha = 1;
+}
+function maxOf(groups, cap) {
+  let m = 0;
+  for (const points of groups) for (const p of points) if (p[1] !== null) m = Math.max(m, p[1]);
+  return Math.min(cap || Infinity, m * 1.1) || 1;
+}
+let current = null;
+function draw() {
+  const index = pickLevel(), data = level(index), step = data.step, q = qSelect.value;
+  current = data;
+  const rps = series(data, 'rps'), throttle = series(data, 'throttle');
+  const lat = series(data, q), lows = series(data, 'min'), highs = series(data, 'max');
+  const charts = [
+    [canvases[0], 'Requests per second', rps, maxOf(rps)],
+    [canvases[1], '429 throttle rate (%)', throttle, maxOf(throttle, 100)],
+    [canvases[2], `Latency ${q} (ms) with min..max band`, lat, maxOf(lat) * 1.5],
+  ];
+  charts.forEach(([canvas, label, groups, ymax], c) => {
+    const [ctx, width, height] = setup(canvas);
+    ctx.save();
+    const [plotW, plotH] = axes(ctx, width, height, ymax, label);
+    ctx.beginPath(); ctx.rect(PAD.left, PAD.top, plotW, plotH); ctx.clip();
+    groups.forEach((points, g) => {
+      const color = COLORS[g % COLORS.length];
+      if (c === 2) band(ctx, lows[g], highs[g], plotW, plotH, ymax, step, color);
+      line(ctx, points, plotW, plotH, ymax, step, color, 1.5);
+      if (c === 2 && q !== 'p50') {
+        line(ctx, series(data, 'p50')[g], plotW, plotH, ymax, step, color, 1, [4, 3]);
+      }
+    });
+    ctx.restore();
+  });
+  const loaded = Object.keys(parsed).length;
+  document.getElementById('status').textContent =
+    `resolution ${step}s, ${loaded} of ${META.steps.length} levels loaded`;
+}
+
+let drag = null;
+canvases.forEach(canvas => {
+  canvas.addEventListener('wheel', event => {
+    event.preventDefault();
+    const plotW = canvas.clientWidth - PAD.left - PAD.right;
+    const at = view[0] + (event.offsetX - PAD.left) / plotW * (view[1] - view[0]);
+    const scale = event.deltaY > 0 ? 1.25 : 0.8;
+    let start = at - (at - view[0]) * scale, end = at + (view[1] - at) * scale;
+    if (end - start < 5000) return;
+    view = [Math.max(fullStart, start), Math.min(fullEnd, end)];
+    draw();
+  }, {passive: false});
+  canvas.addEventListener('mousedown', event => {
+    drag = {x: event.clientX, view: view.slice(), width: canvas.clientWidth - PAD.left - PAD.right};
+    canvas.style.cursor = 'grabbing';
+  });
+  canvas.addEventListener('dblclick', () => { view = [fullStart, fullEnd]; draw(); });
+  canvas.addEventListener('mousemove', event => tooltip(event, canvas));
+  canvas.addEventListener('mouseleave', () => { document.getElementById('tip').style.display = 'none'; });
+});
+window.addEventListener('mousemove', event => {
+  if (!drag) return;
+  const span = drag.view[1] - drag.view[0];
+  let shift = -(event.clientX - drag.x) / drag.width * span;
+  shift = Math.max(fullStart - drag.view[0], Math.min(fullEnd - drag.view[1], shift));
+  view = [drag.view[0] + shift, drag.view[1] + shift];
+  draw();
+});
+window.addEventListener('mouseup', () => {
+  drag = null;
+  canvases.forEach(canvas => { canvas.style.cursor = 'grab'; });
+});
+function tooltip(event, canvas) {
+  const tip = document.getElementById('tip');
+  if (drag || !current) { tip.style.display = 'none'; return; }
+  const plotW = canvas.clientWidth - PAD.left - PAD.right;
+  const at = view[0] + (event.offsetX - PAD.left) / plotW * (view[1] - view[0]);
+  const bucket = Math.floor((at - META.origin) / (current.step * 1000));
+  const lines = [new Date(META.origin + bucket * current.step * 1000).toISOString()
+    .replace('T', ' ').slice(0, 19) + ` (${current.step}s)`];
+  for (const g of META.groups) {
+    const s = current.series[g], k = lowerBound(s.t, bucket);
+    if (s.t[k] !== bucket) continue;
+    const rate = (100 * s.thr[k] / s.n[k]).toFixed(1);
+    lines.push(`${g.padEnd(12)} ${(s.n[k] / current.step).toFixed(1).padStart(8)} req/s ` +
+               `${rate.padStart(5)}% 429  ` +
+               META.quantiles.map(q => `${q} ${s[q][k] === null ? '-' : s[q][k]}`).join(' ') +
+               `  max ${s.max[k] === null ? '-' : s.max[k]}`);
+  }
+  tip.textContent = lines.join('\\n');
+  tip.style.display = 'block';
+  tip.style.left = (event.clientX + 14) + 'px';
+  tip.style.top = (event.clientY + 14) + 'px';
+}
+qSelect.addEventListener('change', draw);
+document.getElementById('reset').addEventListener('click', () => { view = [fullStart, fullEnd]; draw(); });
+window.addEventListener('resize', draw);
+draw();
+</script>
+</body>
+</html>
+"""
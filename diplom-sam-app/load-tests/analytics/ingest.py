@@ -0,0 +1,344 @@
+"""
+Streaming ingest of k6 `--out json` result files
+Reads NDJSON in fixed-size chunks and folds every Point into per-metric/per-tag
+aggregates (with latency sketches), so memory stays constant regardless of
+file size
+"""
+
+import json
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from .sketch import LatencySketch, group_sketches
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# Tags that define an aggregate group; status is folded into throttled/error counts
+GROUP_TAGS = ('tenant', 'tier', 'scenario', 'role')
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class IngestStats:
+    """Throughput counters for one ingest run"""
+
+    def __init__(self):
+        self.lines = 0
+        self.points = 0
+        self.bad_lines = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def lines_per_second(self):
+        return self.lines / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.lines:,} lines ({self.points:,} points) in {self.elapsed:.2f}s"
+                f" - {self.lines_per_second:,.0f} lines/s, {self.mb_per_second:.1f} MB/s")
+
+
+class MetricAggregate:
+    """Latency sketch (count/sum/min/max/quantiles) plus throttle and error counts"""
+
+    __slots__ = ('sketch', 'throttled', 'errors')
+
+    def __init__(self):
+        self.sketch = LatencySketch()
+        self.throttled = 0
+        self.errors = 0
+
+    @property
+    def count(self):
+        return self.sketch.count
+
+    @property
+    def sum(self):
+        return self.sketch.sum
+
+    @property
+    def min(self):
+        return self.sketch.min
+
+    @property
+    def max(self):
+        return self.sketch.max
+
+    @property
+    def mean(self):
+        return self.sketch.mean
+
+    @property
+    def throttle_rate(self):
+        return self.throttled / self.count * 100 if self.count else 0.0
+
+    @property
+    def error_rate(self):
+        return self.errors / self.count * 100 if self.count else 0.0
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def add_many(self, values, throttled=0, errors=0):
+        """Fold a batch of values into the aggregate"""
+        self.sketch.add_many(values)
+        self.throttled += throttled
+        self.errors += errors
+
+    def merge(self, other):
+        """Add another aggregate into this one"""
+        self.sketch.merge(other.sketch)
+        self.throttled += other.throttled
+        self.errors += other.errors
+        return self
+
+    def to_dict(self):
+        return {'sketch': self.sketch.to_dict(), 'throttled': self.throttled, 'errors': self.errors}
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        agg.sketch = LatencySketch.from_dict(data['sketch'])
+        agg.throttled = data['throttled']
+        agg.errors = data['errors']
+        return agg
+
+
+class RunAggregates:
+    """All aggregates of one k6 run, keyed by (metric, tenant, tier, scenario, role)"""
+
+    def __init__(self):
+        self.metric_types = {}
+        self.groups = defaultdict(MetricAggregate)
+        self.start = None
+        self.end = None
+
+    def metrics(self):
+        return sorted({key[0] for key in self.groups})
+
+    def select(self, metric, **tags):
+        """Merged aggregate of one metric over all groups matching the given tags"""
+        result = MetricAggregate()
+        for key, agg in self.groups.items():
+            if key[0] == metric and self._matches(key, tags):
+                result.merge(agg)
+        return result
+
+    def split(self, metric, tag='role', **tags):
+        """{tag value: merged aggregate} for one metric"""
+        index = GROUP_TAGS.index(tag) + 1
+        result = defaultdict(MetricAggregate)
+        for key, agg in self.groups.items():
+            if key[0] == metric and self._matches(key, tags):
+                result[key[index]].merge(agg)
+        return dict(result)
+
+    def merge(self, other):
+        """Add another run's aggregates into this one"""
+        self.metric_types.update(other.metric_types)
+        for key, agg in other.groups.items():
+            self.groups[key].merge(agg)
+        for stamp in (other.start, other.end):
+            self._observe_time(stamp)
+        return self
+
+    def to_dict(self):
+        """JSON-serializable form, used by the run cache and history store"""
+        return {
+            'metric_types': self.metric_types,
+            'start': self.start,
+            'end': self.end,
+            'groups': [[list(key), agg.to_dict()] for key, agg in self.groups.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        run = cls()
+        run.metric_types = dict(data['metric_types'])
+        run.start = data['start']
+        run.end = data['end']
+        for key, agg in data['groups']:
+            run.groups[tuple(key)] = MetricAggregate.from_dict(agg)
+        return run
+
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregates of an already-parsed point frame (see analytics.loaders)"""
+        import pandas as pd
+
+        run = cls()
+        if len(df) == 0:
+            return run
+        codes, keys = _group_codes(df, ('metric_name',) + GROUP_TAGS)
+
+        status = _numeric_status(df['status']) if 'status' in df.columns \
+            else np.full(len(df), np.nan)
+        throttled = np.bincount(codes, weights=status == 429, minlength=len(keys))
+        errors = np.bincount(codes, weights=status >= 400, minlength=len(keys))
+
+        sketches = group_sketches(df['metric_value'].values, codes, range(len(keys)))
+        for position, key in enumerate(keys):
+            agg = run.groups[key]
+            agg.sketch = sketches.get(position, agg.sketch)
+            agg.throttled = int(throttled[position])
+            agg.errors = int(errors[position])
+        if 'datetime' in df.columns:
+            run.start = df['datetime'].min().isoformat()
+            run.end = df['datetime'].max().isoformat()
+        return run
+
+    @staticmethod
+    def _matches(key, tags):
+        return all(key[GROUP_TAGS.index(tag) + 1] == value for tag, value in tags.items())
+
+    def _observe_time(self, stamp):
+        # RFC3339 stamps from a single k6 process share an offset, so they sort as strings
+        if stamp is None:
+            return
+        if self.start is None or stamp < self.start:
+            self.start = stamp
+        if self.end is None or stamp > self.end:
+            self.end = stamp
+
+
+def _group_codes(df, columns):
+    """Dense group codes and key tuples for a set of (categorical) columns
+
+    Categorical codes are combined in mixed radix and uniqued once, which is
+    much cheaper than hashing row tuples. Missing columns/values become None.
+    """
+    combined = np.zeros(len(df), dtype=np.int64)
+    levels = []
+    for name in columns:
+        if name in df.columns:
+            column = df[name].astype('category')
+            categories = [str(value) for value in column.cat.categories]
+            column_codes = column.cat.codes.values.astype(np.int64) + 1
+        else:
+            categories = []
+            column_codes = np.zeros(len(df), dtype=np.int64)
+        levels.append([None] + categories)
+        combined = combined * len(levels[-1]) + column_codes
+
+    unique, codes = np.unique(combined, return_inverse=True)
+    keys = []
+    for value in unique.tolist():
+        key = []
+        for level in reversed(levels):
+            value, position = divmod(value, len(level))
+            key.append(level[position])
+        keys.append(tuple(reversed(key)))
+    return codes.ravel(), keys
+
+
+def _numeric_status(column):
+    """HTTP status as floats (NaN if absent), converting only the categories"""
+    import pandas as pd
+
+    column = column.astype('category')
+    categories = pd.to_numeric(pd.Series(column.cat.categories.astype(str)), errors='coerce')
+    return np.append(categories.values.astype(np.float64), np.nan)[column.cat.codes.values]
+
+
+class _ChunkBatch:
+    """Per-chunk value buffers, flushed into RunAggregates with NumPy"""
+
+    def __init__(self):
+        self.values = defaultdict(list)
+        self.throttled = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def flush(self, run):
+        for key, values in self.values.items():
+            run.groups[key].add_many(values, self.throttled[key], self.errors[key])
+        self.values.clear()
+        self.throttled.clear()
+        self.errors.clear()
+
+
+def _fold_record(record, run, batch):
+    """Fold one decoded k6 JSON record into the current batch"""
+    kind = record.get('type')
+    if kind == 'Metric':
+        data = record.get('data') or {}
+        run.metric_types[record.get('metric')] = data.get('type')
+        return False
+    if kind != 'Point':
+        return False
+
+    data = record.get('data') or {}
+    tags = data.get('tags') or {}
+    key = (record.get('metric'),) + tuple(tags.get(tag) for tag in GROUP_TAGS)
+    batch.values[key].append(data.get('value', 0))
+
+    status = tags.get('status')
+    if status:
+        if status == '429':
+            batch.throttled[key] += 1
+        if status >= '400' and len(status) == 3:
+            batch.errors[key] += 1
+    run._observe_time(data.get('time'))
+    return True
+
+
+def fold_lines(lines, run, batch, stats):
+    """Decode NDJSON lines and fold them into `batch`, counting into `stats`"""
+    for line in lines:
+        if not line.strip():
+            continue
+        stats.lines += 1
+        try:
+            record = loads(line)
+        except ValueError:
+            stats.bad_lines += 1
+            continue
+        if _fold_record(record, run, batch):
+            stats.points += 1
+
+
+def iter_lines(f, chunk_size=CHUNK_SIZE):
+    """Yield complete lines from a binary file, reading fixed-size chunks"""
+    remainder = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        lines = (remainder + chunk).split(b'\n')
+        remainder = lines.pop()
+        yield chunk, lines
+    if remainder:
+        yield b'', [remainder]
+
+
+def ingest_k6_json(filename, chunk_size=CHUNK_SIZE, run=None, progress=None):
+    """Stream a k6 NDJSON file into RunAggregates
+
+    Returns (run, stats). `progress`, if given, is called with the running
+    IngestStats after every chunk.
+    """
+    run = run if run is not None else RunAggregates()
+    stats = IngestStats()
+    batch = _ChunkBatch()
+    started = time.perf_counter()
+
+    with open(filename, 'rb') as f:
+        for chunk, lines in iter_lines(f, chunk_size):
+            stats.bytes += len(chunk)
+            fold_lines(lines, run, batch, stats)
+            batch.flush(run)
+            stats.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(stats)
+
+    stats.elapsed = time.perf_counter() - started
+    return run, stats
@@ -0,0 +1,133 @@
+"""
+Shared loaders for k6 result files
+CSV (`--out csv`) and NDJSON (`--out json`) runs are parsed into the same point
+frame, and both the frame and the streaming aggregates are cached per file
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .cache import open_cache
+from .ingest import CHUNK_SIZE, RunAggregates, ingest_k6_json, iter_lines, loads
+from .profiling import stage
+from .tags import TAG_KEYS, add_tag_columns
+
+# Tags kept as columns when parsing k6 JSON (vu/iter identify the sending VU)
+POINT_TAGS = TAG_KEYS + ('vu', 'iter')
+
+
+def parse_csv(filename):
+    """Parse a k6 CSV export into a point frame"""
+    with stage('read_csv'):
+        df = pd.read_csv(filename, dtype={'metric_name': 'category', 'extra_tags': 'category'})
+    with stage('to_datetime'):
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
+    with stage('tag columns'):
+        add_tag_columns(df)
+    with stage('categorize'):
+        for name in df.columns:
+            if df[name].dtype == object or pd.api.types.is_string_dtype(df[name].dtype):
+                df[name] = df[name].astype('category')
+    return df
+
+
+def _object_categorical(values):
+    """Categorical with object categories, also for chunks without any value,
+    so union_categoricals sees one categories dtype across chunks"""
+    categories = sorted({value for value in values if value is not None})
+    return pd.Categorical(values, categories=pd.Index(categories, dtype=object))
+
+
+def _json_chunk_frame(lines):
+    """Point frame for one chunk of NDJSON lines"""
+    metrics, times, values = [], [], []
+    tags = {key: [] for key in POINT_TAGS}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            continue
+        if record.get('type') != 'Point':
+            continue
+        data = record.get('data') or {}
+        point_tags = data.get('tags') or {}
+        metrics.append(record.get('metric'))
+        times.append(data.get('time'))
+        values.append(data.get('value', 0))
+        for key in POINT_TAGS:
+            tags[key].append(point_tags.get(key))
+
+    datetimes = pd.to_datetime(pd.Series(times, dtype=object), format='ISO8601', utc=True)
+    frame = {
+        'metric_name': _object_categorical(metrics),
+        'metric_value': pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').values,
+        'datetime': datetimes.dt.tz_convert(None).dt.as_unit('ns').values,
+    }
+    for key, column in tags.items():
+        frame[key] = _object_categorical(column)
+    return frame
+
+
+def parse_json(filename, chunk_size=CHUNK_SIZE):
+    """Parse k6 NDJSON Points into the same point frame as parse_csv"""
+    chunks = []
+    with stage('parse json'), open(filename, 'rb') as f:
+        for _, lines in iter_lines(f, chunk_size):
+            chunks.append(_json_chunk_frame(lines))
+
+    if not chunks:
+        chunks.append(_json_chunk_frame([]))
+    data = {}
+    for name in chunks[0]:
+        parts = [chunk[name] for chunk in chunks]
+        if isinstance(parts[0], pd.Categorical):
+            data[name] = union_categoricals(parts)
+        else:
+            data[name] = np.concatenate(parts)
+    df = pd.DataFrame(data)
+    df['timestamp'] = df['datetime'].values.view('int64') / 1e9
+    add_tag_columns(df)
+    return df
+
+
+def load_csv(filename, use_cache=True):
+    """Point frame for a k6 CSV file, served from the run cache when possible"""
+    with stage(f'load {os.path.basename(filename)}'):
+        if not use_cache:
+            return parse_csv(filename)
+        return open_cache(filename).get_frame(filename, parse_csv, kind='csv')
+
+
+def load_json(filename, use_cache=True):
+    """Point frame for a k6 NDJSON file, served from the run cache when possible"""
+    with stage(f'load {os.path.basename(filename)}'):
+        if not use_cache:
+            return parse_json(filename)
+        return open_cache(filename).get_frame(filename, parse_json, kind='json')
+
+
+def load_run(filename, use_cache=True):
+    """Point frame for either k6 output format, chosen by extension"""
+    if os.path.splitext(filename)[1].lower() in ('.json', '.ndjson'):
+        return load_json(filename, use_cache)
+    return load_csv(filename, use_cache)
+
+
+def load_aggregates(filename, use_cache=True, progress=None):
+    """RunAggregates for a k6 NDJSON file; streamed once, then read from cache"""
+    def build(source):
+        with stage('ingest json'):
+            run, stats = ingest_k6_json(source, progress=progress)
+        print(f"📥 Ingested {source}: {stats}")
+        return run
+
+    with stage(f'load {os.path.basename(filename)}'):
+        if not use_cache:
+            return build(filename)
+        return open_cache(filename).get_object(filename, 'aggregates', build,
+                                               RunAggregates.to_dict, RunAggregates.from_dict)
@@ -0,0 +1,404 @@
+"""
+Open-model load generator for the noisy neighbor scenarios
+An asyncio alternative to running all-tiers-noisy-neighbor-test.js with k6.
+Tenants, scenarios and metric names are read from the k6 script, but every
+stream sends at a constant arrival rate that does not depend on response
+times, so the offered req/s is exact and slow responses cannot hold back
+later requests (no coordinated omission). Samples are written as k6 NDJSON
+and folded into RunAggregates, so the analytics commands read the output as
+if k6 had produced it
+"""
+
+import asyncio
+import json
+import os
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from .ingest import IngestStats, RunAggregates, _ChunkBatch, fold_lines
+from .verdict import DEFAULT_SCRIPT
+
+DEFAULT_OUTPUT = 'noisy-neighbor-results.json'
+DEFAULT_DURATION = 60.0
+REQUEST_PATH = '/products'
+
+# Default offered load relative to the tenant's rateLimit: noisy streams
+# overload their plan (~45% throttled), victims stay well inside it
+NOISY_RATE_FACTOR = 1.8
+VICTIM_RATE_FACTOR = 0.5
+
+# Requests allowed in flight per stream (k6 maxVUs); later arrivals are dropped
+MAX_IN_FLIGHT = 200
+MAX_CONNECTIONS = 100
+REQUEST_TIMEOUT = 30.0
+
+# Buffered NDJSON lines are written (and folded) at least this often
+FLUSH_INTERVAL = 1.0
+
+_TRENDS = ('http_req_duration', 'loadgen_schedule_lag')
+_COUNTERS = ('http_reqs', 'dropped_iterations')
+
+
+class Tenant:
+    """One entry of the k6 script's TENANTS object"""
+
+    def __init__(self, key, name, tier, api_key, token_env, rate_limit):
+        self.key = key
+        self.name = name
+        self.tier = tier
+        self.api_key = api_key
+        self.token_env = token_env
+        self.rate_limit = rate_limit
+
+    @property
+    def token(self):
+        return os.environ.get(self.token_env, '') if self.token_env else ''
+
+
+class Stream:
+    """One k6 scenario replayed at a constant arrival rate"""
+
+    def __init__(self, name, tenant, scenario, role, rate, duration):
+        self.name = name
+        self.tenant = tenant
+        self.scenario = scenario
+        self.role = role
+        self.rate = rate
+        self.duration = duration
+
+    @property
+    def tags(self):
+        return {'scenario': self.scenario, 'role': self.role,
+                'tenant': self.tenant.name, 'tier': self.tenant.tier}
+
+
+# ---------- k6 script parsing ----------
+
+def _js_fields(body):
+    """{field: value} of a flat JS object literal (strings, numbers, identifiers)"""
+    fields = {}
+    for match in re.finditer(r'(\w+)\s*:\s*("([^"]*)"|[\w.]+)', body):
+        fields[match.group(1)] = match.group(3) if match.group(3) is not None else match.group(2)
+    return fields
+
+
+def _duration_seconds(value, default=DEFAULT_DURATION):
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)(ms|s|m|h)', value or '')
+    if not match:
+        return default
+    scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+    return float(match.group(1)) * scale
+
+
+def parse_script(script=DEFAULT_SCRIPT):
+    """(base_url, {key: Tenant}, [Stream]) from a noisy neighbor k6 script
+
+    Streams get the default open-model rates; override them with
+    apply_rates().
+    """
+    with open(script, encoding='utf-8') as f:
+        source = f.read()
+
+    match = re.search(r'const\s+BASE_URL\s*=\s*"([^"]+)"', source)
+    base_url = match.group(1) if match else None
+    env = dict(re.findall(r'const\s+(\w+)\s*=\s*__ENV\.(\w+)', source))
+
+    tenants = {}
+    block = re.search(r'const\s+TENANTS\s*=\s*\{(.*?)\n\};', source, re.S)
+    for key, body in re.findall(r'(\w+)\s*:\s*\{([^{}]*)\}', block.group(1) if block else ''):
+        fields = _js_fields(body)
+        tenants[key] = Tenant(key, fields.get('name'), fields.get('tier'), fields.get('apiKey'),
+                              env.get(fields.get('jwtToken')), float(fields.get('rateLimit', 0)))
+
+    functions = dict(re.findall(r'export\s+function\s+(\w+)\s*\(\)\s*\{\s*makeRequest\(\s*'
+                                r'TENANTS\.(\w+)', source))
+    streams = []
+    for name, body, tags in re.findall(r'(\w+)\s*:\s*\{(\s*executor:[^{}]*)tags\s*:\s*\{([^{}]*)\}',
+                                       source):
+        fields, tags = _js_fields(body), _js_fields(tags)
+        tenant = tenants.get(functions.get(fields.get('exec')))
+        if tenant is None:
+            continue
+        factor = NOISY_RATE_FACTOR if tags.get('role') == 'noisy' else VICTIM_RATE_FACTOR
+        streams.append(Stream(name, tenant, tags.get('scenario'), tags.get('role'),
+                              tenant.rate_limit * factor,
+                              _duration_seconds(fields.get('maxDuration'))))
+    return base_url, tenants, streams
+
+
+def apply_rates(streams, rates=None, duration=None):
+    """Override per-stream rates ({name: req/s}) and/or the duration of all streams"""
+    known = {stream.name for stream in streams}
+    unknown = set(rates or ()) - known
+    if unknown:
+        raise ValueError(f"unknown stream(s): {', '.join(sorted(unknown))} "
+                         f"(known: {', '.join(sorted(known))})")
+    for stream in streams:
+        if rates and stream.name in rates:
+            stream.rate = float(rates[stream.name])
+        if duration is not None:
+            stream.duration = float(duration)
+    return streams
+
+
+# ---------- HTTP/1.1 keep-alive client ----------
+
+class HttpError(Exception):
+    """The server closed the connection or sent an unparsable response"""
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one origin, at most `limit` open"""
+
+    def __init__(self, base_url, limit=MAX_CONNECTIONS, timeout=REQUEST_TIMEOUT):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.secure = url.scheme == 'https'
+        self.port = url.port or (443 if self.secure else 80)
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self.ssl = ssl.create_default_context() if self.secure else None
+        self.idle = []
+        self.slots = asyncio.Semaphore(limit)
+        self.opened = 0
+
+    async def _connect(self):
+        if self.idle:
+            return self.idle.pop()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl,
+                                             server_hostname=self.host if self.ssl else None)
+
+    async def request(self, method, path, headers, timing=None):
+        """Status of one request
+
+        Waiting for a free connection is part of the caller's latency: the
+        loop time the request was written goes to timing['sent'].
+        """
+        async with self.slots:
+            reader, writer = await self._connect()
+            lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host}',
+                     'Connection: keep-alive']
+            lines += [f'{name}: {value}' for name, value in headers.items()]
+            try:
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+                if timing is not None:
+                    timing['sent'] = asyncio.get_running_loop().time()
+                status, keep_alive = await asyncio.wait_for(self._read_response(reader),
+                                                            self.timeout)
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError('connection closed')
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise HttpError(f'bad status line {status_line[:80]!r}')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif status >= 200 and status not in (204, 304):
+            await reader.read()
+            return status, False
+        return status, headers.get('connection', '').lower() != 'close'
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+# ---------- sample output ----------
+
+class SampleWriter:
+    """Writes samples as k6 NDJSON and folds them into a RunAggregates"""
+
+    def __init__(self, filename, streams):
+        self.file = open(filename, 'w', encoding='utf-8') if filename else None
+        self.run = RunAggregates()
+        self.stats = IngestStats()
+        self.batch = _ChunkBatch()
+        self.lines = []
+        self.flushed = time.monotonic()
+
+        metrics = {name: 'trend' for name in _TRENDS}
+        metrics.update({name: 'counter' for name in _COUNTERS})
+        metrics['http_req_failed'] = 'rate'
+        for stream in streams:
+            metrics.update({f'{stream.name}_requests': 'counter',
+                            f'{stream.name}_throttled': 'counter',
+                            f'{stream.name}_latency': 'trend',
+                            f'{stream.name}_error_rate': 'rate'})
+        for name, kind in metrics.items():
+            self._emit({'type': 'Metric', 'data': {'name': name, 'type': kind}, 'metric': name})
+
+    def _emit(self, record):
+        self.lines.append(json.dumps(record))
+
+    def point(self, metric, value, tags, stamp):
+        self._emit({'type': 'Point', 'metric': metric,
+                    'data': {'time': stamp, 'value': value, 'tags': tags}})
+
+    def sample(self, stream, iteration, status, duration_ms, lag_ms, sent_at):
+        """All points k6 would record for one request of the script"""
+        stamp = datetime.fromtimestamp(sent_at, timezone.utc).isoformat()
+        tags = dict(stream.tags, iter=str(iteration), status=str(status), method='GET',
+                    name=REQUEST_PATH, expected_response=str(200 <= status < 400).lower())
+        self.point('http_req_duration', duration_ms, tags, stamp)
+        self.point('http_reqs', 1, tags, stamp)
+        self.point('http_req_failed', int(not 200 <= status < 400), tags, stamp)
+        self.point('loadgen_schedule_lag', lag_ms, tags, stamp)
+
+        custom = {'scenario': stream.scenario, 'role': stream.role}
+        self.point(f'{stream.name}_requests', 1, custom, stamp)
+        self.point(f'{stream.name}_latency', duration_ms, custom, stamp)
+        if status == 429:
+            self.point(f'{stream.name}_throttled', 1, custom, stamp)
+        self.point(f'{stream.name}_error_rate', int(status >= 400), custom, stamp)
+        if time.monotonic() - self.flushed > FLUSH_INTERVAL:
+            self.flush()
+
+    def dropped(self, stream):
+        stamp = datetime.now(timezone.utc).isoformat()
+        self.point('dropped_iterations', 1, dict(stream.tags), stamp)
+
+    def flush(self):
+        if self.lines:
+            if self.file:
+                self.file.write('\n'.join(self.lines) + '\n')
+                self.file.flush()
+            fold_lines(self.lines, self.run, self.batch, self.stats)
+            self.batch.flush(self.run)
+            self.lines = []
+        self.flushed = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self.file:
+            self.file.close()
+        return self.run
+
+
+# ---------- scheduler ----------
+
+async def _send(pool, stream, iteration, due, writer):
+    """One request, timed from its scheduled start `due` (loop time)
+
+    The latency covers scheduler lag, the wait for a pooled connection and
+    the response, on success and error alike, so a saturated pool shows up
+    as latency instead of being omitted. loadgen_schedule_lag is the part
+    before the request was written (all of it if it never was).
+    """
+    loop = asyncio.get_running_loop()
+    tenant = stream.tenant
+    headers = {'x-api-key': tenant.api_key, 'Authorization': f'Bearer {tenant.token}',
+               'Content-Type': 'application/json'}
+    scheduled_at = time.time() - max(0.0, loop.time() - due)
+    timing = {}
+    try:
+        status = await pool.request('GET', REQUEST_PATH, headers, timing)
+    except (OSError, HttpError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+        # k6 reports network errors and timeouts as status 0
+        status = 0
+    done = loop.time()
+    elapsed = max(0.0, done - due)
+    lag = max(0.0, timing.get('sent', done) - due)
+    writer.sample(stream, iteration, status, elapsed * 1000, lag * 1000, scheduled_at)
+
+
+async def _run_stream(pool, stream, start, writer, max_in_flight):
+    """Fire requests at start + i / rate regardless of how earlier ones fare"""
+    loop = asyncio.get_running_loop()
+    in_flight = set()
+    for iteration in range(int(stream.rate * stream.duration)):
+        due = start + iteration / stream.rate
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            writer.dropped(stream)
+            continue
+        task = asyncio.create_task(_send(pool, stream, iteration, due, writer))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+async def run_streams(base_url, streams, writer, max_in_flight=MAX_IN_FLIGHT,
+                      max_connections=MAX_CONNECTIONS, standin=None):
+    """Run all streams concurrently from a common start time
+
+    With a StandInServer the requests go to it, served from the same event loop.
+    """
+    if standin is not None:
+        await standin.start()
+        base_url = standin.base_url
+    pool = ConnectionPool(base_url, max_connections)
+    start = asyncio.get_running_loop().time() + 0.1
+    try:
+        await asyncio.gather(*(_run_stream(pool, stream, start, writer, max_in_flight)
+                               for stream in streams if stream.rate > 0))
+    finally:
+        pool.close()
+        if standin is not None:
+            await standin.close()
+    return pool.opened
+
+
+def run_load(base_url, streams, output_file=DEFAULT_OUTPUT, max_in_flight=MAX_IN_FLIGHT,
+             max_connections=MAX_CONNECTIONS, standin=None):
+    """Drive the streams against base_url (or a stand-in); returns (RunAggregates, IngestStats, connections)"""
+    writer = SampleWriter(output_file, streams)
+    started = time.perf_counter()
+    try:
+        connections = asyncio.run(run_streams(base_url, streams, writer, max_in_flight,
+                                              max_connections, standin))
+    finally:
+        run = writer.close()
+        writer.stats.elapsed = time.perf_counter() - started
+        if output_file:
+            writer.stats.bytes = os.path.getsize(output_file)
+    return run, writer.stats, connections
+
+
+def plan_lines(base_url, streams, check_tokens=True):
+    """Human-readable load plan"""
+    lines = [f"🎯 {base_url}{REQUEST_PATH}", '',
+             f"{'Stream':<18}{'Scenario':<18}{'Role':<8}{'Tenant':<18}{'Limit':>7}"
+             f"{'Rate':>10}{'Duration':>10}{'Requests':>10}"]
+    for stream in streams:
+        lines.append(f"{stream.name:<18}{stream.scenario:<18}{stream.role:<8}"
+                     f"{stream.tenant.name:<18}{stream.tenant.rate_limit:>6.0f}/s"
+                     f"{stream.rate:>8.1f}/s{stream.duration:>9.0f}s"
+                     f"{int(stream.rate * stream.duration):>10,}")
+    missing = sorted({stream.tenant.token_env for stream in streams
+                      if check_tokens and stream.tenant.token_env and not stream.tenant.token})
+    if missing:
+        lines += ['', f"⚠️  Not set: {', '.join(missing)} (requests will be rejected as 401)"]
+    return lines
@@ -0,0 +1,173 @@
+"""
+Streaming reader for CloudWatch Lambda logs
+Log files exported from CloudWatch come as plain text (S3 export, `aws logs
+tail`) or NDJSON events with a "message" field, optionally gzipped. The
+messages themselves are text lines or, with the template's `LogFormat: JSON`,
+JSON records (application logs and `platform.*` events). Every line is turned
+into a LogEvent with its time, log stream (one Lambda execution environment)
+and request id, so the ingesters only match messages
+"""
+
+import gzip
+import json
+import re
+from datetime import datetime
+
+# Node.js runtime line: "<ISO time>\t<request id>\t<LEVEL>\t<message>"
+_RUNTIME_LINE = re.compile(r'(\d{4}-\d\d-\d\dT[\d:.]+Z)\t([0-9a-f-]{36})\t([A-Z]+)\t(.*)', re.S)
+# Platform lines: START / END / REPORT RequestId: <id> ...
+_REQUEST_ID = re.compile(r'RequestId: ([0-9a-f-]{36})')
+# Text platform line: "REPORT RequestId: <id>\tDuration: 1.23 ms\t..."
+_REPORT_FIELD = re.compile(r'(Billed Duration|Init Duration|Restore Duration|Duration|'
+                           r'Max Memory Used|Memory Size): ([\d.]+)')
+_REPORT_KEYS = {'Duration': 'duration_ms', 'Billed Duration': 'billed_ms',
+                'Init Duration': 'init_ms', 'Restore Duration': 'init_ms',
+                'Memory Size': 'memory_mb', 'Max Memory Used': 'max_memory_mb'}
+# platform.report "metrics" of the JSON log format
+_PLATFORM_METRICS = {'durationMs': 'duration_ms', 'billedDurationMs': 'billed_ms',
+                     'initDurationMs': 'init_ms', 'restoreDurationMs': 'init_ms',
+                     'memorySizeMB': 'memory_mb', 'maxMemoryUsedMB': 'max_memory_mb'}
+# Leading "<ISO time> [<log stream>] " of S3 exports and `aws logs tail`
+_LINE_PREFIX = re.compile(r'(\d{4}-\d\d-\d\dT[\d:.]+(?:Z|[+-]\d\d:?\d\d)?)\s+'
+                          r'(?:(\d{4}/\d\d/\d\d/\[[^\]]*\]\w+)\s+)?')
+
+
+class LogEvent:
+    """One log message with its epoch-ms time, stream and request id
+
+    Platform events of the JSON log format have their type (`platform.report`,
+    `platform.initStart`, ...) as message and the record in `fields`.
+    """
+
+    __slots__ = ('time', 'stream', 'request_id', 'level', 'message', 'source', 'fields')
+
+    def __init__(self, time, stream, request_id, level, message, source=None, fields=None):
+        self.time = time
+        self.stream = stream
+        self.request_id = request_id
+        self.level = level
+        self.message = message
+        self.source = source
+        self.fields = fields
+
+
+def _epoch_ms(stamp):
+    if isinstance(stamp, (int, float)):
+        return stamp
+    try:
+        return datetime.fromisoformat(stamp.replace('Z', '+00:00')).timestamp() * 1000
+    except ValueError:
+        return None
+
+
+def open_log(filename):
+    """Text file object for a plain or gzipped log file"""
+    with open(filename, 'rb') as f:
+        gzipped = f.read(2) == b'\x1f\x8b'
+    if gzipped:
+        return gzip.open(filename, 'rt', encoding='utf-8', errors='replace')
+    return open(filename, encoding='utf-8', errors='replace')
+
+
+def _raw_messages(f):
+    """(epoch ms or None, stream or None, message) for every line of a log file"""
+    for line in f:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        if line.startswith('{') and '"message"' in line:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            # CloudWatch events wrap the message; Lambda JSON records are messages themselves
+            if isinstance(record, dict) and ('events' in record or 'logStreamName' in record
+                                             or isinstance(record.get('timestamp'), (int, float))):
+                events = record.get('events') if 'events' in record else [record]
+                for event in events:
+                    yield event.get('timestamp'), event.get('logStreamName'), event.get('message', '')
+                continue
+        stamp, stream = None, None
+        if not _RUNTIME_LINE.match(line):
+            prefix = _LINE_PREFIX.match(line)
+            if prefix:
+                stamp, stream = _epoch_ms(prefix.group(1)), prefix.group(2)
+                line = line[prefix.end():]
+        yield stamp, stream, line
+
+
+def _json_event(stamp, stream, record, source):
+    """LogEvent for a JSON log format record, or None for other JSON"""
+    kind = record.get('type')
+    if isinstance(kind, str) and kind.startswith('platform.'):
+        fields = record.get('record') if isinstance(record.get('record'), dict) else {}
+        return LogEvent(stamp if stamp is not None else _epoch_ms(record.get('time', '')),
+                        stream, fields.get('requestId'), None, kind, source, fields)
+    if 'message' in record and ('requestId' in record or 'level' in record):
+        text = record['message']
+        if not isinstance(text, str):
+            text = json.dumps(text)
+        return LogEvent(stamp if stamp is not None else _epoch_ms(record.get('timestamp', '')),
+                        stream, record.get('requestId'), record.get('level'), text, source)
+    return None
+
+
+def parse_message(stamp, stream, message, source=None):
+    """LogEvent for one raw CloudWatch message"""
+    message = message.rstrip('\n')
+    if message.startswith('{'):
+        try:
+            record = json.loads(message)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            event = _json_event(stamp, stream, record, source)
+            if event is not None:
+                return event
+    runtime = _RUNTIME_LINE.match(message)
+    if runtime:
+        time, request_id, level, text = runtime.groups()
+        return LogEvent(_epoch_ms(time) if stamp is None else stamp, stream, request_id,
+                        level, text, source)
+    match = _REQUEST_ID.search(message)
+    return LogEvent(stamp, stream, match.group(1) if match else None, None, message, source)
+
+
+def iter_log_events(filenames, contains=None):
+    """Stream LogEvents from log files (plain, NDJSON or gzipped)
+
+    `contains` is an optional tuple of substrings; messages with none of them
+    are skipped before any regex runs.
+    """
+    if isinstance(filenames, str):
+        filenames = [filenames]
+    for filename in filenames:
+        with open_log(filename) as f:
+            for stamp, stream, message in _raw_messages(f):
+                if contains and not any(part in message for part in contains):
+                    continue
+                yield parse_message(stamp, stream, message, filename)
+
+
+def report_metrics(event):
+    """{duration_ms, billed_ms, init_ms, memory_mb, max_memory_mb} of a REPORT event, or None
+
+    Reads both the text `REPORT RequestId: ...` line and the JSON
+    `platform.report` record; init_ms is only present for cold starts.
+    """
+    if event.fields is not None:
+        if event.message != 'platform.report':
+            return None
+        metrics = event.fields.get('metrics') or {}
+        return {key: float(metrics[name]) for name, key in _PLATFORM_METRICS.items()
+                if metrics.get(name) is not None}
+    if not event.message.startswith('REPORT'):
+        return None
+    return {_REPORT_KEYS[name]: float(value) for name, value in _REPORT_FIELD.findall(event.message)}
+
+
+def is_init_start(event):
+    """True for the INIT_START line / platform.initStart record of a new environment"""
+    if event.fields is not None:
+        return event.message == 'platform.initStart'
+    return event.message.startswith('INIT_START')
@@ -0,0 +1,163 @@
+"""
+Coordinated omission correction for closed-model k6 runs
+A k6 VU sends its next request only after the previous one returned, so a
+slow response also delays every request the VU meant to send meanwhile, and
+that waiting never shows up in the samples. The send schedule of each VU is
+rebuilt from the sample time and its vu/iter tags; the expected interval
+between iterations is the median gap of the scenario role. Every sample
+longer than that interval is back-filled with the latencies the skipped
+requests would have seen (HdrHistogram's recordValueWithExpectedInterval),
+giving corrected percentiles next to the raw ones
+"""
+
+import numpy as np
+import pandas as pd
+
+from .ingest import _group_codes
+from .results import REQUEST_METRIC
+from .sketch import LatencySketch
+from .tags import split_tags
+
+GROUP_COLUMNS = ('scenario', 'role')
+SCHEDULE_TAGS = ('vu', 'iter')
+REPORT_QUANTILES = (0.50, 0.95, 0.99)
+
+# Synthetic samples added for a single measured latency at most
+MAX_BACKFILL = 10000
+
+
+def schedule_points(df, metric=REQUEST_METRIC):
+    """Points of `metric` with `group`, `vu`, `iter` and `start_ms` columns, in send order
+
+    `group` indexes the (scenario, role) keys in frame.attrs['groups'].
+    Samples are timestamped when recorded, after the response, so the send
+    time is the sample time minus its latency. CSV runs carry vu/iter in
+    extra_tags; returns None when the run was recorded without those tags
+    (k6 --system-tags must include vu,iter).
+    """
+    points = df[df['metric_name'] == metric]
+    columns = {}
+    for tag in SCHEDULE_TAGS:
+        if tag in points.columns:
+            columns[tag] = points[tag]
+        elif 'extra_tags' in points.columns:
+            columns[tag] = split_tags(points['extra_tags'], (tag,))[tag]
+    if len(columns) < len(SCHEDULE_TAGS):
+        return None
+
+    frame = pd.DataFrame({
+        'vu': pd.to_numeric(columns['vu'].astype(object), errors='coerce'),
+        'iter': pd.to_numeric(columns['iter'].astype(object), errors='coerce'),
+        'latency': points['metric_value'].values.astype(np.float64),
+    }, index=points.index)
+    if frame['vu'].isna().all():
+        return None
+    for column in GROUP_COLUMNS:
+        if column in points.columns:
+            frame[column] = points[column]
+    stamps = points['datetime'].values.astype('datetime64[ns]').view(np.int64) / 1e6
+    frame['start_ms'] = stamps - frame['latency'].values
+    frame = frame.dropna(subset=['vu', 'iter', 'latency'])
+    frame['group'], keys = _group_codes(frame, GROUP_COLUMNS)
+    frame = frame.sort_values(['group', 'vu', 'iter'], kind='stable')
+    frame.attrs['groups'] = keys
+    return frame
+
+
+def expected_intervals(points):
+    """{(scenario, role): median ms between consecutive iterations of one VU}
+
+    A closed-loop VU cannot start an iteration before the previous response,
+    so the interval is never taken below the role's median latency (gaps
+    that short mean the vu/iter tags do not describe one sequential VU).
+    """
+    intervals = {}
+    group, vu = points['group'].values, points['vu'].values
+    iteration, start = points['iter'].values, points['start_ms'].values
+    same_vu = ((group[1:] == group[:-1]) & (vu[1:] == vu[:-1])
+               & (iteration[1:] > iteration[:-1]))
+    # Gaps divided by the iterations they span, so missing samples do not inflate them
+    gaps = np.full(len(points), np.nan)
+    gaps[1:][same_vu] = (np.diff(start)[same_vu] / np.diff(iteration)[same_vu])
+    for position, key in enumerate(points.attrs['groups']):
+        in_group = group == position
+        group_gaps = gaps[in_group & (gaps > 0)]
+        if len(group_gaps):
+            intervals[key] = max(float(np.median(group_gaps)),
+                                 float(np.median(points['latency'].values[in_group])))
+    return intervals
+
+
+def backfill(values, expected_ms, limit=MAX_BACKFILL):
+    """Latencies of the requests a VU skipped while waiting on each sample
+
+    A value v >= 2 * expected yields v - expected, v - 2 * expected, ... down
+    to expected (HdrHistogram back-fill).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not expected_ms or expected_ms <= 0 or len(values) == 0:
+        return np.empty(0)
+    counts = np.clip(np.floor(values / expected_ms) - 1, 0, limit).astype(np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0)
+    repeated = np.repeat(values, counts)
+    # Position of each synthetic value within its sample's run: 1, 2, ...
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    return repeated - offsets * expected_ms
+
+
+def corrected_sketches(df, metric=REQUEST_METRIC, expected_ms=None):
+    """{(scenario, role): (raw sketch, corrected sketch, expected ms, back-filled)}
+
+    `expected_ms` overrides the interval estimated from the schedule. Returns
+    None when the run has no vu/iter tags.
+    """
+    points = schedule_points(df, metric)
+    if points is None:
+        return None
+    intervals = expected_intervals(points)
+    codes, latency = points['group'].values, points['latency'].values
+    sketches = {}
+    for position, key in enumerate(points.attrs['groups']):
+        values = latency[codes == position]
+        interval = expected_ms or intervals.get(key)
+        raw = LatencySketch().add_many(values)
+        extra = backfill(values, interval)
+        corrected = LatencySketch().add_many(values).add_many(extra)
+        sketches[key] = (raw, corrected, interval, len(extra))
+    return sketches
+
+
+def omission_table(df, metric=REQUEST_METRIC, expected_ms=None, quantiles=REPORT_QUANTILES):
+    """Raw and corrected percentiles per scenario role, or None without vu/iter tags"""
+    sketches = corrected_sketches(df, metric, expected_ms)
+    if sketches is None:
+        return None
+    rows = []
+    for (scenario, role), (raw, corrected, interval, added) in sorted(
+            sketches.items(), key=lambda item: tuple(str(part) for part in item[0])):
+        row = {'scenario': scenario, 'role': role, 'samples': raw.count,
+               'expected_ms': interval, 'backfilled': added}
+        for q, value in zip(quantiles, raw.quantiles(quantiles)):
+            row[f'raw_p{q * 100:g}'] = value
+        for q, value in zip(quantiles, corrected.quantiles(quantiles)):
+            row[f'corrected_p{q * 100:g}'] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def format_omission(table):
+    """Human-readable raw vs corrected percentile table"""
+    if table is None:
+        return ['⚠️  No vu/iter tags in this run - coordinated omission cannot be corrected',
+                '   (run k6 with --system-tags including vu,iter)']
+    lines = [f"{'Scenario':<18}{'Role':<8}{'Samples':>9}{'Interval':>10}{'Added':>9}"
+             f"{'p50':>8}{'p95':>14}{'p99':>14}"]
+    for row in table.to_dict('records'):
+        interval = f"{row['expected_ms']:.0f}ms" if row['expected_ms'] else '-'
+        lines.append(f"{str(row['scenario']):<18}{str(row['role']):<8}{row['samples']:>9,}"
+                     f"{interval:>10}{row['backfilled']:>9,}{row['raw_p50']:>8.0f}"
+                     f"{row['raw_p95']:>7.0f} → {row['corrected_p95']:<4.0f}"
+                     f"{row['raw_p99']:>7.0f} → {row['corrected_p99']:<4.0f}")
+    return lines
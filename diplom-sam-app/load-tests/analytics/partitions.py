@@ -0,0 +1,308 @@
+"""
+Hot partition simulator for the shardForTenant key layout
+Products and orders use `shardId = <tenant>-<n>` as partition key: a write
+goes to a random suffix n in 1..10 (randSuffix) and a list read queries all
+10 shards of the tenant. DynamoDB caps a single partition key value at 3000
+RCU and 1000 WCU per second, however many physical partitions the table has.
+A recorded or synthetic request stream is replayed through the same sharding
+in chunks of a few seconds, with per-second key loads counted by np.bincount,
+so tens of millions of events take seconds. The report ranks the tenant/shard
+keys that throttle first and sweeps the tenant count up to 10k+
+"""
+
+import numpy as np
+import pandas as pd
+
+from .capacity import PARTITION_RCU_LIMIT, PARTITION_WCU_LIMIT, READ_OPERATIONS
+from .fanout import CURRENT_SHARDS
+
+DEFAULT_TENANT_COUNTS = (100, 1000, 10000, 20000)
+DEFAULT_DURATION_S = 600
+DEFAULT_RATE_PER_TENANT = 5.0
+DEFAULT_WRITE_SHARE = 0.3
+# Zipf exponent of tenant popularity: a few tenants send most of the traffic
+DEFAULT_SKEW = 1.1
+
+WCU_PER_WRITE = 1.0
+RCU_PER_QUERY = 0.5
+
+# Per-chunk count matrix size (seconds x keys)
+MAX_CHUNK_CELLS = 4_000_000
+
+
+class Workload:
+    """Synthetic request stream: tenants, total rate, read/write mix and popularity skew"""
+
+    def __init__(self, tenants, rate_per_tenant=DEFAULT_RATE_PER_TENANT,
+                 duration_s=DEFAULT_DURATION_S, write_share=DEFAULT_WRITE_SHARE,
+                 skew=DEFAULT_SKEW, shards=CURRENT_SHARDS, wcu_per_write=WCU_PER_WRITE,
+                 rcu_per_query=RCU_PER_QUERY, seed=0):
+        self.tenants = int(tenants)
+        self.rate_per_tenant = rate_per_tenant
+        self.duration_s = int(duration_s)
+        self.write_share = write_share
+        self.skew = skew
+        self.shards = shards
+        self.wcu_per_write = wcu_per_write
+        self.rcu_per_query = rcu_per_query
+        self.seed = seed
+
+    @property
+    def events(self):
+        return int(self.tenants * self.rate_per_tenant * self.duration_s)
+
+    def popularity(self):
+        """Share of the traffic of each tenant (Zipf, rank 1 first)"""
+        weights = 1.0 / np.arange(1, self.tenants + 1) ** self.skew
+        return weights / weights.sum()
+
+    def chunks(self, chunk_s):
+        """Event arrays per chunk of `chunk_s` seconds
+
+        Writes carry their key (tenant * shards + random suffix, as
+        shardForTenant does); list reads carry the tenant and hit every shard.
+        """
+        rng = np.random.default_rng(self.seed)
+        share = self.popularity()
+        per_second = self.tenants * self.rate_per_tenant
+        tenant_ids = np.arange(self.tenants, dtype=np.int64)
+        for start in range(0, self.duration_s, chunk_s):
+            seconds = min(chunk_s, self.duration_s - start)
+            counts = rng.multinomial(rng.poisson(per_second * seconds), share)
+            writes = rng.binomial(counts, self.write_share)
+            write_tenants = np.repeat(tenant_ids, writes)
+            read_tenants = np.repeat(tenant_ids, counts - writes)
+            suffix = rng.integers(0, self.shards, len(write_tenants), dtype=np.int64)
+            yield {
+                'start': start, 'seconds': seconds,
+                'write_keys': write_tenants * self.shards + suffix,
+                'write_sec': rng.integers(0, seconds, len(write_tenants), dtype=np.int64),
+                'write_units': self.wcu_per_write,
+                'read_tenants': read_tenants,
+                'read_sec': rng.integers(0, seconds, len(read_tenants), dtype=np.int64),
+                'read_units': self.rcu_per_query,
+                'point_keys': np.empty(0, dtype=np.int64),
+                'point_sec': np.empty(0, dtype=np.int64),
+                'point_units': 0.0,
+            }
+
+
+class RecordedStream:
+    """consumed_capacity records (analytics.capacity) replayed with a new shard count
+
+    Writes are re-sharded with a random suffix. A point `get` stays on its
+    recorded shard suffix (modulo `shards`, random without a shard id). A
+    `query` is one shard of a queryByShard list read: the list read counts
+    once per request and table and is replayed on every shard of its tenant.
+    A `scan` has no partition key, so it loads no tenant shard and is only
+    counted in `scans`.
+    """
+
+    def __init__(self, frame, shards=CURRENT_SHARDS, seed=0):
+        frame = frame.dropna(subset=['time'])
+        self.names = sorted(frame['tenant'].astype(str).unique())
+        self.tenants = len(self.names)
+        self.shards = shards
+        self.seed = seed
+        start = frame['time'].min()
+        self.second = ((frame['time'] - start) // 1000).astype(np.int64).values
+        self.duration_s = int(self.second.max()) + 1 if len(frame) else 0
+        self.tenant = pd.Categorical(frame['tenant'].astype(str),
+                                     categories=self.names).codes.astype(np.int64)
+        operation = frame['operation'].astype(str).values
+        reads = np.isin(operation, READ_OPERATIONS)
+        queries = operation == 'query'
+        # A list read logs one query per shard; count it once per request and table
+        first_query = ~frame.duplicated(['request_id', 'tenant', 'table', 'operation']).values
+        self.read = queries & (first_query | frame['request_id'].isna().values)
+        self.point = operation == 'get'
+        self.write = ~reads
+        self.scans = int((operation == 'scan').sum())
+        suffix = pd.to_numeric(frame['shard'].astype(str).str.rpartition('-')[2],
+                               errors='coerce').values
+        # Recorded suffixes run 1..N; -1 marks a get without a shard id
+        self.suffix = np.where(np.isnan(suffix), -1, suffix - 1).astype(np.int64)
+        self.read_units = np.where(self.read | self.point, frame['rcu'].values, 0.0)
+        self.write_units = frame['wcu'].values
+        self.events = int(self.read.sum() + self.point.sum() + self.write.sum())
+
+    def chunks(self, chunk_s):
+        rng = np.random.default_rng(self.seed)
+        order = np.argsort(self.second, kind='stable')
+        second, tenant = self.second[order], self.tenant[order]
+        read, write, point = self.read[order], self.write[order], self.point[order]
+        read_units, write_units = self.read_units[order], self.write_units[order]
+        suffix = self.suffix[order]
+        bounds = np.searchsorted(second, np.arange(0, self.duration_s + chunk_s, chunk_s))
+        for index, start in enumerate(range(0, self.duration_s, chunk_s)):
+            part = slice(bounds[index], bounds[index + 1])
+            seconds = min(chunk_s, self.duration_s - start)
+            w, r, g = write[part], read[part], point[part]
+            write_tenants = tenant[part][w]
+            point_suffix = suffix[part][g]
+            point_suffix = np.where(point_suffix >= 0, point_suffix % self.shards,
+                                    rng.integers(0, self.shards, len(point_suffix)))
+            yield {
+                'start': start, 'seconds': seconds,
+                'write_keys': write_tenants * self.shards
+                + rng.integers(0, self.shards, len(write_tenants)),
+                'write_sec': second[part][w] - start,
+                'write_units': write_units[part][w],
+                'read_tenants': tenant[part][r],
+                'read_sec': second[part][r] - start,
+                # Recorded RCU covers one shard's query; every shard is queried
+                'read_units': read_units[part][r],
+                'point_keys': tenant[part][g] * self.shards + point_suffix,
+                'point_sec': second[part][g] - start,
+                'point_units': read_units[part][g],
+            }
+
+
+class PartitionLoad:
+    """Per-key peaks, totals and throttled seconds of a replayed stream"""
+
+    def __init__(self, tenants, shards=CURRENT_SHARDS, partitions=None):
+        self.tenants = tenants
+        self.shards = shards
+        keys = tenants * shards
+        self.wcu = np.zeros(keys)
+        self.rcu = np.zeros(keys)
+        self.peak_wcu = np.zeros(keys)
+        self.peak_rcu = np.zeros(keys)
+        self.peak = np.zeros(keys)
+        self.throttled_seconds = np.zeros(keys, dtype=np.int64)
+        self.first_throttle = np.full(keys, -1, dtype=np.int64)
+        self.partitions = partitions
+        self.partition_of = (_hash_keys(keys) % partitions) if partitions else None
+        self.partition_peak = np.zeros(partitions) if partitions else None
+        self.events = 0
+        self.seconds = 0
+
+    def add_chunk(self, chunk):
+        keys, seconds = self.tenants * self.shards, chunk['seconds']
+        wcu = np.bincount(chunk['write_sec'] * keys + chunk['write_keys'],
+                          weights=_weights(chunk['write_units'], len(chunk['write_keys'])),
+                          minlength=seconds * keys).reshape(seconds, keys)
+        per_tenant = np.bincount(chunk['read_sec'] * self.tenants + chunk['read_tenants'],
+                                 weights=_weights(chunk['read_units'], len(chunk['read_tenants'])),
+                                 minlength=seconds * self.tenants).reshape(seconds, self.tenants)
+        # Key ids are tenant-major, so a fan-out read repeats over the tenant's shards
+        rcu = np.repeat(per_tenant, self.shards, axis=1)
+        if len(chunk['point_keys']):
+            rcu = rcu + np.bincount(chunk['point_sec'] * keys + chunk['point_keys'],
+                                    weights=_weights(chunk['point_units'],
+                                                     len(chunk['point_keys'])),
+                                    minlength=seconds * keys).reshape(seconds, keys)
+
+        utilization = np.maximum(wcu / PARTITION_WCU_LIMIT, rcu / PARTITION_RCU_LIMIT)
+        over = utilization > 1.0
+        first = np.where(over.any(axis=0), over.argmax(axis=0) + chunk['start'], -1)
+        fresh = (self.first_throttle < 0) & (first >= 0)
+        self.first_throttle[fresh] = first[fresh]
+        self.throttled_seconds += over.sum(axis=0)
+        self.wcu += wcu.sum(axis=0)
+        self.rcu += rcu.sum(axis=0)
+        np.maximum(self.peak_wcu, wcu.max(axis=0), out=self.peak_wcu)
+        np.maximum(self.peak_rcu, rcu.max(axis=0), out=self.peak_rcu)
+        np.maximum(self.peak, utilization.max(axis=0), out=self.peak)
+        if self.partitions:
+            # Physical partitions: 1000 WCU / 3000 RCU each across their hashed keys
+            combined = (wcu / PARTITION_WCU_LIMIT + rcu / PARTITION_RCU_LIMIT)
+            for row in combined:
+                np.maximum(self.partition_peak,
+                           np.bincount(self.partition_of, weights=row, minlength=self.partitions),
+                           out=self.partition_peak)
+        self.events += (len(chunk['write_keys']) + len(chunk['read_tenants'])
+                        + len(chunk['point_keys']))
+        self.seconds += seconds
+        return self
+
+    def key_table(self, names=None, top=None):
+        """Keys sorted by peak utilization (first to throttle on top)"""
+        tenant, suffix = np.divmod(np.arange(len(self.peak)), self.shards)
+        labels = (np.asarray(names, dtype=object)[tenant] if names is not None
+                  else np.char.add('tenant-', np.char.zfill(tenant.astype(str), 5)))
+        table = pd.DataFrame({
+            'tenant': labels, 'shard': suffix + 1, 'peak_wcu': self.peak_wcu,
+            'peak_rcu': self.peak_rcu, 'peak': self.peak,
+            'throttled_seconds': self.throttled_seconds,
+            'first_throttle_s': np.where(self.first_throttle >= 0, self.first_throttle, np.nan),
+        })
+        table['shard_id'] = table['tenant'] + '-' + table['shard'].astype(str)
+        table = table.sort_values(['peak', 'throttled_seconds'], ascending=False, ignore_index=True)
+        return table.head(top) if top else table
+
+    def summary(self):
+        throttled = self.throttled_seconds > 0
+        tenant_throttled = throttled.reshape(self.tenants, self.shards).any(axis=1)
+        row = {'tenants': self.tenants, 'events': self.events, 'seconds': self.seconds,
+               'max_peak': float(self.peak.max()) if len(self.peak) else 0.0,
+               'keys_throttled': int(throttled.sum()),
+               'tenants_throttled': int(tenant_throttled.sum()),
+               'throttled_key_seconds': int(self.throttled_seconds.sum())}
+        if self.partitions:
+            row['partition_peak'] = float(self.partition_peak.max())
+        return row
+
+
+def _weights(units, count):
+    """bincount weights: None for one unit, a constant or per-event units"""
+    if np.isscalar(units):
+        return None if units == 1 else np.full(count, float(units))
+    return np.asarray(units, dtype=np.float64)
+
+
+def _hash_keys(count):
+    """Stable pseudo-random physical partition index of each key id"""
+    keys = np.arange(count, dtype=np.uint64)
+    return ((keys * np.uint64(2654435761) + np.uint64(0x9E3779B9)) >> np.uint64(7)).astype(np.int64)
+
+
+def simulate(stream, partitions=None):
+    """Replay a Workload or RecordedStream; returns the PartitionLoad"""
+    chunk_s = max(1, min(60, MAX_CHUNK_CELLS // max(1, stream.tenants * stream.shards)))
+    load = PartitionLoad(stream.tenants, stream.shards, partitions)
+    for chunk in stream.chunks(chunk_s):
+        load.add_chunk(chunk)
+    return load
+
+
+def max_tenant_write_rate(shards=CURRENT_SHARDS, wcu_per_write=WCU_PER_WRITE):
+    """Steady writes/s one tenant can sustain before its shards hit the WCU limit"""
+    return shards * PARTITION_WCU_LIMIT / wcu_per_write
+
+
+def growth_sweep(tenant_counts=DEFAULT_TENANT_COUNTS, partitions=None, **workload):
+    """Summary row per tenant count; also returns the load of the largest one"""
+    rows, load = [], None
+    for count in tenant_counts:
+        spec = Workload(count, **workload)
+        load = simulate(spec, partitions)
+        row = load.summary()
+        row['total_rps'] = count * spec.rate_per_tenant
+        row['top_tenant_write_rps'] = row['total_rps'] * spec.popularity()[0] * spec.write_share
+        rows.append(row)
+    return pd.DataFrame(rows), load
+
+
+def format_sweep(table):
+    """Human-readable growth sweep"""
+    lines = [f"{'Tenants':>8}{'Events':>13}{'Total rps':>11}{'Top writes/s':>14}{'Peak':>8}"
+             f"{'Keys 429':>10}{'Tenants 429':>13}"]
+    for row in table.to_dict('records'):
+        lines.append(f"{row['tenants']:>8,}{row['events']:>13,}{row['total_rps']:>11,.0f}"
+                     f"{row['top_tenant_write_rps']:>14,.0f}{row['max_peak'] * 100:>7.0f}%"
+                     f"{row['keys_throttled']:>10,}{row['tenants_throttled']:>13,}")
+    return lines
+
+
+def format_keys(table):
+    """Human-readable hottest keys"""
+    lines = [f"{'Shard id':<22}{'Peak WCU/s':>11}{'Peak RCU/s':>11}{'Peak':>8}{'429 s':>7}"
+             f"{'First 429':>11}"]
+    for row in table.to_dict('records'):
+        first = f"{row['first_throttle_s']:.0f}s" if not np.isnan(row['first_throttle_s']) else '-'
+        marker = '  🔥' if row['throttled_seconds'] else ''
+        lines.append(f"{row['shard_id']:<22}{row['peak_wcu']:>11,.0f}{row['peak_rcu']:>11,.0f}"
+                     f"{row['peak'] * 100:>7.0f}%{row['throttled_seconds']:>7,}{first:>11}{marker}")
+    return lines
@@ -0,0 +1,335 @@
+"""
+Usage plan limit planner from recorded arrivals
+API Gateway throttles each API key with a token bucket (rate, burst). BASIC
+and STANDARD tenants share their tier's key, PREMIUM tenants have one key
+each and PLATINUM a dedicated one, so a shared key couples its tenants. The
+recorded per-tenant arrivals of a k6 run (or of production logs) are cut into
+one-second blocks of tick counts and block-bootstrapped into many replicate
+streams. Every candidate (rate, burst) of a tier is simulated against all
+replicates at once, NumPy arrays spanning candidates x replicates x keys,
+giving the throttle probability of the tier and of its victim traffic with
+a bootstrap confidence. The recommended limit is the lowest candidate that
+keeps victims under the target throttle rate with that confidence
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .results import REQUEST_METRIC
+
+# Tiers whose tenants share one API key (see standin.plan_keys)
+SHARED_TIERS = ('BASIC', 'STANDARD')
+TIER_ORDER = ('BASIC', 'STANDARD', 'PREMIUM', 'PLATINUM')
+
+DEFAULT_TICK_MS = 20
+DEFAULT_HORIZON_S = 60
+DEFAULT_REPLICATES = 200
+DEFAULT_TARGET = 0.01
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RATES = (5.0, 500.0)
+DEFAULT_RATE_STEPS = 40
+DEFAULT_BURST_FACTORS = (1.0, 2.0)
+
+
+def arrivals_from_frame(df, metric=REQUEST_METRIC):
+    """Arrival times (ms) with tenant, tier and role from a k6 point frame
+
+    k6 stamps a sample when the response arrives, so the arrival at the
+    gateway is the sample time minus its duration.
+    """
+    points = df[df['metric_name'] == metric]
+    stamps = points['datetime'].values.astype('datetime64[ns]').view(np.int64) / 1e6
+    frame = pd.DataFrame({'time_ms': stamps - points['metric_value'].values.astype(np.float64)})
+    for column in ('tenant', 'tier', 'role'):
+        values = points[column].astype(object) if column in points else None
+        frame[column] = values.values if values is not None else None
+    frame['role'] = frame['role'].fillna('other')
+    return frame.dropna(subset=['tenant', 'tier'])
+
+
+def arrivals_from_logs(filenames, tiers=None):
+    """Arrivals from consumed_capacity records: one per Lambda request"""
+    from .capacity import parse_capacity_logs
+
+    records = parse_capacity_logs(filenames, tiers).dropna(subset=['request_id', 'time'])
+    first = records.drop_duplicates('request_id')
+    return pd.DataFrame({'time_ms': first['time'].astype(float).values,
+                         'tenant': first['tenant'].values, 'tier': first['tier'].values,
+                         'role': 'other'})
+
+
+class ArrivalProfile:
+    """Per-second blocks of per-tick arrival counts for each (tenant, tier, role) stream"""
+
+    def __init__(self, arrivals, tick_ms=DEFAULT_TICK_MS):
+        if 1000 % tick_ms:
+            raise ValueError('tick_ms must divide 1000')
+        self.tick_ms = tick_ms
+        self.ticks_per_second = 1000 // tick_ms
+        codes, uniques = pd.MultiIndex.from_frame(
+            arrivals[['tenant', 'tier', 'role']].astype(str)).factorize()
+        self.streams = [tuple(value) for value in uniques]
+        offset = arrivals['time_ms'].values - (arrivals['time_ms'].min() if len(arrivals) else 0)
+        second = (offset // 1000).astype(np.int64)
+        tick = ((offset % 1000) // tick_ms).astype(np.int64)
+        self.seconds = int(second.max()) + 1 if len(second) else 0
+        shape = (self.seconds, self.ticks_per_second, len(self.streams))
+        flat = (second * self.ticks_per_second + tick) * len(self.streams) + codes
+        self.counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape).astype(np.int32)
+
+    def tiers(self):
+        present = {tier for _, tier, _ in self.streams}
+        return [tier for tier in TIER_ORDER if tier in present] + sorted(present - set(TIER_ORDER))
+
+    def rates(self):
+        """Mean requests/s per stream over the recording"""
+        return dict(zip(self.streams, self.counts.sum(axis=(0, 1)) / max(self.seconds, 1)))
+
+    def bootstrap(self, horizon_s=DEFAULT_HORIZON_S, replicates=DEFAULT_REPLICATES, seed=0):
+        """(replicates, ticks, streams) counts from recorded seconds drawn with replacement
+
+        Whole seconds are drawn for all streams together, so tenants that
+        burst at the same time keep doing so.
+        """
+        rng = np.random.default_rng(seed)
+        blocks = rng.integers(0, self.seconds, (replicates, horizon_s))
+        return self.counts[blocks].reshape(replicates, horizon_s * self.ticks_per_second,
+                                           len(self.streams))
+
+
+def stream_keys(streams):
+    """API key of each stream: the tier for shared tiers, otherwise the tenant"""
+    return [tier if tier in SHARED_TIERS else f'{tier}:{tenant}' for tenant, tier, _ in streams]
+
+
+def simulate_buckets(counts, keys, rates, bursts, tick_s):
+    """Throttled requests per (candidate, replicate, stream)
+
+    counts: (replicates, ticks, streams); keys: key index per stream;
+    rates/bursts: one value per candidate. Each bucket refills by rate *
+    elapsed time up to burst and admits whole tokens; when a key rejects part
+    of a tick's requests, every stream on that key loses the same share.
+    """
+    keys = np.asarray(keys)
+    n_keys = keys.max() + 1
+    one_hot = np.zeros((len(keys), n_keys))
+    one_hot[np.arange(len(keys)), keys] = 1.0
+    key_counts = counts @ one_hot  # (replicates, ticks, keys)
+
+    rate = np.asarray(rates, dtype=np.float64)[:, None, None]
+    burst = np.asarray(bursts, dtype=np.float64)[:, None, None]
+    tokens = np.broadcast_to(burst, (len(rate), counts.shape[0], n_keys)).copy()
+    throttled = np.zeros((len(rate), counts.shape[0], counts.shape[2]))
+
+    # Only ticks with arrivals need a step; refill covers the gap since the last one
+    active = np.flatnonzero(key_counts.sum(axis=(0, 2)))
+    last = 0
+    for tick in active:
+        np.minimum(tokens + rate * ((tick - last) * tick_s), burst, out=tokens)
+        last = tick
+        demand = key_counts[:, tick, :]
+        admitted = np.minimum(demand, np.floor(tokens))
+        tokens -= admitted
+        rejected_share = np.where(demand > 0, (demand - admitted) / np.maximum(demand, 1), 0.0)
+        throttled += rejected_share[:, :, keys] * counts[:, tick, :]
+    return throttled
+
+
+def _victims(streams):
+    """Streams whose throttling counts as victim impact (none if all are noisy)"""
+    roles = [role for _, _, role in streams]
+    if 'victim' in roles:
+        return np.array([role == 'victim' for role in roles])
+    return np.array([role != 'noisy' for role in roles], dtype=bool)
+
+
+def evaluate_tier(profile, counts, tier, rates, bursts, target=DEFAULT_TARGET,
+                  confidence=DEFAULT_CONFIDENCE):
+    """Throttle statistics of every (rate, burst) candidate for one tier
+
+    The victim columns are NaN for a tier with only noisy streams (BASIC in
+    the noisy neighbor test): there is no victim traffic to protect.
+    """
+    index = [i for i, (_, stream_tier, _) in enumerate(profile.streams) if stream_tier == tier]
+    streams = [profile.streams[i] for i in index]
+    names = stream_keys(streams)
+    keys = pd.factorize(pd.Series(names))[0]
+    tier_counts = counts[:, :, index]
+    throttled = simulate_buckets(tier_counts, keys, rates, bursts, profile.tick_ms / 1000)
+
+    arrivals = tier_counts.sum(axis=1).astype(np.float64)  # (replicates, streams)
+    victims = _victims(streams)
+    noisy = np.array([role == 'noisy' for _, _, role in streams])
+
+    def share(mask):
+        total = arrivals[:, mask].sum(axis=1)
+        return throttled[:, :, mask].sum(axis=2) / np.maximum(total, 1)  # (candidates, replicates)
+
+    tier_p = share(np.ones(len(streams), dtype=bool))
+    victim_p = share(victims) if victims.any() else np.full_like(tier_p, np.nan)
+    table = pd.DataFrame({
+        'tier': tier, 'rate': rates, 'burst': bursts, 'keys': keys.max() + 1,
+        'victims': int(victims.sum()),
+        'tier_throttle': tier_p.mean(axis=1),
+        'victim_throttle': victim_p.mean(axis=1),
+        'victim_upper': np.quantile(victim_p, confidence, axis=1),
+        'confidence': (victim_p <= target).mean(axis=1) if victims.any() else np.nan,
+        'noisy_throttle': share(noisy).mean(axis=1) if noisy.any() else np.nan,
+    })
+    return table
+
+
+def candidate_grid(low=DEFAULT_RATES[0], high=DEFAULT_RATES[1], steps=DEFAULT_RATE_STEPS,
+                   burst_factors=DEFAULT_BURST_FACTORS, extra=()):
+    """(rates, bursts) of a log-spaced rate grid times burst factors, plus extra pairs"""
+    grid = np.unique(np.round(np.geomspace(low, high, steps)))
+    pairs = {(float(rate), float(rate * factor)) for rate in grid for factor in burst_factors}
+    pairs.update((float(rate), float(burst)) for rate, burst in extra)
+    pairs = sorted(pairs)
+    return [rate for rate, _ in pairs], [burst for _, burst in pairs]
+
+
+def current_limits(script=None, template=None):
+    """{config: {TIER: (rate, burst)}} for the testing and deployed usage plans
+
+    `testing` is the script's rateLimit as used by run-noisy-test.sh (rate =
+    burst), `deployed` the UsagePlan resources of the SAM template.
+    """
+    from .loadgen import parse_script
+    from .standin import template_plans
+
+    configs = {}
+    if script and os.path.exists(script):
+        _, tenants, _ = parse_script(script)
+        testing = {}
+        for tenant in tenants.values():
+            if tenant.tier and tenant.rate_limit:
+                testing.setdefault(tenant.tier, (tenant.rate_limit, tenant.rate_limit))
+        if testing:
+            configs['testing'] = testing
+    if template and os.path.exists(template):
+        plans = template_plans(template)
+        if plans:
+            configs['deployed'] = {tier: (rate, burst) for tier, (rate, burst, _) in plans.items()}
+    return configs
+
+
+def plan(profile, horizon_s=DEFAULT_HORIZON_S, replicates=DEFAULT_REPLICATES,
+         target=DEFAULT_TARGET, confidence=DEFAULT_CONFIDENCE, grid=None, current=None, seed=0):
+    """Candidate table for every tier of the profile
+
+    `current` ({name: {TIER: (rate, burst)}}) adds configurations to compare
+    against; their rows carry the name in the `config` column.
+    """
+    counts = profile.bootstrap(horizon_s, replicates, seed)
+    rates, bursts = grid or candidate_grid()
+    tables = []
+    for tier in profile.tiers():
+        tier_rates, tier_bursts, labels = list(rates), list(bursts), [None] * len(rates)
+        for name, limits in (current or {}).items():
+            if tier in limits:
+                tier_rates.append(limits[tier][0])
+                tier_bursts.append(limits[tier][1])
+                labels.append(name)
+        table = evaluate_tier(profile, counts, tier, tier_rates, tier_bursts, target, confidence)
+        table['config'] = labels
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+
+def recommend(table, confidence=DEFAULT_CONFIDENCE):
+    """Lowest-rate grid candidate per tier meeting the victim target with `confidence`
+
+    Tiers where no candidate qualifies get NaN limits: raising a shared key's
+    limit does not isolate its victims within the searched range. Tiers
+    without victim streams are not planned and get NaN limits as well.
+    """
+    rows = []
+    grid = table[table['config'].isna()]
+    for tier, data in grid.groupby('tier', sort=False):
+        if not data['victims'].iloc[0]:
+            row = data.iloc[0].to_dict()
+            row.update(rate=np.nan, burst=np.nan, tier_throttle=np.nan)
+            rows.append(row)
+            continue
+        passing = data[data['confidence'] >= confidence].sort_values(['rate', 'burst'])
+        if len(passing):
+            rows.append(passing.iloc[0].to_dict())
+        else:
+            best = data.sort_values(['confidence', 'rate'], ascending=[False, True]).iloc[0]
+            row = best.to_dict()
+            row.update(rate=np.nan, burst=np.nan)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def format_plan(table, recommended, target=DEFAULT_TARGET, confidence=DEFAULT_CONFIDENCE):
+    """Human-readable recommendation with the current configurations for comparison"""
+    lines = [f"🎯 Victim throttle ≤ {target:.1%} in ≥ {confidence:.0%} of bootstrap replicates", '',
+             f"{'Tier':<10}{'Config':<14}{'Rate':>7}{'Burst':>7}{'Tier 429':>10}{'Victim 429':>12}"
+             f"{'Upper':>8}{'Conf':>7}"]
+
+    def cell(value, spec):
+        return '-' if np.isnan(value) else format(value, spec)
+
+    def line(row, config):
+        return (f"{row['tier']:<10}{config:<14}{cell(row['rate'], '.0f'):>7}"
+                f"{cell(row['burst'], '.0f'):>7}{cell(row['tier_throttle'], '.1%'):>9}"
+                f"{cell(row['victim_throttle'], '.2%'):>12}{cell(row['victim_upper'], '.2%'):>8}"
+                f"{cell(row['confidence'], '.0%'):>7}")
+
+    for row in recommended.to_dict('records'):
+        if not row['victims']:
+            lines.append(f"{row['tier']:<10}{'-':<14}ℹ️  no victims, not planned "
+                         f"(only noisy tenants on this tier)")
+        else:
+            lines.append(line(row, 'recommended'))
+        if row['victims'] and np.isnan(row['rate']):
+            lines.append(f"{'':<10}⚠️  no limit up to the grid maximum isolates the victims "
+                         f"(best: {row['confidence']:.0%} confidence)")
+        for current in table[(table['tier'] == row['tier'])
+                             & table['config'].notna()].to_dict('records'):
+            lines.append(line(current, current['config']))
+    return lines
+
+
+def create_plan_chart(table, recommended, output_file='limit_plan.png', target=DEFAULT_TARGET):
+    """Victim and tier throttle probability vs rate limit, one panel per tier"""
+    import matplotlib.pyplot as plt
+
+    tiers = list(dict.fromkeys(table['tier']))
+    fig, axes = plt.subplots(1, len(tiers), figsize=(5 * len(tiers), 4.5), squeeze=False)
+    fig.suptitle('Usage Plan Limit Planner: Throttle Probability vs Rate Limit', fontsize=15,
+                 fontweight='bold')
+    for ax, tier in zip(axes[0], tiers):
+        data = table[(table['tier'] == tier) & table['config'].isna()]
+        has_victims = bool(data['victims'].iloc[0])
+        burst_factor = data['burst'] / data['rate']
+        for factor, part in data.groupby(burst_factor.round(2)):
+            part = part.sort_values('rate')
+            if has_victims:
+                ax.plot(part['rate'], part['victim_throttle'] * 100, marker='o', markersize=3,
+                        label=f'victims (burst {factor:g}×)')
+                ax.fill_between(part['rate'], part['victim_throttle'] * 100,
+                                part['victim_upper'] * 100, alpha=0.15)
+            ax.plot(part['rate'], part['tier_throttle'] * 100, linestyle=':', alpha=0.7,
+                    label=f'whole tier (burst {factor:g}×)')
+        if has_victims:
+            ax.axhline(target * 100, color='gray', linestyle='--', label=f'target {target:.0%}')
+        pick = recommended[recommended['tier'] == tier]
+        if len(pick) and not np.isnan(pick['rate'].iloc[0]):
+            ax.axvline(pick['rate'].iloc[0], color='#2ECC71', linewidth=2,
+                       label=f"recommended {pick['rate'].iloc[0]:.0f} req/s")
+        ax.set_xscale('log')
+        ax.set_xlabel('Rate limit (req/s)')
+        ax.set_ylabel('Throttled requests (%)')
+        ax.set_title(tier if has_victims else f'{tier} (no victims, not planned)')
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {output_file}")
+    return output_file
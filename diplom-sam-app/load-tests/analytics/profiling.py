@@ -0,0 +1,298 @@
+"""
+Per-stage profiling for the visualize scripts and the analytics CLI
+Code marks named stages with `stage()` or `@profiled()`; both cost a flag check
+unless profiling was switched on with `--profile`. Then every stage records
+wall and CPU time, the tracemalloc peak above its start and the peak RSS,
+nested stages roll their peaks up into the enclosing one, and a stage table is
+printed at exit. `--profile-out FILE` also writes a cProfile dump (pstats,
+for snakeviz or flameprof) or, for `.folded`, stage stacks in the collapsed
+format flamegraph.pl and speedscope read
+"""
+
+import atexit
+import cProfile
+import functools
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_FLAG = '--profile'
+PROFILE_OUT_FLAG = '--profile-out'
+
+_active = None
+
+
+def reset_peak_rss():
+    """Restart the peak RSS from the current RSS (Linux); False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS; Linux keeps it across exec
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _process_age():
+    """Seconds since this process started (Linux), None elsewhere"""
+    try:
+        with open('/proc/self/stat') as f:
+            started = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, uptime - started / os.sysconf('SC_CLK_TCK'))
+
+
+class StageStats:
+    """Totals of every call of one stage path"""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc_peak = 0
+        self.rss_peak = 0.0
+
+    @property
+    def name(self):
+        return self.path[-1]
+
+
+class _Frame:
+    def __init__(self, path, memory):
+        self.path = path
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.alloc_start = self.alloc_peak = 0
+        if memory:
+            self.alloc_start, _ = tracemalloc.get_traced_memory()
+            self.alloc_peak = self.alloc_start
+        self.rss_peak = 0.0
+
+
+class Profiler:
+    """Stage tree with timings and memory peaks, plus an optional cProfile run"""
+
+    def __init__(self, memory=True, output=None):
+        self.memory = memory
+        self.output = output
+        self.stats = {}
+        self.cprofile = None
+        self._stack = []
+        self._imports = _process_age()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if output and not output.endswith('.folded'):
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self._push(('total',))
+
+    def _sample(self):
+        """Fold the peaks since the last reset into the innermost stage and reset them"""
+        frame = self._stack[-1]
+        if self.memory:
+            frame.alloc_peak = max(frame.alloc_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        frame.rss_peak = max(frame.rss_peak, peak_rss_mb())
+        reset_peak_rss()
+
+    def _push(self, path):
+        if self._stack:
+            self._sample()
+        else:
+            reset_peak_rss()
+        self._stack.append(_Frame(path, self.memory))
+
+    def _pop(self):
+        self._sample()
+        frame = self._stack.pop()
+        stats = self.stats.get(frame.path)
+        if stats is None:
+            stats = self.stats[frame.path] = StageStats(frame.path)
+        stats.calls += 1
+        stats.wall += time.perf_counter() - frame.wall
+        stats.cpu += time.process_time() - frame.cpu
+        stats.alloc_peak = max(stats.alloc_peak, frame.alloc_peak - frame.alloc_start)
+        stats.rss_peak = max(stats.rss_peak, frame.rss_peak)
+        if self._stack:
+            parent = self._stack[-1]
+            parent.alloc_peak = max(parent.alloc_peak, frame.alloc_peak)
+            parent.rss_peak = max(parent.rss_peak, frame.rss_peak)
+
+    @contextmanager
+    def stage(self, name):
+        self._push(self._stack[-1].path + (name,))
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def finish(self):
+        """Close open stages (innermost first) and stop cProfile"""
+        while self._stack:
+            self._pop()
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def rows(self):
+        """StageStats in tree order, children after their parent in order of first use"""
+        children = {}
+        for path in self.stats:
+            children.setdefault(path[:-1], []).append(path)
+        ordered, pending = [], [('total',)]
+        while pending:
+            path = pending.pop()
+            ordered.append(self.stats[path])
+            pending.extend(reversed(children.get(path, [])))
+        return ordered
+
+    def table(self):
+        total = self.stats[('total',)].wall or 1e-9
+        lines = [f"{'Stage':<40}{'Calls':>6}{'Wall s':>9}{'CPU s':>9}{'% wall':>8}"
+                 f"{'Alloc MB':>10}{'RSS MB':>8}"]
+        if self._imports is not None:
+            lines.append(f"{'(startup and imports)':<40}{1:>6}{self._imports:>9.3f}{'':>9}"
+                         f"{'':>8}{'':>10}{'':>8}")
+        for row in self.rows():
+            label = '  ' * (len(row.path) - 1) + row.name
+            alloc = f'{row.alloc_peak / 1024 ** 2:.1f}' if self.memory else '-'
+            lines.append(f"{label[:39]:<40}{row.calls:>6}{row.wall:>9.3f}{row.cpu:>9.3f}"
+                         f"{row.wall / total * 100:>7.1f}%{alloc:>10}{row.rss_peak:>8.0f}")
+        return lines
+
+    def folded(self):
+        """Collapsed stacks ('total;load;read_csv <self µs>') of the stage tree"""
+        children = {}
+        for path, stats in self.stats.items():
+            if len(path) > 1:
+                children[path[:-1]] = children.get(path[:-1], 0.0) + stats.wall
+        lines = []
+        for stats in self.rows():
+            path = stats.path
+            own = max(0.0, stats.wall - children.get(path, 0.0))
+            if own > 0:
+                lines.append(f"{';'.join(path)} {int(own * 1e6)}")
+        return lines
+
+    def write(self, filename):
+        if filename.endswith('.folded'):
+            with open(filename, 'w') as f:
+                f.write('\n'.join(self.folded()) + '\n')
+        elif self.cprofile is not None:
+            self.cprofile.dump_stats(filename)
+
+
+def enabled():
+    return _active is not None
+
+
+def enable(memory=True, output=None):
+    """Start profiling this process; stages until exit are recorded"""
+    global _active
+    if _active is None:
+        _active = Profiler(memory, output)
+        instrument_savefig()
+        atexit.register(_report)
+    return _active
+
+
+@contextmanager
+def stage(name):
+    """Named stage; a no-op unless profiling is enabled"""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+
+def profiled(name=None):
+    """Decorator running a function as a stage (named after it by default)"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_savefig():
+    """Time every Figure.savefig (plt.savefig included) as a `savefig` stage
+
+    Only once profiling is on and matplotlib is imported, so enabling the
+    profiler never pulls matplotlib into a headless command.
+    """
+    if _active is None or 'matplotlib' not in sys.modules:
+        return
+    from matplotlib.figure import Figure
+
+    if getattr(Figure.savefig, '_profiled', False):
+        return
+    Figure.savefig = profiled('savefig')(Figure.savefig)
+    Figure.savefig._profiled = True
+
+
+def _report():
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return
+    profiler.finish()
+    print('\n⏱️  Profile')
+    print('\n'.join(profiler.table()))
+    if profiler.output:
+        profiler.write(profiler.output)
+        print(f"💾 Profile written to {profiler.output}")
+
+
+def setup_from_argv(argv=None):
+    """Take --profile / --profile-out FILE out of the arguments and enable profiling
+
+    Without `argv` sys.argv is edited in place, so scripts that read
+    sys.argv or call argparse afterwards never see the flags. Returns the
+    remaining arguments.
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    output, remaining, profile = None, [], False
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg == PROFILE_FLAG:
+            profile = True
+        elif arg == PROFILE_OUT_FLAG and index + 1 < len(args):
+            profile, output = True, args[index + 1]
+            index += 1
+        elif arg.startswith(PROFILE_OUT_FLAG + '='):
+            profile, output = True, arg.split('=', 1)[1]
+        else:
+            remaining.append(arg)
+        index += 1
+    if argv is None:
+        sys.argv[1:] = remaining
+    if profile:
+        enable(output=output)
+    return remaining
@@ -0,0 +1,186 @@
+"""
+Noisy neighbor results model
+Per-scenario noisy/victim request, throttle and latency statistics computed
+from the scenario/role/tenant/tier tags emitted by all-tiers-noisy-neighbor-test.js
+"""
+
+import os
+from collections import defaultdict
+
+from .ingest import RunAggregates
+from .sketch import LatencySketch
+
+REQUEST_METRIC = 'http_req_duration'
+
+# Output of run-noisy-test.sh
+DEFAULT_RESULTS_FILE = 'noisy-neighbor-results.json'
+
+
+class Scenario:
+    """Static description of one noisy neighbor scenario"""
+
+    def __init__(self, key, number, noisy_tier, victim_tier, strategy):
+        self.key = key
+        self.number = number
+        self.noisy_tier = noisy_tier
+        self.victim_tier = victim_tier
+        self.strategy = strategy
+
+    @property
+    def title(self):
+        return f'{self.noisy_tier} → {self.victim_tier}'
+
+
+# Mirrors options.scenarios in all-tiers-noisy-neighbor-test.js
+SCENARIOS = (
+    Scenario('basic_standard', 1, 'BASIC', 'STANDARD', 'Different tier Usage Plans'),
+    Scenario('basic_platinum', 2, 'BASIC', 'PLATINUM', 'Dedicated PLATINUM Usage Plan'),
+    Scenario('premium_premium', 3, 'PREMIUM', 'PREMIUM', 'Per-tenant Usage Plans'),
+)
+
+# Victims are considered isolated below this throttle rate (%), matching the
+# rate<0.05 thresholds and getStatus() in the k6 script
+ISOLATION_THRESHOLD = 5.0
+
+
+class TenantResult:
+    """Requests, throttles and latency of one tenant in one scenario role"""
+
+    def __init__(self, role, name=None, tier=None):
+        self.role = role
+        self.name = name
+        self.tier = tier
+        self.throttled = 0
+        self.errors = 0
+        self.latency = LatencySketch()
+
+    @property
+    def requests(self):
+        return self.latency.count
+
+    @property
+    def successful(self):
+        return self.requests - self.throttled
+
+    @property
+    def throttle_rate(self):
+        return self.throttled / self.requests * 100 if self.requests else 0.0
+
+    @property
+    def error_rate(self):
+        return self.errors / self.requests * 100 if self.requests else 0.0
+
+    def add(self, agg):
+        self.latency.merge(agg.sketch)
+        self.throttled += agg.throttled
+        self.errors += agg.errors
+
+
+class ScenarioResult:
+    """Noisy and victim tenant results of one scenario"""
+
+    def __init__(self, scenario, noisy, victim):
+        self.scenario = scenario
+        self.noisy = noisy
+        self.victim = victim
+
+    @property
+    def key(self):
+        return self.scenario.key
+
+    @property
+    def isolated(self):
+        return self.victim.throttle_rate < ISOLATION_THRESHOLD
+
+
+class LoadTestResults:
+    """Scenario results plus per-operation latency sketches of one run
+
+    role_trends names the operation trends sampled by a noisy or victim
+    stream (basic_noisy_latency, ...): they repeat the role's requests.
+    """
+
+    def __init__(self, scenarios, operations, source=None, role_trends=()):
+        self.scenarios = scenarios
+        self.operations = operations
+        self.source = source
+        self.role_trends = frozenset(role_trends)
+
+    def __getitem__(self, key):
+        return self.scenarios[key]
+
+    def __iter__(self):
+        return iter(self.scenarios.values())
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    @classmethod
+    def from_aggregates(cls, run, source=None):
+        """Build results from RunAggregates in one pass over its groups"""
+        by_role = defaultdict(lambda: defaultdict(lambda: TenantResult(None)))
+        operations = defaultdict(LatencySketch)
+        role_trends = set()
+
+        for (metric, tenant, tier, scenario, role), agg in run.groups.items():
+            if metric == REQUEST_METRIC and role in ('noisy', 'victim'):
+                by_role[(scenario, role)][(tenant, tier)].add(agg)
+            elif metric.endswith('_latency') and run.metric_types.get(metric, 'trend') == 'trend':
+                operations[metric].merge(agg.sketch)
+                if role in ('noisy', 'victim'):
+                    role_trends.add(metric)
+
+        scenarios = {}
+        for scenario in SCENARIOS:
+            noisy = _dominant(by_role.get((scenario.key, 'noisy')), 'noisy', scenario.noisy_tier)
+            victim = _dominant(by_role.get((scenario.key, 'victim')), 'victim', scenario.victim_tier)
+            if noisy.requests or victim.requests:
+                scenarios[scenario.key] = ScenarioResult(scenario, noisy, victim)
+        return cls(scenarios, dict(operations), source, role_trends)
+
+    @classmethod
+    def from_frame(cls, df, source=None):
+        return cls.from_aggregates(RunAggregates.from_frame(df), source)
+
+
+def _dominant(tenants, role, default_tier):
+    """Merge all tenants seen in a scenario role, named after the busiest one"""
+    result = TenantResult(role, tier=default_tier)
+    if not tenants:
+        return result
+    (name, tier), _ = max(tenants.items(), key=lambda item: item[1].requests)
+    result.name = name
+    result.tier = tier or default_tier
+    for tenant in tenants.values():
+        result.latency.merge(tenant.latency)
+        result.throttled += tenant.throttled
+        result.errors += tenant.errors
+    return result
+
+
+def load_run_aggregates(filename, use_cache=True):
+    """RunAggregates for a k6 JSON (streamed) or CSV result file
+
+    The aggregates of both formats are cached per file, so a warm cache is
+    answered without parsing and without importing pandas.
+    """
+    from .cache import open_cache
+
+    is_json = os.path.splitext(filename)[1].lower() in ('.json', '.ndjson')
+
+    def build(source):
+        from .loaders import load_aggregates, load_csv
+
+        if is_json:
+            return load_aggregates(source, use_cache=False)
+        return RunAggregates.from_frame(load_csv(source, use_cache))
+
+    if not use_cache:
+        return build(filename)
+    return open_cache(filename).get_object(filename, 'aggregates' if is_json else 'csv-aggregates',
+                                           build, RunAggregates.to_dict, RunAggregates.from_dict)
+
+
+def load_results(filename, use_cache=True):
+    """LoadTestResults for a k6 JSON (streamed) or CSV result file"""
+    return LoadTestResults.from_aggregates(load_run_aggregates(filename, use_cache), source=filename)
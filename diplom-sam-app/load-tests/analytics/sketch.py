@@ -0,0 +1,194 @@
+"""
+Mergeable latency quantile sketch
+Log-bucketed histogram in the style of HdrHistogram/DDSketch: every quantile
+is answered within RELATIVE_ACCURACY of the true value, memory is a fixed
+array of bucket counts, and two sketches merge by adding their arrays
+"""
+
+import math
+
+import numpy as np
+
+from .profiling import profiled
+
+RELATIVE_ACCURACY = 0.01
+
+# Trackable range in ms; values at or below MIN_VALUE share the zero bucket,
+# values above MAX_VALUE land in the last bucket (min/max are kept exactly)
+MIN_VALUE = 1e-2
+MAX_VALUE = 1e7
+
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+_OFFSET = math.floor(math.log(MIN_VALUE) / _LOG_GAMMA)
+N_BUCKETS = math.ceil(math.log(MAX_VALUE) / _LOG_GAMMA) - _OFFSET + 1
+
+# Representative value of each bucket (midpoint in relative-error terms)
+_BUCKET_VALUES = 2 * GAMMA ** (np.arange(N_BUCKETS) + _OFFSET) / (GAMMA + 1)
+_BUCKET_VALUES[0] = 0.0
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def bucket_index(values):
+    """Bucket index of every value"""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        index = np.ceil(np.log(values) / _LOG_GAMMA) - _OFFSET
+    index = np.where(values > MIN_VALUE, index, 0)
+    return np.clip(index, 0, N_BUCKETS - 1).astype(np.intp)
+
+
+def bucket_values(index):
+    """Representative value of bucket indexes (inverse of bucket_index)"""
+    return _BUCKET_VALUES[np.clip(index, 0, N_BUCKETS - 1)]
+
+
+class LatencySketch:
+    """Quantile sketch with bounded relative error and O(1) memory"""
+
+    __slots__ = ('counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        self.counts = np.zeros(N_BUCKETS, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def add_many(self, values):
+        """Record a batch of values"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.counts += np.bincount(bucket_index(values), minlength=N_BUCKETS)
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def add(self, value):
+        """Record a single value"""
+        return self.add_many([value])
+
+    def merge(self, other):
+        """Add another sketch into this one"""
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantiles(self, qs):
+        """Values at quantiles qs (0..1), clamped to the exact min/max"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        ranks = qs * (self.count - 1)
+        index = np.searchsorted(np.cumsum(self.counts), ranks, side='right')
+        values = _BUCKET_VALUES[np.minimum(index, N_BUCKETS - 1)]
+        return np.clip(values, self.min, self.max)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """{'p50': ..., 'p99.9': ...} for the given percentiles"""
+        values = self.quantiles(np.asarray(percentiles) / 100)
+        return {f'p{p:g}': float(v) for p, v in zip(percentiles, values)}
+
+    def bxp_stats(self, label=None):
+        """Box plot statistics for matplotlib's Axes.bxp
+
+        Whiskers follow the usual 1.5 IQR rule over bucket values; fliers are
+        limited to the exact min/max, since individual samples are not kept.
+        """
+        q1, med, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        occupied = _BUCKET_VALUES[self.counts > 0]
+        lower = occupied[occupied >= q1 - 1.5 * iqr]
+        upper = occupied[occupied <= q3 + 1.5 * iqr]
+        whislo = max(self.min, float(lower[0])) if len(lower) else self.min
+        whishi = min(self.max, float(upper[-1])) if len(upper) else self.max
+        fliers = [v for v in (self.min, self.max) if v < whislo or v > whishi]
+        return {
+            'label': label,
+            'mean': self.mean,
+            'med': med,
+            'q1': q1,
+            'q3': q3,
+            'whislo': whislo,
+            'whishi': whishi,
+            'fliers': fliers,
+        }
+
+    def to_dict(self):
+        """Compact, JSON-serializable form (non-empty buckets only)"""
+        index = np.flatnonzero(self.counts)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'index': index.tolist(),
+            'counts': self.counts[index].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.counts[np.asarray(data['index'], dtype=np.intp)] = data['counts']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if data['count']:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+
+def group_sketches(values, codes, labels):
+    """One sketch per group in a single vectorized pass
+
+    `codes` assigns each value to a position in `labels` (-1 = skip), like the
+    codes of a pandas Categorical.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    keep = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[keep], codes[keep].astype(np.intp)
+
+    flat = np.bincount(codes * N_BUCKETS + bucket_index(values),
+                       minlength=len(labels) * N_BUCKETS).reshape(len(labels), N_BUCKETS)
+    counts = np.bincount(codes, minlength=len(labels))
+    sums = np.bincount(codes, weights=values, minlength=len(labels))
+    mins = np.full(len(labels), np.inf)
+    maxs = np.full(len(labels), -np.inf)
+    np.minimum.at(mins, codes, values)
+    np.maximum.at(maxs, codes, values)
+
+    sketches = {}
+    for position, label in enumerate(labels):
+        if counts[position] == 0:
+            continue
+        sketch = LatencySketch()
+        sketch.counts = flat[position].copy()
+        sketch.count = int(counts[position])
+        sketch.sum = float(sums[position])
+        sketch.min = float(mins[position])
+        sketch.max = float(maxs[position])
+        sketches[label] = sketch
+    return sketches
+
+
+@profiled('sketches')
+def frame_sketches(df, by='metric_name', value='metric_value'):
+    """{group: LatencySketch} for a frame with a categorical `by` column"""
+    column = df[by].astype('category')
+    return group_sketches(df[value].values, column.cat.codes.values, column.cat.categories)
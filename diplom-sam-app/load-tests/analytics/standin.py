@@ -0,0 +1,248 @@
+"""
+Local stand-in for the API Gateway usage plans
+A small asyncio HTTP/1.1 server that throttles like API Gateway: every API
+key has a token bucket (rate, burst) plus a daily quota. Keys and limits come
+from the k6 script's TENANTS, so BASIC and STANDARD tenants share their tier
+key, PREMIUM tenants have one key each and PLATINUM has a dedicated one.
+Admitted and rejected requests are counted per key as ground truth for the
+analyzers
+"""
+
+import asyncio
+import json
+import random
+import re
+import signal
+import time
+from datetime import datetime, timezone
+
+from .verdict import DEFAULT_SCRIPT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+
+# run-noisy-test.sh resets every plan's daily quota to this before a run
+DEFAULT_QUOTA = 10000
+
+# Simulated backend (authorizer + Lambda + DynamoDB) latency, lognormal
+DEFAULT_LATENCY_MS = 40.0
+DEFAULT_JITTER = 0.35
+
+STATS_PATH = '/__standin/stats'
+
+
+class TokenBucket:
+    """API Gateway throttle of one API key: `rate` tokens/s, at most `burst` stored"""
+
+    def __init__(self, rate, burst, quota=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.quota = quota
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.day = None
+        self.used_today = 0
+
+    def take(self):
+        """'ok', 'throttled' or 'over_quota' for one request arriving now"""
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day, self.used_today = today, 0
+        if self.quota is not None and self.used_today >= self.quota:
+            return 'over_quota'
+
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return 'throttled'
+        self.tokens -= 1
+        self.used_today += 1
+        return 'ok'
+
+
+class PlanKey:
+    """One API key of a usage plan with the tenants that share it"""
+
+    def __init__(self, api_key, tier, bucket):
+        self.api_key = api_key
+        self.tier = tier
+        self.bucket = bucket
+        self.tenants = []
+        self.counts = {'ok': 0, 'throttled': 0, 'over_quota': 0}
+
+    def to_dict(self):
+        return {'tier': self.tier, 'tenants': self.tenants, 'rate': self.bucket.rate,
+                'burst': self.bucket.burst, 'quota': self.bucket.quota, **self.counts}
+
+
+def template_plans(template):
+    """{TIER: (rate, burst, quota)} from the UsagePlan resources of a SAM template"""
+    with open(template, encoding='utf-8') as f:
+        source = f.read()
+    plans = {}
+    pattern = (r'UsagePlanName:\s*Plan_(\w+)_Tier.*?Quota:\s*Limit:\s*(\d+).*?'
+               r'BurstLimit:\s*(\d+)\s*RateLimit:\s*(\d+)')
+    for tier, quota, burst, rate in re.findall(pattern, source, re.S):
+        plans[tier.upper()] = (float(rate), float(burst), int(quota))
+    return plans
+
+
+def plan_keys(tenants, plans=None, quota=DEFAULT_QUOTA):
+    """{api_key: PlanKey} for the script's tenants
+
+    Without `plans` every key uses its tenant's testing rateLimit as rate and
+    burst, as configured by run-noisy-test.sh; with `plans` ({TIER: (rate,
+    burst, quota)}) the deployed tier limits are used.
+    """
+    keys = {}
+    for tenant in tenants.values():
+        if tenant.api_key not in keys:
+            if plans and tenant.tier in plans:
+                rate, burst, plan_quota = plans[tenant.tier]
+            else:
+                rate, burst, plan_quota = tenant.rate_limit, tenant.rate_limit, quota
+            keys[tenant.api_key] = PlanKey(tenant.api_key, tenant.tier,
+                                           TokenBucket(rate, burst, plan_quota))
+        keys[tenant.api_key].tenants.append(tenant.name)
+    return keys
+
+
+class StandInServer:
+    """HTTP server answering like the API: 403 without a key, 429 when throttled"""
+
+    def __init__(self, keys, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 latency_ms=DEFAULT_LATENCY_MS, jitter=DEFAULT_JITTER, seed=None):
+        self.keys = keys
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.forbidden = 0
+        self.server = None
+        self.handlers = set()
+
+    @property
+    def base_url(self):
+        return f'http://{self.host}:{self.port}/Prod'
+
+    def stats(self):
+        """Ground truth counts per API key"""
+        return {'keys': {key: plan.to_dict() for key, plan in self.keys.items()},
+                'forbidden': self.forbidden}
+
+    def _respond(self, headers):
+        plan = self.keys.get(headers.get('x-api-key'))
+        if plan is None:
+            self.forbidden += 1
+            return 403, {'message': 'Forbidden'}, 0.0
+        outcome = plan.bucket.take()
+        plan.counts[outcome] += 1
+        if outcome == 'throttled':
+            return 429, {'message': 'Too Many Requests'}, 0.0
+        if outcome == 'over_quota':
+            return 429, {'message': 'Limit Exceeded'}, 0.0
+        delay = self.latency_ms * self.random.lognormvariate(0, self.jitter) / 1000
+        return 200, {'products': []}, delay
+
+    async def _handle(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                path = request_line.split()[1].decode('latin-1') if request_line.split()[1:] else ''
+                if path == STATS_PATH:
+                    status, body, delay = 200, self.stats(), 0.0
+                else:
+                    status, body, delay = self._respond(headers)
+                if delay:
+                    await asyncio.sleep(delay)
+                payload = json.dumps(body).encode()
+                writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: %d\r\n\r\n' % (status, _REASONS[status], len(payload))
+                             + payload)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled on shutdown while waiting for the next keep-alive request
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                 backlog=1024)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            for handler in list(self.handlers):
+                handler.cancel()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            await self.server.wait_closed()
+
+
+_REASONS = {200: b'OK', 403: b'Forbidden', 429: b'Too Many Requests'}
+
+
+def stats_lines(stats):
+    """Human-readable ground truth table"""
+    lines = [f"{'Tier':<10}{'Tenants':<32}{'Rate':>7}{'Burst':>7}{'OK':>9}{'429':>9}"
+             f"{'Quota':>8}{'Throttle':>10}"]
+    for plan in stats['keys'].values():
+        total = plan['ok'] + plan['throttled'] + plan['over_quota']
+        rate = (plan['throttled'] + plan['over_quota']) / total * 100 if total else 0.0
+        lines.append(f"{plan['tier']:<10}{', '.join(plan['tenants']):<32}{plan['rate']:>7.0f}"
+                     f"{plan['burst']:>7.0f}{plan['ok']:>9,}{plan['throttled']:>9,}"
+                     f"{plan['over_quota']:>8,}{rate:>9.1f}%")
+    if stats['forbidden']:
+        lines.append(f"🚫 {stats['forbidden']:,} requests without a known API key (403)")
+    return lines
+
+
+def load_keys(script=DEFAULT_SCRIPT, template=None, quota=DEFAULT_QUOTA):
+    """Plan keys for the tenants of a k6 script, optionally with template limits"""
+    from .loadgen import parse_script
+
+    _, tenants, _ = parse_script(script)
+    return plan_keys(tenants, template_plans(template) if template else None, quota)
+
+
+async def serve(server, stats_file=None):
+    """Serve until SIGINT/SIGTERM, then write the ground truth"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await server.start()
+    print(f"🛡️  Usage plan stand-in on {server.base_url}", flush=True)
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        if stats_file:
+            with open(stats_file, 'w') as f:
+                json.dump(server.stats(), f, indent=2)
@@ -0,0 +1,153 @@
+"""
+Headless results summary
+Noisy/victim throttle and latency tables per scenario, the CRUD and
+registration percentiles per operation and the other latency trends of the
+runs, as text or JSON. Only NumPy and the cached run
+aggregates are needed: matplotlib is never imported, and pandas only when a
+result file has not been aggregated before, so CI gets the numbers without a
+display and in well under a second on a warm cache.
+`python -m analytics summary` takes this path before the CLI's own imports
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from contextlib import redirect_stdout
+
+from .figures import CRUD_RESULTS_FILE
+from .profiling import setup_from_argv
+from .results import DEFAULT_RESULTS_FILE, ISOLATION_THRESHOLD, load_results
+
+PERCENTILES = (50, 90, 95, 99)
+
+# API operation trends, as in coldstart.OPERATION_ROUTES (not imported: it needs pandas)
+OPERATION_METRICS = ('create_product_latency', 'get_products_latency', 'create_order_latency',
+                     'get_orders_latency', 'registration_latency')
+
+
+def _ms(value):
+    return None if value is None or math.isnan(value) else round(float(value), 2)
+
+
+def _latency_row(sketch):
+    row = {'count': int(sketch.count), 'min_ms': None, 'mean_ms': None, 'max_ms': None}
+    if sketch.count:
+        row.update(min_ms=_ms(sketch.min), mean_ms=_ms(sketch.mean), max_ms=_ms(sketch.max))
+    row.update({f'{key}_ms': _ms(value) for key, value in sketch.percentiles(PERCENTILES).items()})
+    return row
+
+
+def _tenant_row(tenant):
+    row = {'role': tenant.role, 'tenant': tenant.name, 'tier': tenant.tier,
+           'requests': int(tenant.requests), 'throttled': int(tenant.throttled),
+           'throttle_rate': round(tenant.throttle_rate, 2), 'errors': int(tenant.errors)}
+    row.update(_latency_row(tenant.latency))
+    return row
+
+
+def summarize(results, crud_results=None):
+    """{'scenarios': [...], 'operations': [...], 'trends': [...]} of plain JSON-ready values
+
+    operations are the CRUD and registration trends; trends every other
+    trend, e.g. the per-stream *_latency trends of the noisy neighbor run.
+    """
+    scenarios = []
+    for result in results or ():
+        scenario = result.scenario
+        scenarios.append({
+            'scenario': scenario.key, 'number': scenario.number, 'title': scenario.title,
+            'strategy': scenario.strategy, 'isolated': bool(result.isolated),
+            'tenants': [_tenant_row(result.noisy), _tenant_row(result.victim)],
+        })
+    operations, trends = {}, {}
+    for source in (crud_results, results):
+        if source is not None:
+            for metric, sketch in sorted(source.operations.items()):
+                rows = operations if metric in OPERATION_METRICS else trends
+                rows.setdefault(metric, dict(operation=metric, source=source.source,
+                                             **_latency_row(sketch)))
+    ordered = [operations[metric] for metric in OPERATION_METRICS if metric in operations]
+    return {'scenarios': scenarios, 'operations': ordered, 'trends': list(trends.values()),
+            'isolation_threshold': ISOLATION_THRESHOLD}
+
+
+def _cell(value, spec):
+    return format(value, spec) if value is not None else '-'
+
+
+def _latency_table(title, rows):
+    """Count, min, mean, percentiles and max per row, the first column sized to fit"""
+    percentiles = [f'p{p:g}' for p in PERCENTILES]
+    width = max(len(row['operation']) for row in rows + [{'operation': title}]) + 2
+    lines = [f"{title:<{width}}{'Count':>10}{'Min':>9}{'Mean':>9}"
+             + ''.join(f'{p:>9}' for p in percentiles) + f"{'Max':>9}"]
+    for row in rows:
+        lines.append(f"{row['operation']:<{width}}{row['count']:>10,}"
+                     f"{_cell(row['min_ms'], '.0f'):>9}{_cell(row['mean_ms'], '.0f'):>9}"
+                     + ''.join(f"{_cell(row[f'{p}_ms'], '.0f'):>9}" for p in percentiles)
+                     + f"{_cell(row['max_ms'], '.0f'):>9}")
+    return lines
+
+
+def format_summary(summary):
+    """Human-readable scenario, operation and trend tables"""
+    lines = []
+    if summary['scenarios']:
+        labels = {(scenario['scenario'], row['role']): f"{row['tenant'] or '-'} ({row['tier']})"
+                  for scenario in summary['scenarios'] for row in scenario['tenants']}
+        width = max(len('Tenant'), *map(len, labels.values())) + 2
+        lines.append(f"{'Scenario':<34}{'Role':<8}{'Tenant':<{width}}{'Requests':>10}{'429s':>9}"
+                     f"{'429 %':>8}" + ''.join(f'{p:>9}' for p in ('p50', 'p95', 'p99')))
+        for scenario in summary['scenarios']:
+            state = '✅' if scenario['isolated'] else '❌'
+            for position, row in enumerate(scenario['tenants']):
+                title = f"{state} {scenario['number']}. {scenario['title']}" if position == 0 else ''
+                tenant = labels[(scenario['scenario'], row['role'])]
+                lines.append(f"{title:<34}{row['role']:<8}{tenant:<{width}}{row['requests']:>10,}"
+                             f"{row['throttled']:>9,}{row['throttle_rate']:>7.1f}%"
+                             + ''.join(f"{_cell(row[f'{p}_ms'], '.0f'):>9}"
+                                       for p in ('p50', 'p95', 'p99')))
+    for title, key in (('Operation (ms)', 'operations'), ('Trend (ms)', 'trends')):
+        if summary.get(key):
+            if lines:
+                lines.append('')
+            lines += _latency_table(title, summary[key])
+    return lines
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m analytics summary',
+        description='noisy/victim and CRUD percentile tables without plotting')
+    parser.add_argument('results_file', nargs='?', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--crud', default=CRUD_RESULTS_FILE,
+                        help='CRUD latency result file (skipped if missing)')
+    parser.add_argument('--json', metavar='FILE', help="write the tables as JSON ('-' for stdout)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse the result files instead of reading the run cache')
+    return parser
+
+
+def main(argv=None):
+    """Print the summary; exit status 1 if no result file was found"""
+    args = build_parser().parse_args(setup_from_argv(sys.argv[1:] if argv is None else argv))
+    files = [name for name in (args.results_file, args.crud) if os.path.exists(name)]
+    if not files:
+        print(f"❌ Neither {args.results_file} nor {args.crud} found")
+        return 1
+    # Ingest progress must not end up in JSON written to stdout
+    with redirect_stdout(sys.stderr if args.json == '-' else sys.stdout):
+        results = load_results(args.results_file, not args.no_cache) \
+            if args.results_file in files else None
+        crud = load_results(args.crud, not args.no_cache) if args.crud in files else None
+    summary = summarize(results, crud)
+    if args.json == '-':
+        print(json.dumps(summary, indent=2))
+        return 0
+    print('\n'.join(format_summary(summary)))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
@@ -0,0 +1,202 @@
+"""
+Synthetic k6 output generator
+Writes `--out csv` or `--out json` files with the metric and tag layout of
+all-tiers-noisy-neighbor-test.js and analytics.loadgen: every request becomes
+http_reqs, http_req_duration and http_req_failed points plus the per-stream
+`<stream>_requests`, `<stream>_latency`, `<stream>_error_rate` and, for 429
+responses, `<stream>_throttled` points, tagged with tenant, tier, scenario,
+role and status. Tenants, request shares, 429 ratios and lognormal latencies
+are configurable; all columns of a chunk are drawn with NumPy in one go, so
+100M rows are only bound by disk speed
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+CSV_COLUMNS = ('metric_name', 'timestamp', 'metric_value', 'check', 'error', 'error_code',
+               'expected_response', 'group', 'method', 'name', 'proto', 'scenario', 'service',
+               'status', 'subproto', 'tls_version', 'url', 'extra_tags', 'metadata')
+
+# Points written per simulated request, as SampleWriter.sample in analytics.loadgen
+REQUEST_METRICS = ('http_reqs', 'http_req_duration', 'http_req_failed', '{stream}_requests',
+                   '{stream}_latency', '{stream}_error_rate', '{stream}_throttled')
+# Only 429 responses add to the throttled counter, so a request is one row shorter
+THROTTLED_METRIC = REQUEST_METRICS.index('{stream}_throttled')
+ROWS_PER_REQUEST = len(REQUEST_METRICS)
+
+CHUNK_ROWS = 2_000_000
+DEFAULT_START = '2026-01-01T00:00:00'
+DEFAULT_RATE = 1000.0
+# 429 responses come straight from API Gateway, well below the Lambda latency
+THROTTLED_LATENCY_FACTOR = 0.15
+
+
+class SyntheticStream:
+    """One tenant in one scenario role"""
+
+    def __init__(self, stream, tenant, tier, scenario, role, share, throttle_ratio,
+                 median_ms, sigma=0.5):
+        self.stream = stream
+        self.tenant = tenant
+        self.tier = tier
+        self.scenario = scenario
+        self.role = role
+        self.share = share
+        self.throttle_ratio = throttle_ratio
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    def tags(self, status):
+        return {'tenant': self.tenant, 'tier': self.tier, 'scenario': self.scenario,
+                'role': self.role, 'status': str(status)}
+
+
+# The three scenarios of the k6 script, noisy tenants sending 5x the victims
+DEFAULT_STREAMS = (
+    SyntheticStream('basic_noisy', 'BasicCorp', 'BASIC', 'basic_standard', 'noisy',
+                    5, 0.55, 180.0),
+    SyntheticStream('standard_victim', 'TestStandardCorp', 'STANDARD', 'basic_standard', 'victim',
+                    1, 0.01, 150.0),
+    SyntheticStream('basic_noisy2', 'BasicCorp', 'BASIC', 'basic_platinum', 'noisy',
+                    5, 0.55, 180.0),
+    SyntheticStream('platinum_victim', 'qwerty Corp', 'PLATINUM', 'basic_platinum', 'victim',
+                    1, 0.0, 120.0),
+    SyntheticStream('premium_noisy', 'PremiumNoisy', 'PREMIUM', 'premium_premium', 'noisy',
+                    5, 0.40, 160.0),
+    SyntheticStream('premium_victim', 'PremiumCorp', 'PREMIUM', 'premium_premium', 'victim',
+                    1, 0.01, 140.0),
+)
+
+
+def parse_count(text):
+    """Row count from '1M', '10m', '250k' or a plain number"""
+    text = str(text).strip().lower().replace('_', '')
+    scale = {'k': 10 ** 3, 'm': 10 ** 6, 'g': 10 ** 9}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def generate_requests(requests, streams=DEFAULT_STREAMS, rate=DEFAULT_RATE, offset=0, seed=0):
+    """Columns of `requests` consecutive requests: stream index, time (s), status, latency
+
+    Requests arrive at `rate` per second overall; `offset` is the index of
+    the first one, so chunks continue each other's clock.
+    """
+    rng = np.random.default_rng([seed, offset])
+    shares = np.array([stream.share for stream in streams], dtype=np.float64)
+    stream = rng.choice(len(streams), requests, p=shares / shares.sum())
+    seconds = (offset + np.arange(requests) + rng.random(requests)) / rate
+    ratios = np.array([item.throttle_ratio for item in streams])
+    throttled = rng.random(requests) < ratios[stream]
+    medians = np.array([item.median_ms for item in streams])
+    sigmas = np.array([item.sigma for item in streams])
+    latency = np.exp(np.log(medians[stream]) + sigmas[stream] * rng.standard_normal(requests))
+    latency[throttled] *= THROTTLED_LATENCY_FACTOR
+    return stream, seconds, np.where(throttled, 429, 200), latency
+
+
+def _point_columns(stream, status, latency):
+    """(tag combination, metric index, value) of every point of a chunk, request-major
+
+    Tag combination 2 * i is stream i answered with 200, 2 * i + 1 with 429.
+    """
+    ones = np.ones(len(stream))
+    failed = (status >= 400).astype(np.float64)
+    combo = np.repeat(stream * 2 + (status == 429), ROWS_PER_REQUEST)
+    metric = np.tile(np.arange(ROWS_PER_REQUEST), len(stream))
+    values = np.stack([ones, latency, failed, ones, latency, failed, ones], axis=1).ravel()
+    keep = (metric != THROTTLED_METRIC) | (combo % 2 == 1)
+    return combo[keep], metric[keep], values[keep]
+
+
+def _points(rows, streams, rate, seed, chunk_rows):
+    """(seconds, tag combination, metric index, value) chunks of exactly `rows` points"""
+    per_chunk = max(1, chunk_rows // ROWS_PER_REQUEST)
+    offset = written = 0
+    while written < rows:
+        # Enough requests for the remaining rows even if none is throttled
+        requests = min(per_chunk, -(-(rows - written) // (ROWS_PER_REQUEST - 1)))
+        stream, seconds, status, latency = generate_requests(requests, streams, rate,
+                                                             offset, seed)
+        combo, metric, values = _point_columns(stream, status, latency)
+        points = ROWS_PER_REQUEST - 1 + (status == 429)
+        count = min(len(values), rows - written)
+        yield (np.repeat(seconds, points)[:count], combo[:count], metric[:count],
+               values[:count])
+        offset += requests
+        written += count
+
+
+def _metric_type(name):
+    if name == 'http_reqs' or name.endswith(('_requests', '_throttled')):
+        return 'counter'
+    if name == 'http_req_failed' or name.endswith('_error_rate'):
+        return 'rate'
+    return 'trend'
+
+
+def _combinations(streams):
+    """(tags, metric names) per tag combination"""
+    return [(item.tags(status), [metric.format(stream=item.stream) for metric in REQUEST_METRICS])
+            for item in streams for status in (200, 429)]
+
+
+def _values(values):
+    return pd.Series(np.round(values, 3)).astype(str)
+
+
+def write_csv(filename, rows, streams=DEFAULT_STREAMS, rate=DEFAULT_RATE, seed=0,
+              start=DEFAULT_START, chunk_rows=CHUNK_ROWS):
+    """k6 `--out csv` file with `rows` points; returns the number of rows written"""
+    base = pd.Timestamp(start).value // 10 ** 9
+    # Only timestamp and value vary; the rest of a line is fixed per (tag combination, metric)
+    prefixes, suffixes = [], []
+    for tags, names in _combinations(streams):
+        extra_tags = '&'.join(f'{key}={value}' for key, value in tags.items())
+        prefixes.append([name + ',' for name in names])
+        suffixes.append([f",,,,true,,GET,products,HTTP/1.1,{tags['scenario']},,{tags['status']},"
+                         f",,products,{extra_tags},\n"] * len(names))
+    prefixes, suffixes = np.array(prefixes, dtype=object), np.array(suffixes, dtype=object)
+    written = 0
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(CSV_COLUMNS) + '\n')
+        for seconds, combo, metric, values in _points(rows, streams, rate, seed, chunk_rows):
+            stamps = base + seconds.astype(np.int64)
+            lines = (prefixes[combo, metric] + pd.Series(stamps).astype(str) + ','
+                     + _values(values) + suffixes[combo, metric])
+            f.write(''.join(lines.tolist()))
+            written += len(values)
+    return written
+
+
+def write_json(filename, rows, streams=DEFAULT_STREAMS, rate=DEFAULT_RATE, seed=0,
+               start=DEFAULT_START, chunk_rows=CHUNK_ROWS):
+    """k6 `--out json` NDJSON file with `rows` Point lines; returns the number written"""
+    base = np.datetime64(pd.Timestamp(start).to_datetime64(), 'us')
+    combos = _combinations(streams)
+    # Everything after the value is fixed per (tag combination, metric)
+    suffixes = np.array([[',"tags":' + json.dumps(tags, separators=(',', ':')) + '},"metric":"'
+                          + name + '"}\n' for name in names] for tags, names in combos],
+                        dtype=object)
+    written = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        for name in sorted({name for _, names in combos for name in names}):
+            f.write(json.dumps({'type': 'Metric', 'data': {'name': name, 'type': _metric_type(name)},
+                                'metric': name}) + '\n')
+        for seconds, combo, metric, values in _points(rows, streams, rate, seed, chunk_rows):
+            stamps = base + (seconds * 1e6).astype('timedelta64[us]')
+            times = pd.Series(np.datetime_as_string(stamps, unit='us'), dtype=object)
+            lines = ('{"type":"Point","data":{"time":"' + times + 'Z","value":'
+                     + _values(values) + suffixes[combo, metric])
+            f.write(''.join(lines.tolist()))
+            written += len(values)
+    return written
+
+
+def write_run(filename, rows, **options):
+    """CSV or NDJSON by extension"""
+    if os.path.splitext(filename)[1].lower() in ('.json', '.ndjson'):
+        return write_json(filename, rows, **options)
+    return write_csv(filename, rows, **options)
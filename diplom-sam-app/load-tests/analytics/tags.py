@@ -0,0 +1,111 @@
+"""
+Vectorized k6 tag parsing
+Splits the `extra_tags` column of k6 CSV output ("tenant=noisy&tier=BASIC")
+into typed categorical columns in a single pass
+"""
+
+import numpy as np
+import pandas as pd
+
+# Tags emitted by all-tiers-noisy-neighbor-test.js (scenario/role per scenario,
+# tenant/tier per request) plus the HTTP status of each sample
+TAG_KEYS = ('tenant', 'tier', 'scenario', 'role', 'status')
+
+ROLES = ('noisy', 'victim')
+OTHER = 'other'
+ROLE_CATEGORIES = ROLES + (OTHER,)
+
+
+def parse_tag_string(tags):
+    """Split one k6 tag string into a dict"""
+    if not isinstance(tags, str) or not tags:
+        return {}
+    parsed = {}
+    for pair in tags.split('&'):
+        key, sep, value = pair.partition('=')
+        if sep:
+            parsed[key] = value
+    return parsed
+
+
+def split_tags(extra_tags, keys=TAG_KEYS):
+    """Split an extra_tags Series into one categorical Series per tag key
+
+    Every distinct tag string is parsed once in Python; rows are mapped back
+    through the factorized codes with NumPy, so the per-row cost is a take().
+    """
+    codes, uniques = pd.factorize(extra_tags)
+    parsed = [parse_tag_string(tags) for tags in uniques]
+
+    columns = {}
+    for key in keys:
+        key_codes, categories = pd.factorize(
+            pd.Series([tags.get(key) for tags in parsed], dtype=object))
+        # Trailing -1 catches rows whose extra_tags was NaN (code -1)
+        lookup = np.append(key_codes, -1).astype(np.int32)
+        columns[key] = pd.Series(
+            pd.Categorical.from_codes(lookup[codes], categories=categories),
+            index=extra_tags.index, name=key)
+    return columns
+
+
+def _as_string_categorical(series):
+    """Convert a plain k6 column (e.g. numeric status) to a string categorical"""
+    categorical = series.astype('category')
+    categories = categorical.cat.categories
+    if pd.api.types.is_numeric_dtype(categories):
+        categories = [str(int(value)) for value in categories]
+    else:
+        categories = [str(value) for value in categories]
+    return categorical.cat.rename_categories(categories)
+
+
+def _coalesce(primary, fallback):
+    """Fill missing categorical values from a second categorical, on codes only"""
+    categories = primary.cat.categories.union(fallback.cat.categories, sort=False)
+    primary = primary.cat.set_categories(categories)
+    fallback = fallback.cat.set_categories(categories)
+    codes = np.where(primary.cat.codes.values >= 0,
+                     primary.cat.codes.values, fallback.cat.codes.values)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories),
+                     index=primary.index, name=primary.name)
+
+
+def _role_column(role, tenant):
+    """Noisy/victim role from the role tag, falling back to tenant=noisy|victim"""
+    role = role.cat.set_categories(ROLE_CATEGORIES)
+    tenant_role = tenant.cat.set_categories(ROLE_CATEGORIES)
+    codes = np.where(role.cat.codes.values >= 0,
+                     role.cat.codes.values, tenant_role.cat.codes.values)
+    codes[codes < 0] = ROLE_CATEGORIES.index(OTHER)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=ROLE_CATEGORIES),
+                     index=role.index, name='role')
+
+
+def add_tag_columns(df, keys=TAG_KEYS):
+    """Attach tenant/tier/scenario/role/status categorical columns to a k6 frame
+
+    Values from extra_tags win; dedicated k6 CSV columns of the same name
+    (scenario, status) fill the gaps. `role` is always one of ROLE_CATEGORIES.
+    """
+    if 'extra_tags' in df.columns:
+        tags = split_tags(df['extra_tags'], keys)
+    else:
+        tags = split_tags(pd.Series(np.nan, index=df.index, dtype=object), keys)
+
+    for key in keys:
+        column = tags[key]
+        if key in df.columns:
+            column = _coalesce(column, _as_string_categorical(df[key]))
+        df[key] = column
+
+    if 'role' in keys and 'tenant' in keys:
+        df['role'] = _role_column(df['role'], df['tenant'])
+    return df
+
+
+def metric_groups(df, metric_name, key='role'):
+    """Rows of one metric split by a tag column in a single groupby pass"""
+    metric_df = df[df['metric_name'] == metric_name]
+    return {value: group
+            for value, group in metric_df.groupby(key, observed=True, sort=False)}
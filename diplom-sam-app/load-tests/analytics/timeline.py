@@ -0,0 +1,188 @@
+"""
+Time-bucketed throughput, throttle rate and latency timelines
+Points of one metric are binned into fixed buckets (1s, 10s, ...) per tag group
+with integer arithmetic on the datetime column. Rolling quantiles come from
+per-bucket sketch histograms summed over a sliding window of buckets, so the
+cost is linear in the number of points and the output size is fixed by the
+bucket count, not the sample count
+"""
+
+import numpy as np
+import pandas as pd
+
+from .ingest import _group_codes, _numeric_status
+from .profiling import profiled
+from .results import REQUEST_METRIC
+from .sketch import bucket_index, bucket_values
+
+DEFAULT_FREQ = '1s'
+
+# Buckets in the rolling quantile window (10 x 1s buckets = 10s window)
+DEFAULT_WINDOW = 10
+DEFAULT_QUANTILES = (0.50, 0.95)
+
+# Run length up to which each bucket width is used (see auto_freq)
+AUTO_FREQS = ((pd.Timedelta(minutes=10), '1s'), (pd.Timedelta(hours=6), '10s'),
+              (pd.Timedelta.max, '1min'))
+
+# Upper bound on the (buckets x sketch bins) histogram cells of one block
+BLOCK_CELLS = 1 << 20
+
+
+class Timeline:
+    """Per-group series on a shared bucket axis
+
+    requests/throttled are (groups, buckets) counts; quantiles maps each
+    quantile to a (groups, buckets) array of rolling latency values (NaN where
+    the window holds no samples).
+    """
+
+    def __init__(self, index, groups, requests, throttled, quantiles, window):
+        self.index = index
+        self.groups = groups
+        self.requests = requests
+        self.throttled = throttled
+        self.quantiles = quantiles
+        self.window = window
+
+    @property
+    def bucket_seconds(self):
+        return self.index.freq.nanos / 1e9 if len(self.index) else 1.0
+
+    @property
+    def rps(self):
+        return self.requests / self.bucket_seconds
+
+    @property
+    def throttle_rate(self):
+        """429 share of requests per bucket (%), NaN for empty buckets"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.requests > 0, self.throttled / self.requests * 100, np.nan)
+
+    def __contains__(self, group):
+        return group in self.groups
+
+    def __getitem__(self, group):
+        """DataFrame of one group's series indexed by bucket start"""
+        position = self.groups.index(group)
+        data = {
+            'requests': self.requests[position],
+            'rps': self.rps[position],
+            'throttled': self.throttled[position],
+            'throttle_rate': self.throttle_rate[position],
+        }
+        for q, values in self.quantiles.items():
+            data[f'p{q * 100:g}'] = values[position]
+        return pd.DataFrame(data, index=self.index)
+
+    def to_frame(self):
+        """Long frame with one row per (group, bucket)"""
+        frames = []
+        for group in self.groups:
+            frame = self[group]
+            frame.insert(0, 'group', [group] * len(frame))
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames).rename_axis('time').reset_index()
+
+
+def _rolling_quantiles(bins, cells, n_buckets, window, quantiles):
+    """Rolling quantiles of one group from its (bucket, sketch bin) pairs
+
+    Buckets are handled in blocks, each with the window - 1 buckets before
+    it, so the dense (bucket, bin) histograms never exceed BLOCK_CELLS cells
+    however long the run is.
+    """
+    result = {q: np.full(n_buckets, np.nan) for q in quantiles}
+    if len(bins) == 0:
+        return result
+    lo, hi = bins.min(), bins.max()
+    n_bins = int(hi - lo + 1)
+    order = np.argsort(cells, kind='stable')
+    cells, bins = cells[order], bins[order] - lo
+    block = max(1, BLOCK_CELLS // n_bins - (window - 1))
+
+    for start in range(0, n_buckets, block):
+        stop = min(n_buckets, start + block)
+        first = max(0, start - window + 1)
+        rows = stop - first
+        left, right = np.searchsorted(cells, [first, stop])
+        hist = np.bincount((cells[left:right] - first) * n_bins + bins[left:right],
+                           minlength=rows * n_bins).reshape(rows, n_bins)
+
+        # Sliding window sum over buckets via a cumulative sum along time
+        cumulative = np.cumsum(hist, axis=0)
+        offset = start - first
+        windowed = cumulative[offset:].copy()
+        shift = max(0, window - offset)
+        if shift < len(windowed):
+            windowed[shift:] -= cumulative[offset + shift - window:rows - window]
+
+        per_bin = np.cumsum(windowed, axis=1)
+        totals = per_bin[:, -1]
+        for q in quantiles:
+            ranks = q * (totals - 1)
+            index = (per_bin <= ranks[:, None]).sum(axis=1)
+            values = bucket_values(np.minimum(index, n_bins - 1) + lo)
+            result[q][start:stop] = np.where(totals > 0, values, np.nan)
+    return result
+
+
+def auto_freq(df):
+    """Bucket width for a point frame: 1s up to 10 minutes, 10s up to 6 hours, then 1min"""
+    if len(df) == 0:
+        return DEFAULT_FREQ
+    duration = df['datetime'].max() - df['datetime'].min()
+    for limit, freq in AUTO_FREQS:
+        if duration <= limit:
+            return freq
+    return AUTO_FREQS[-1][1]
+
+
+@profiled('timeline')
+def build_timeline(df, freq=DEFAULT_FREQ, by='role', metric=REQUEST_METRIC,
+                   window=DEFAULT_WINDOW, quantiles=DEFAULT_QUANTILES):
+    """Timeline of one metric's points grouped by a tag (or tuple of tags)
+
+    Every point of `metric` counts as one request; its status tag decides
+    whether it was throttled (429), its value feeds the rolling quantiles.
+    """
+    columns = (by,) if isinstance(by, str) else tuple(by)
+    window = max(1, int(window))
+    points = df[df['metric_name'] == metric]
+    freq = pd.tseries.frequencies.to_offset(freq)
+    if len(points) == 0:
+        return Timeline(pd.DatetimeIndex([], freq=freq), [], np.zeros((0, 0)),
+                        np.zeros((0, 0)), {q: np.zeros((0, 0)) for q in quantiles}, window)
+
+    step = freq.nanos
+    stamps = points['datetime'].values.astype('datetime64[ns]').view(np.int64)
+    origin = stamps.min() // step * step
+    buckets = (stamps - origin) // step
+    n_buckets = int(buckets.max()) + 1
+    index = pd.date_range(pd.Timestamp(origin), periods=n_buckets, freq=freq)
+
+    codes, keys = _group_codes(points, columns)
+    groups = [key[0] if isinstance(by, str) else key for key in keys]
+    cells = codes * n_buckets + buckets
+    size = len(groups) * n_buckets
+
+    requests = np.bincount(cells, minlength=size).reshape(len(groups), n_buckets)
+    status = _numeric_status(points['status']) if 'status' in points.columns \
+        else np.full(len(points), np.nan)
+    throttled = np.bincount(cells, weights=status == 429, minlength=size)
+    throttled = throttled.astype(np.int64).reshape(len(groups), n_buckets)
+
+    values = points['metric_value'].values.astype(np.float64)
+    valid = ~np.isnan(values)
+    bins = bucket_index(values[valid])
+    codes, buckets = codes[valid], buckets[valid]
+    rolling = {q: np.empty((len(groups), n_buckets)) for q in quantiles}
+    for position in range(len(groups)):
+        mask = codes == position
+        for q, series in _rolling_quantiles(bins[mask], buckets[mask], n_buckets,
+                                            window, quantiles).items():
+            rolling[q][position] = series
+
+    return Timeline(index, groups, requests, throttled, rolling, window)
@@ -0,0 +1,352 @@
+"""
+Isolation verdicts for noisy neighbor runs
+Per scenario, the victim's request latency while the noisy tenant is active
+(contended) is compared with its latency in a victim-only baseline run using
+a Mann-Whitney U test and a bootstrap confidence interval of the p95 shift.
+Victim throttling and the k6 `options.thresholds` of the test script are
+checked as well, giving a machine-readable pass/fail per scenario
+"""
+
+import math
+import operator
+import os
+import re
+
+import numpy as np
+
+from .omission import corrected_sketches
+from .results import ISOLATION_THRESHOLD, REQUEST_METRIC, LoadTestResults
+from .sketch import LatencySketch, bucket_values
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'all-tiers-noisy-neighbor-test.js')
+
+# Significance level of the latency shift test and bootstrap settings
+ALPHA = 0.01
+BOOTSTRAP_SAMPLES = 2000
+CONFIDENCE = 0.95
+SHIFT_QUANTILE = 0.95
+
+# Contention buckets (seconds) and the minimum samples per window to test
+WINDOW_SECONDS = 1
+MIN_SAMPLES = 20
+
+_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt,
+              '>=': operator.ge, '==': operator.eq, '!=': operator.ne}
+_THRESHOLD_BLOCK = re.compile(r'thresholds\s*:\s*\{(.*?)\n\s*\}', re.S)
+_THRESHOLD_ENTRY = re.compile(r'["\']?([\w{}:.\-]+)["\']?\s*:\s*\[([^\]]*)\]')
+_EXPRESSION = re.compile(r'^\s*(avg|min|max|med|count|rate|p\(\s*[\d.]+\s*\))\s*'
+                         r'(<=|>=|==|!=|<|>)\s*([-\d.]+)\s*$')
+
+
+# ---------- k6 thresholds ----------
+
+def parse_thresholds(script=DEFAULT_SCRIPT):
+    """{metric: [expression, ...]} from `thresholds: {...}` in a k6 script"""
+    with open(script, encoding='utf-8') as f:
+        source = f.read()
+    match = _THRESHOLD_BLOCK.search(source)
+    if not match:
+        return {}
+    block = re.sub(r'//[^\n]*', '', match.group(1))
+    thresholds = {}
+    for metric, expressions in _THRESHOLD_ENTRY.findall(block):
+        thresholds[metric] = re.findall(r'["\']([^"\']+)["\']', expressions)
+    return thresholds
+
+
+def _aggregate_value(agg, statistic):
+    """Value of a k6 threshold aggregation method for a MetricAggregate"""
+    if statistic in ('rate', 'avg'):
+        return agg.mean
+    if statistic == 'count':
+        return agg.sum
+    if statistic == 'min':
+        return agg.min
+    if statistic == 'max':
+        return agg.max
+    if statistic == 'med':
+        return agg.quantile(0.5)
+    return agg.quantile(float(statistic[2:-1]) / 100)
+
+
+def evaluate_threshold(run, metric, expression):
+    """{'metric', 'threshold', 'observed', 'passed'} for one expression"""
+    result = {'metric': metric, 'threshold': expression, 'observed': None, 'passed': None}
+    match = _EXPRESSION.match(expression)
+    agg = run.select(metric)
+    if not match or agg.count == 0:
+        return result
+    statistic, op, limit = match.groups()
+    observed = _aggregate_value(agg, statistic.replace(' ', ''))
+    result['observed'] = float(observed)
+    result['passed'] = bool(_OPERATORS[op](observed, float(limit)))
+    return result
+
+
+def _metric_scenarios(run):
+    """{metric: {scenario tags}} from the tags the metric's points carried"""
+    scenarios = {}
+    for (metric, _, _, scenario, _), agg in run.groups.items():
+        if scenario is not None and agg.count:
+            scenarios.setdefault(metric, set()).add(scenario)
+    return scenarios
+
+
+# ---------- latency shift ----------
+
+def mann_whitney(baseline, contended):
+    """Two-sided Mann-Whitney U test (normal approximation with tie correction)
+
+    Returns (U of contended, p-value, P(contended > baseline)). Ranks come
+    from one np.unique over the pooled samples, so millions of samples take
+    a sort, not a Python loop.
+    """
+    x = np.asarray(contended, dtype=np.float64)
+    y = np.asarray(baseline, dtype=np.float64)
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return float('nan'), float('nan'), float('nan')
+
+    _, inverse, counts = np.unique(np.concatenate([x, y]), return_inverse=True,
+                                   return_counts=True)
+    average_rank = np.cumsum(counts) - (counts - 1) / 2
+    u = average_rank[inverse[:n1]].sum() - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    ties = float((counts.astype(np.float64) ** 3 - counts).sum())
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return float(u), 1.0, float(u / (n1 * n2))
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+    return float(u), float(p_value), float(u / (n1 * n2))
+
+
+def _histogram_quantiles(counts, buckets, q):
+    """Quantile q of every row of a (samples, len(buckets)) histogram matrix"""
+    cumulative = np.cumsum(counts, axis=1)
+    ranks = q * (cumulative[:, -1] - 1)
+    index = (cumulative <= ranks[:, None]).sum(axis=1)
+    return bucket_values(buckets[np.minimum(index, len(buckets) - 1)])
+
+
+def bootstrap_sketch_shift(baseline, contended, q=SHIFT_QUANTILE, samples=BOOTSTRAP_SAMPLES,
+                           confidence=CONFIDENCE, seed=0):
+    """Bootstrap CI of quantile(contended) - quantile(baseline) for two LatencySketches
+
+    Resamples the sketch histograms (multinomial over buckets) rather than the
+    raw values, so the cost depends on the number of buckets, not samples.
+    Returns (shift, low, high).
+    """
+    sketches = (baseline, contended)
+    if any(sketch.count == 0 for sketch in sketches):
+        return float('nan'), float('nan'), float('nan')
+
+    occupied = np.flatnonzero(baseline.counts + contended.counts)
+    rng = np.random.default_rng(seed)
+    quantiles = []
+    for sketch in sketches:
+        probabilities = sketch.counts[occupied] / sketch.count
+        draws = rng.multinomial(sketch.count, probabilities, size=samples)
+        quantiles.append(_histogram_quantiles(draws, occupied, q))
+    shifts = quantiles[1] - quantiles[0]
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(shifts, [tail, 100 - tail])
+    observed = contended.quantile(q) - baseline.quantile(q)
+    return float(observed), float(low), float(high)
+
+
+def bootstrap_shift(baseline, contended, q=SHIFT_QUANTILE, samples=BOOTSTRAP_SAMPLES,
+                    confidence=CONFIDENCE, seed=0):
+    """bootstrap_sketch_shift for two arrays of raw latencies"""
+    return bootstrap_sketch_shift(LatencySketch().add_many(baseline),
+                                  LatencySketch().add_many(contended),
+                                  q, samples, confidence, seed)
+
+
+def contention_windows(points, window_seconds=WINDOW_SECONDS):
+    """(idle, contended) victim latencies of one scenario's request points
+
+    A victim request is contended if the noisy tenant sent requests in the
+    same window, idle otherwise. The test script starts both tenants of a
+    scenario together and keeps the noisy one busy throughout, so the idle
+    part is empty or a few edge seconds and is not used as a baseline.
+    """
+    stamps = points['datetime'].values.astype('datetime64[ns]').view(np.int64)
+    windows = stamps // int(window_seconds * 1e9)
+    role = points['role'].astype(str).values
+    values = points['metric_value'].values.astype(np.float64)
+
+    victim = role == 'victim'
+    busy = np.isin(windows[victim], np.unique(windows[role == 'noisy']))
+    victim_values = values[victim]
+    return victim_values[~busy], victim_values[busy]
+
+
+def latency_shift(points, alpha=ALPHA, window_seconds=WINDOW_SECONDS, baseline_points=None):
+    """Latency shift of the victim under noisy load for one scenario
+
+    The baseline is every victim request of `baseline_points`, a run of the
+    same scenario without noisy load. Without it the shift is not tested and
+    'skipped' says why.
+    """
+    _, contended = contention_windows(points, window_seconds)
+    baseline = np.empty(0)
+    if baseline_points is not None:
+        baseline_victim = baseline_points['role'].astype(str).values == 'victim'
+        baseline = baseline_points['metric_value'].values.astype(np.float64)[baseline_victim]
+    result = {
+        'skipped': None,
+        'baseline_samples': int(len(baseline)),
+        'contended_samples': int(len(contended)),
+        'baseline_p95_ms': None,
+        'contended_p95_ms': None,
+        'p95_shift_ms': None,
+        'p95_shift_ci_ms': None,
+        'mann_whitney_u': None,
+        'p_value': None,
+        'prob_slower': None,
+        'shifted': None,
+    }
+    if baseline_points is None:
+        result['skipped'] = 'no baseline run'
+    elif len(baseline) < MIN_SAMPLES or len(contended) < MIN_SAMPLES:
+        result['skipped'] = (f'not enough samples ({len(baseline)} baseline, '
+                             f'{len(contended)} contended; {MIN_SAMPLES} needed)')
+    if result['skipped']:
+        return result
+
+    u, p_value, prob_slower = mann_whitney(baseline, contended)
+    shift, low, high = bootstrap_shift(baseline, contended)
+    result.update({
+        'baseline_p95_ms': LatencySketch().add_many(baseline).quantile(SHIFT_QUANTILE),
+        'contended_p95_ms': LatencySketch().add_many(contended).quantile(SHIFT_QUANTILE),
+        'p95_shift_ms': shift,
+        'p95_shift_ci_ms': [low, high],
+        'mann_whitney_u': u,
+        'p_value': p_value,
+        'prob_slower': prob_slower,
+        # Significant, and the whole CI says "slower"
+        'shifted': bool(p_value < alpha and prob_slower > 0.5 and low > 0),
+    })
+    return result
+
+
+# ---------- verdicts ----------
+
+def _scenario_requests(frame):
+    """Request points of a frame, if it has the scenario tag"""
+    if frame is None or 'scenario' not in frame.columns:
+        return None
+    return frame[frame['metric_name'] == REQUEST_METRIC]
+
+
+def scenario_verdicts(run, frame=None, script=DEFAULT_SCRIPT, alpha=ALPHA, baseline_frame=None):
+    """[verdict dict per scenario] for a run's aggregates and (optional) point frame
+
+    A scenario passes when the victim throttle rate is under the isolation
+    threshold, every k6 threshold on its metrics holds and no significant
+    latency shift under noisy load is found. Missing data leaves a check at
+    None, which does not fail the scenario. The shift is only tested against
+    `baseline_frame`, a point frame of a run without noisy load; without one
+    every verdict has latency_checked False.
+    The victim p99 corrected for coordinated omission is reported alongside
+    when the frame has vu/iter tags.
+    """
+    results = LoadTestResults.from_aggregates(run)
+    thresholds = parse_thresholds(script) if script and os.path.exists(script) else {}
+    metric_scenarios = _metric_scenarios(run)
+    requests = _scenario_requests(frame)
+    baseline_requests = _scenario_requests(baseline_frame)
+    corrected = corrected_sketches(frame) if requests is not None else None
+
+    verdicts = []
+    for result in results:
+        checks = [evaluate_threshold(run, metric, expression)
+                  for metric, expressions in thresholds.items()
+                  if result.key in metric_scenarios.get(metric, ())
+                  for expression in expressions]
+        latency = None
+        if requests is not None:
+            baseline_points = (baseline_requests[baseline_requests['scenario'] == result.key]
+                               if baseline_requests is not None else None)
+            latency = latency_shift(requests[requests['scenario'] == result.key], alpha,
+                                    baseline_points=baseline_points)
+
+        omission = None
+        if corrected and (result.key, 'victim') in corrected:
+            raw, fixed, interval, added = corrected[(result.key, 'victim')]
+            omission = {'expected_interval_ms': interval, 'backfilled': added,
+                        'raw_p99_ms': raw.quantile(0.99), 'corrected_p99_ms': fixed.quantile(0.99)}
+
+        throttle_ok = result.victim.throttle_rate < ISOLATION_THRESHOLD
+        failed = (not throttle_ok
+                  or any(check['passed'] is False for check in checks)
+                  or (latency is not None and latency['shifted'] is True))
+        verdicts.append({
+            'scenario': result.key,
+            'title': result.scenario.title,
+            'noisy': result.noisy.name,
+            'victim': result.victim.name,
+            'victim_requests': result.victim.requests,
+            'victim_throttle_rate': result.victim.throttle_rate,
+            'throttle_isolated': throttle_ok,
+            'thresholds': checks,
+            'latency': latency,
+            'latency_checked': latency is not None and latency['shifted'] is not None,
+            'omission': omission,
+            'passed': not failed,
+        })
+    return verdicts
+
+
+def _load(filename, use_cache):
+    from .ingest import RunAggregates
+    from .loaders import load_aggregates, load_run
+
+    frame = load_run(filename, use_cache)
+    if os.path.splitext(filename)[1].lower() in ('.json', '.ndjson'):
+        return load_aggregates(filename, use_cache), frame
+    return RunAggregates.from_frame(frame), frame
+
+
+def evaluate_run(filename, script=DEFAULT_SCRIPT, alpha=ALPHA, baseline=None, use_cache=True):
+    """Verdicts for a k6 result file (JSON or CSV), optionally against a baseline run file"""
+    run, frame = _load(filename, use_cache)
+    baseline_frame = _load(baseline, use_cache)[1] if baseline else None
+    return scenario_verdicts(run, frame, script, alpha, baseline_frame)
+
+
+def format_verdicts(verdicts):
+    """Human-readable verdict lines"""
+    lines = []
+    for verdict in verdicts:
+        lines.append(f"{'✅ PASS' if verdict['passed'] else '❌ FAIL'}  {verdict['title']}"
+                     f"  ({verdict['victim']}: {verdict['victim_throttle_rate']:.1f}% throttled)"
+                     f"{'' if verdict['latency_checked'] else ', latency shift not checked'}")
+        for check in verdict['thresholds']:
+            state = {True: 'ok', False: 'FAILED', None: 'no data'}[check['passed']]
+            observed = f"{check['observed']:.4g}" if check['observed'] is not None else '-'
+            lines.append(f"     threshold {check['metric']} {check['threshold']}: {observed} {state}")
+        latency = verdict['latency']
+        if latency is None:
+            lines.append('     latency shift: not checked, the result file has no scenario tags')
+        elif latency['skipped'] == 'no baseline run':
+            lines.append('     latency shift: not checked, no victim-only baseline '
+                         '(pass --baseline FILE)')
+        elif latency['skipped']:
+            lines.append(f"     latency shift: not checked, {latency['skipped']}")
+        else:
+            low, high = latency['p95_shift_ci_ms']
+            lines.append(f"     latency shift: p95 {latency['baseline_p95_ms']:.0f} → "
+                         f"{latency['contended_p95_ms']:.0f} ms "
+                         f"(Δ {latency['p95_shift_ms']:+.0f} ms, CI [{low:+.0f}, {high:+.0f}]), "
+                         f"p={latency['p_value']:.2g}"
+                         f"{' SHIFTED' if latency['shifted'] else ''}")
+        omission = verdict.get('omission')
+        if omission and omission['backfilled']:
+            lines.append(f"     victim p99 corrected for coordinated omission: "
+                         f"{omission['raw_p99_ms']:.0f} → {omission['corrected_p99_ms']:.0f} ms "
+                         f"({omission['backfilled']:,} back-filled)")
+    return lines
@@ -3,11 +3,14 @@ cd "$(dirname "$0")"
 source .venv/bin/activate
 
 echo "Generovanie grafov..."
-python visualize_scenario1.py
-python visualize_scenario2.py
-python visualize_scenario3.py
-python visualize_summary.py
+# Dáta sa načítajú raz, grafy sa vykreslia paralelne (python -m analytics --help)
+python -m analytics render "$@"
+
+# Uloženie behu do histórie (python -m analytics compare porovná s predchádzajúcimi)
+for f in noisy-neighbor-results.json crud-latency-results.csv; do
+    [ -f "$f" ] && python -m analytics record "$f"
+done
 
 echo ""
 echo "Vytvorené súbory:"
-ls -la scenario*.png summary*.png 2>/dev/null
+ls -la *.png 2>/dev/null
@@ -25,7 +25,13 @@ PREMIUM_VICTIM_TOKEN=$(aws cognito-idp initiate-auth --client-id $CLIENT_ID --au
 
 echo "Tokens: BASIC=${#BASIC_TOKEN} STANDARD=${#STANDARD_TOKEN} PLATINUM=${#PLATINUM_TOKEN} NOISY=${#PREMIUM_NOISY_TOKEN} VICTIM=${#PREMIUM_VICTIM_TOKEN}"
 
+# Open-model alternative with exact req/s (same tokens exported):
+#   python -m analytics loadgen
+# Live dashboard while the test runs (second terminal):
+#   python visualize-noisy-neighbor.py --follow [--html live.html]
+# vu/iter tags let the analytics rebuild each VU's send schedule (python -m analytics latency)
 k6 run --out json=noisy-neighbor-results.json \
+  --system-tags=proto,subproto,status,method,url,name,group,check,error,error_code,tls_version,scenario,service,expected_response,vu,iter \
   -e BASIC_TOKEN="$BASIC_TOKEN" \
   -e STANDARD_TOKEN="$STANDARD_TOKEN" \
   -e PLATINUM_TOKEN="$PLATINUM_TOKEN" \
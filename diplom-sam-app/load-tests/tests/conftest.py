@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import `analytics` from load-tests/ when pytest runs from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from analytics import buildgraph, coldstart, figures
+from analytics.buildgraph import FigureCache, build_key, code_digest
+from analytics.figures import Figure, FigureData
+
+
+def _draw(module, data, output_file):
+    module.create_chart(output_file)
+
+
+def _other_draw(module, data, output_file):
+    module.create_other_chart(output_file)
+
+
+@pytest.fixture
+def scripts(tmp_path, monkeypatch):
+    """A visualize script importing a local helper, in a scripts dir of its own"""
+    directory = tmp_path / 'scripts'
+    directory.mkdir()
+    (directory / 'visualize_demo.py').write_text('from visualize_helpers import COLORS\n')
+    (directory / 'visualize_helpers.py').write_text("COLORS = ['red']\n")
+    monkeypatch.setattr(buildgraph, 'SCRIPTS_DIR', str(directory))
+    return directory
+
+
+def _figure(draw=_draw, inputs=('noisy_frame',)):
+    return Figure('demo', 'visualize_demo.py', draw, inputs, 'demo.png')
+
+
+def test_code_digest_follows_script_imports_and_draw_function(scripts):
+    digest = code_digest(_figure())
+    assert code_digest(_figure()) == digest
+    assert code_digest(_figure(_other_draw)) != digest
+
+    (scripts / 'visualize_helpers.py').write_text("COLORS = ['blue', 'green']\n")
+    assert code_digest(_figure()) != digest
+
+
+def test_code_digest_covers_the_modules_preparing_figure_data(scripts, monkeypatch):
+    digest = code_digest(_figure())
+    read = buildgraph._read
+
+    def edited(path):
+        source = read(path)
+        return source + b'# edited' if os.path.basename(path) == 'coldstart.py' else source
+
+    # The latency breakdown is computed by coldstart, which no visualize script imports
+    monkeypatch.setattr(buildgraph, '_read', edited)
+    assert code_digest(_figure()) != digest
+
+
+def test_latency_breakdown_key_hashes_the_template(tmp_path, monkeypatch):
+    template = tmp_path / 'template.yaml'
+    template.write_text('Resources: {}\n')
+    monkeypatch.setattr(coldstart, 'DEFAULT_TEMPLATE', str(template))
+    figure = figures.FIGURES['latency-breakdown']
+    data = FigureData(str(tmp_path))
+    key = figure.data_key(data)
+
+    template.write_text('Resources: {CreateProductFunction: {}}\n')
+    assert figure.data_key(data) != key
+
+
+def test_build_key_changes_with_its_own_inputs_only(scripts, tmp_path):
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    (inputs / 'noisy-neighbor-results.csv').write_text('metric_name,timestamp\n')
+    (inputs / 'crud-latency-results.csv').write_text('metric_name,timestamp\n')
+    data = FigureData(str(inputs))
+    key = build_key(_figure(), data)
+
+    (inputs / 'crud-latency-results.csv').write_text('metric_name,timestamp\nhttp_reqs,1\n')
+    assert build_key(_figure(), data) == key
+
+    (inputs / 'noisy-neighbor-results.csv').write_text('metric_name,timestamp\nhttp_reqs,1\n')
+    assert build_key(_figure(), data) != key
+
+
+def test_stored_figure_is_restored_by_key(tmp_path):
+    cache = FigureCache(str(tmp_path / 'cache'))
+    output = tmp_path / 'demo.png'
+    output.write_bytes(b'png v1')
+    assert cache.store('key1', str(output))
+
+    output.unlink()
+    assert cache.restore('key1', str(output))
+    assert output.read_bytes() == b'png v1'
+    assert not cache.restore('key2', str(output))
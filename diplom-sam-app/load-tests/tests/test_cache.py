@@ -0,0 +1,92 @@
+import os
+import time
+
+from analytics.cache import RunCache
+
+
+def _put(cache, tmp_path, name, size):
+    source = tmp_path / f'{name}.json'
+    source.write_text(name)
+    cache.get_object(str(source), 'object', lambda _: 'x' * size,
+                     to_dict=lambda obj: obj, from_dict=lambda data: data)
+    return source
+
+
+def _age(cache, seconds):
+    """Mark every entry as last used `seconds` ago"""
+    for path, _, _ in cache.entries():
+        when = time.time() - seconds
+        os.utime(os.path.join(path, 'meta.json'), (when, when))
+
+
+def test_cache_hit_returns_stored_object(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    source = _put(cache, tmp_path, 'run', 10)
+    built = []
+    value = cache.get_object(str(source), 'object', built.append,
+                             to_dict=lambda obj: obj, from_dict=lambda data: data)
+    assert value == 'x' * 10
+    assert built == []
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    _put(cache, tmp_path, 'old', 1000)
+    _age(cache, 60)
+    _put(cache, tmp_path, 'new', 1000)
+    [(newest, size, _)] = [entry for entry in cache.entries() if entry[2] > time.time() - 30]
+
+    cache.max_bytes = size + 100
+    removed = cache.evict()
+    assert len(removed) == 1
+    assert [path for path, _, _ in cache.entries()] == [newest]
+
+
+def test_reading_an_entry_refreshes_it(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    first = _put(cache, tmp_path, 'first', 1000)
+    _age(cache, 120)
+    _put(cache, tmp_path, 'second', 1000)
+    _age(cache, 60)
+    # Reading `first` makes `second` the least recently used
+    cache.get_object(str(first), 'object', None, to_dict=None, from_dict=lambda data: data)
+    cache.max_bytes = max(size for _, size, _ in cache.entries()) + 100
+    [removed] = cache.evict()
+    assert removed == cache._entry(str(tmp_path / 'second.json'), 'object')
+
+
+def test_evicts_entries_older_than_max_age(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'), max_age=3600)
+    _put(cache, tmp_path, 'stale', 10)
+    _age(cache, 7200)
+    _put(cache, tmp_path, 'fresh', 10)
+    assert len(cache.entries()) == 1
+
+
+def test_warm_frame_matches_cold_parse(tmp_path):
+    import pandas as pd
+
+    cache = RunCache(str(tmp_path / 'cache'))
+    source = tmp_path / 'run.csv'
+    source.write_text('run')
+    frame = pd.DataFrame({
+        'metric_name': pd.Categorical(['a', 'b', 'a'], categories=pd.Index(['a', 'b'], dtype=object)),
+        'status': pd.Categorical([200, 429, 200]),
+        'url': pd.Series(['/x', '/y', '/x'], dtype=object),
+        'metric_value': [1.0, 2.0, 3.0],
+    })
+    cache.get_frame(str(source), lambda _: frame)
+    warm = cache.get_frame(str(source), None)
+    pd.testing.assert_frame_equal(warm.copy(deep=True), frame)
+
+
+def test_parser_change_misses_old_entries(tmp_path, monkeypatch):
+    from analytics import cache as cache_module
+
+    cache = RunCache(str(tmp_path / 'cache'))
+    source = _put(cache, tmp_path, 'run', 10)
+    monkeypatch.setattr(cache_module, '_parser_digest', 'edited-parser')
+    built = []
+    cache.get_object(str(source), 'object', lambda _: built.append(1) or 'y',
+                     to_dict=lambda obj: obj, from_dict=lambda data: data)
+    assert built == [1]
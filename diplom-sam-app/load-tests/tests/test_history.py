@@ -0,0 +1,64 @@
+import numpy as np
+
+from analytics.history import RunHistory, compare_snapshots, results_sketches
+from analytics.ingest import RunAggregates
+from analytics.results import LoadTestResults
+
+
+def _results(victim_ms, victim_throttled, seed, stream_trends=False):
+    rng = np.random.default_rng(seed)
+    run = RunAggregates()
+    victim = rng.normal(victim_ms, 20, 5000)
+    run.groups[('http_req_duration', 'BasicCorp', 'BASIC', 'basic_standard', 'noisy')].add_many(
+        rng.normal(300, 30, 5000), throttled=2500)
+    run.groups[('http_req_duration', 'TestStandardCorp', 'STANDARD', 'basic_standard',
+                'victim')].add_many(victim, throttled=victim_throttled)
+    if stream_trends:
+        # The k6 script's own trend of the same victim requests
+        run.groups[('standard_victim_latency', None, None, 'basic_standard', 'victim')].add_many(
+            victim)
+    run.groups[('create_product_latency', None, None, None, None)].add_many(
+        rng.normal(150, 15, 1000))
+    return LoadTestResults.from_aggregates(run, source='run.json')
+
+
+def test_record_skips_a_file_recorded_before(tmp_path):
+    history = RunHistory(str(tmp_path / 'history.sqlite'))
+    run_id, created = history.record(_results(200, 0, 1), 'run', 'abc123', content_hash='h1')
+    assert created
+    assert history.record(_results(200, 0, 1), 'run', 'abc123', content_hash='h1') == (run_id,
+                                                                                       False)
+    snapshot = history.snapshot(run_id)
+    assert set(snapshot.sketches) == {'create_product_latency',
+                                      'http_req_duration/basic_standard/noisy',
+                                      'http_req_duration/basic_standard/victim'}
+    assert snapshot.throttles[('basic_standard', 'noisy')]['throttled'] == 2500
+
+
+def test_compare_flags_victim_latency_and_throttle_regressions(tmp_path):
+    history = RunHistory(str(tmp_path / 'history.sqlite'))
+    base_id, _ = history.record(_results(200, 0, 1), 'run', content_hash='base')
+    new_id, _ = history.record(_results(260, 500, 2), 'run', content_hash='new')
+    assert history.previous_runs(new_id, 5) == [base_id]
+
+    rows = compare_snapshots(history.baseline(new_id, 5), history.snapshot(new_id), samples=200)
+    flagged = {(row['name'], row['statistic']) for row in rows if row['regression']}
+    assert flagged == {('http_req_duration/basic_standard/victim', 'p95'),
+                       ('http_req_duration/basic_standard/victim', 'p99'),
+                       ('basic_standard/victim', 'throttle %')}
+
+
+def test_unchanged_run_has_no_regressions(tmp_path):
+    history = RunHistory(str(tmp_path / 'history.sqlite'))
+    history.record(_results(200, 10, 1), 'run', content_hash='a')
+    new_id, _ = history.record(_results(200, 10, 2), 'run', content_hash='b')
+    rows = compare_snapshots(history.baseline(new_id, 5), history.snapshot(new_id), samples=200)
+    assert rows and not any(row['regression'] for row in rows)
+
+
+def test_results_sketches_names_each_role_once():
+    results = _results(200, 0, 1, stream_trends=True)
+    assert 'standard_victim_latency' in results.operations
+    assert sorted(results_sketches(results)) == [
+        'create_product_latency', 'http_req_duration/basic_standard/noisy',
+        'http_req_duration/basic_standard/victim']
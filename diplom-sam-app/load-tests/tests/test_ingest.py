@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from analytics.ingest import ingest_k6_json
+
+
+def _point(metric, value, time, **tags):
+    return json.dumps({'type': 'Point', 'metric': metric,
+                       'data': {'time': time, 'value': value, 'tags': tags}})
+
+
+def _write_run(path):
+    noisy = {'tenant': 'BasicCorp', 'tier': 'BASIC', 'scenario': 'basic_standard', 'role': 'noisy'}
+    victim = {'tenant': 'TestStandardCorp', 'tier': 'STANDARD', 'scenario': 'basic_standard',
+              'role': 'victim'}
+    lines = [
+        json.dumps({'type': 'Metric', 'metric': 'http_req_duration',
+                    'data': {'name': 'http_req_duration', 'type': 'trend'}}),
+        _point('http_req_duration', 100, '2026-01-01T00:00:01Z', status='200', **noisy),
+        _point('http_req_duration', 20, '2026-01-01T00:00:03Z', status='429', **noisy),
+        _point('http_req_duration', 300, '2026-01-01T00:00:02Z', status='503', **noisy),
+        '{"type": "Point", "metric": "http_req_dur',
+        '',
+        _point('http_req_duration', 50, '2026-01-01T00:00:00Z', status='200', **victim),
+        _point('http_reqs', 1, '2026-01-01T00:00:00Z', status='200', **victim),
+    ]
+    path.write_text('\n'.join(lines))
+
+
+def test_ingest_folds_points_per_tag_group(tmp_path):
+    source = tmp_path / 'run.json'
+    _write_run(source)
+    # A 64 byte chunk splits most lines across two reads
+    run, stats = ingest_k6_json(str(source), chunk_size=64)
+
+    assert (stats.lines, stats.points, stats.bad_lines) == (7, 5, 1)
+    assert run.metric_types == {'http_req_duration': 'trend'}
+    assert run.metrics() == ['http_req_duration', 'http_reqs']
+    assert (run.start, run.end) == ('2026-01-01T00:00:00Z', '2026-01-01T00:00:03Z')
+
+    roles = run.split('http_req_duration')
+    noisy, victim = roles['noisy'], roles['victim']
+    assert (noisy.count, noisy.throttled, noisy.errors) == (3, 1, 2)
+    assert noisy.sum == pytest.approx(420)
+    assert (noisy.min, noisy.max) == (20, 300)
+    assert (victim.count, victim.throttled, victim.errors) == (1, 0, 0)
+    assert run.select('http_reqs', tenant='TestStandardCorp').count == 1
+    assert run.select('http_reqs', tenant='BasicCorp').count == 0
+
+
+def test_chunk_size_does_not_change_the_aggregates(tmp_path):
+    source = tmp_path / 'run.json'
+    _write_run(source)
+    whole, _ = ingest_k6_json(str(source))
+    chunked, _ = ingest_k6_json(str(source), chunk_size=7)
+    assert whole.groups.keys() == chunked.groups.keys()
+    for key, agg in whole.groups.items():
+        other = chunked.groups[key]
+        assert (agg.count, agg.sum, agg.throttled, agg.errors) == (
+            other.count, other.sum, other.throttled, other.errors)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from analytics.omission import backfill
+
+
+def test_backfill_fills_down_to_expected():
+    # 350 ms with 100 ms expected hid requests that would have taken 250 and 150 ms
+    np.testing.assert_array_equal(backfill([100, 350], 100), [250, 150])
+    np.testing.assert_array_equal(backfill([10, 25, 40], 10), [15, 30, 20, 10])
+
+
+def test_backfill_limit():
+    np.testing.assert_array_equal(backfill([1000], 100, limit=3), [900, 800, 700])
+
+
+def test_backfill_nothing_to_fill():
+    assert len(backfill([50, 150, 199], 100)) == 0
+    assert len(backfill([500], 0)) == 0
+    assert len(backfill([], 100)) == 0
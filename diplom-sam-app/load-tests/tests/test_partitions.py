@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from analytics.partitions import RecordedStream, simulate
+
+
+def _records(rows):
+    return pd.DataFrame(rows, columns=['time', 'request_id', 'table', 'operation', 'shard',
+                                       'tenant', 'tier', 'rcu', 'wcu'])
+
+
+def test_replay_mixed_gets_and_queries():
+    rows = []
+    # 2000 point gets on shard t-1 within one second, two per request
+    for i in range(2000):
+        rows.append((0, f'get-{i // 2}', 'products', 'get', 't-1', 't', 'BASIC', 1.0, 0.0))
+    # Three list reads, each logging one query per shard of the tenant
+    for request in range(3):
+        for shard in range(1, 11):
+            rows.append((500, f'list-{request}', 'products', 'query', f't-{shard}', 't',
+                         'BASIC', 0.5, 0.0))
+    rows.append((900, 'admin', 'products', 'scan', None, 't', 'BASIC', 40.0, 0.0))
+    stream = RecordedStream(_records(rows), shards=10)
+    assert stream.scans == 1
+    assert stream.events == 2000 + 3
+
+    load = simulate(stream)
+    table = load.key_table(stream.names).set_index('shard_id')
+    # Gets load only their own shard; every shard carries the three list reads
+    assert table.loc['t-1', 'peak_rcu'] == 2000 + 3 * 0.5
+    np.testing.assert_allclose(table.drop('t-1')['peak_rcu'], 1.5)
+    assert load.rcu.sum() == 2000 + 10 * 3 * 0.5
+
+
+def test_replay_gets_follow_new_shard_count():
+    rows = [(0, f'r{i}', 'orders', 'get', 't-7', 't', 'BASIC', 1.0, 0.0) for i in range(10)]
+    rows.append((0, 'w', 'orders', 'put', 't-3', 't', 'BASIC', 0.0, 1.0))
+    stream = RecordedStream(_records(rows), shards=4)
+    table = simulate(stream).key_table(stream.names).set_index('shard_id')
+    # Recorded suffix 7 (index 6) lands on index 6 % 4 = 2, i.e. t-3
+    assert table.loc['t-3', 'peak_rcu'] == 10
+    assert table['peak_rcu'].sum() == 10
+    assert table['peak_wcu'].sum() == 1
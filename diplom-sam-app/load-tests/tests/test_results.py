@@ -0,0 +1,49 @@
+from analytics.ingest import RunAggregates
+from analytics.results import LoadTestResults
+
+
+def _add(run, metric, values, tenant=None, tier=None, scenario=None, role=None,
+         throttled=0, errors=0):
+    run.groups[(metric, tenant, tier, scenario, role)].add_many(values, throttled, errors)
+
+
+def _run():
+    run = RunAggregates()
+    run.metric_types.update({'create_product_latency': 'trend', 'basic_noisy_error_rate': 'rate'})
+    _add(run, 'http_req_duration', [100.0] * 6, 'BasicCorp', 'BASIC', 'basic_standard', 'noisy',
+         throttled=3, errors=3)
+    _add(run, 'http_req_duration', [120.0] * 2, 'OtherCorp', 'BASIC', 'basic_standard', 'noisy',
+         throttled=1, errors=1)
+    _add(run, 'http_req_duration', [80.0] * 10, 'TestStandardCorp', None, 'basic_standard',
+         'victim')
+    # Setup traffic outside the noisy/victim roles is not part of any scenario
+    _add(run, 'http_req_duration', [500.0] * 4, 'BasicCorp', 'BASIC', 'basic_standard', 'other')
+    _add(run, 'create_product_latency', [40.0, 60.0])
+    _add(run, 'basic_noisy_latency', [100.0] * 6, scenario='basic_standard', role='noisy')
+    _add(run, 'basic_noisy_error_rate', [1.0, 0.0], scenario='basic_standard', role='noisy')
+    return run
+
+
+def test_from_aggregates_merges_tenants_of_a_role():
+    results = LoadTestResults.from_aggregates(_run(), source='run.json')
+    assert list(results.scenarios) == ['basic_standard']
+    scenario = results['basic_standard']
+
+    noisy = scenario.noisy
+    # Named after the busiest tenant, counts of both tenants
+    assert (noisy.name, noisy.tier) == ('BasicCorp', 'BASIC')
+    assert (noisy.requests, noisy.throttled, noisy.errors) == (8, 4, 4)
+    assert noisy.throttle_rate == 50.0
+    assert noisy.latency.max < 200
+
+    victim = scenario.victim
+    # No tier tag: the tier of the scenario definition
+    assert (victim.name, victim.tier, victim.requests) == ('TestStandardCorp', 'STANDARD', 10)
+    assert scenario.isolated
+
+
+def test_from_aggregates_keeps_latency_trends_as_operations():
+    results = LoadTestResults.from_aggregates(_run())
+    assert sorted(results.operations) == ['basic_noisy_latency', 'create_product_latency']
+    assert results.operations['create_product_latency'].count == 2
+    assert results.operations['basic_noisy_latency'].count == 6
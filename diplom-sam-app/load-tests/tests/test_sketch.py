@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from analytics.sketch import RELATIVE_ACCURACY, LatencySketch
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999]
+
+
+def _distributions():
+    rng = np.random.default_rng(42)
+    return {
+        'lognormal': rng.lognormal(mean=5, sigma=0.8, size=200_000),
+        'uniform': rng.uniform(20, 2000, size=200_000),
+        'exponential': rng.exponential(150, size=200_000) + 1,
+    }
+
+
+@pytest.mark.parametrize('name', ['lognormal', 'uniform', 'exponential'])
+def test_quantiles_within_relative_accuracy(name):
+    values = _distributions()[name]
+    sketch = LatencySketch().add_many(values)
+    # The sketch answers with the bucket of the sample at rank floor(q * (n - 1))
+    expected = np.quantile(values, QS, method='lower')
+    np.testing.assert_allclose(sketch.quantiles(QS), expected, rtol=RELATIVE_ACCURACY + 1e-9)
+
+
+def test_merge_matches_single_sketch():
+    values = _distributions()['lognormal']
+    whole = LatencySketch().add_many(values)
+    merged = LatencySketch().add_many(values[:70_000]).merge(LatencySketch().add_many(values[70_000:]))
+    assert merged.count == whole.count
+    assert merged.min == whole.min and merged.max == whole.max
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    np.testing.assert_allclose(merged.quantiles(QS), np.quantile(values, QS, method='lower'),
+                               rtol=RELATIVE_ACCURACY + 1e-9)
+
+
+def test_extremes_and_empty_sketch():
+    sketch = LatencySketch().add_many([12.5, 40.0, np.nan, 990.0])
+    assert sketch.count == 3
+    assert sketch.quantile(0) == pytest.approx(12.5, rel=RELATIVE_ACCURACY)
+    assert sketch.quantile(1) == pytest.approx(990.0, rel=RELATIVE_ACCURACY)
+    assert (sketch.min, sketch.max) == (12.5, 990.0)
+    assert np.isnan(LatencySketch().quantile(0.5))
+
+
+def test_dict_round_trip():
+    sketch = LatencySketch().add_many(_distributions()['exponential'][:5000])
+    restored = LatencySketch.from_dict(sketch.to_dict())
+    np.testing.assert_array_equal(restored.counts, sketch.counts)
+    assert (restored.count, restored.sum, restored.min, restored.max) == \
+        (sketch.count, sketch.sum, sketch.min, sketch.max)
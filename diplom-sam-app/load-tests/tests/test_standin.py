@@ -0,0 +1,26 @@
+from analytics.standin import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_burst_and_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.take() for _ in range(4)] == ['ok', 'ok', 'ok', 'throttled']
+    clock.now = 0.5
+    assert [bucket.take() for _ in range(2)] == ['ok', 'throttled']
+    # Refill stops at burst
+    clock.now = 100
+    assert [bucket.take() for _ in range(4)] == ['ok', 'ok', 'ok', 'throttled']
+
+
+def test_token_bucket_quota():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, burst=100, quota=2, clock=clock)
+    assert [bucket.take() for _ in range(3)] == ['ok', 'ok', 'over_quota']
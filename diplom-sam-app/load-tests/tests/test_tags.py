@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from analytics.tags import add_tag_columns, parse_tag_string, split_tags
+
+
+def test_parse_tag_string():
+    assert parse_tag_string('tenant=BasicCorp&tier=BASIC&broken&role=') == {
+        'tenant': 'BasicCorp', 'tier': 'BASIC', 'role': ''}
+    assert parse_tag_string(np.nan) == {}
+    assert parse_tag_string('') == {}
+
+
+def test_split_tags_maps_rows_through_unique_strings():
+    extra_tags = pd.Series(['tenant=a&tier=BASIC', np.nan, 'tenant=b', 'tenant=a&tier=BASIC'],
+                           index=[10, 11, 12, 13])
+    columns = split_tags(extra_tags, keys=('tenant', 'tier'))
+    assert columns['tenant'].tolist() == ['a', np.nan, 'b', 'a']
+    assert columns['tier'].tolist() == ['BASIC', np.nan, np.nan, 'BASIC']
+    assert columns['tenant'].index.tolist() == [10, 11, 12, 13]
+
+
+def test_add_tag_columns_falls_back_to_csv_columns_and_tenant_role():
+    df = pd.DataFrame({
+        'metric_name': ['http_req_duration'] * 4,
+        'extra_tags': ['tenant=BasicCorp&role=noisy&status=429', 'tenant=victim',
+                       'tenant=PremiumCorp', np.nan],
+        'scenario': ['basic_standard', 'basic_standard', 'premium_premium', 'basic_platinum'],
+        'status': [200, 200, 503, 200],
+    })
+    add_tag_columns(df)
+    # extra_tags wins over the status column, which fills the gaps as strings
+    assert df['status'].tolist() == ['429', '200', '503', '200']
+    assert df['scenario'].tolist() == ['basic_standard', 'basic_standard', 'premium_premium',
+                                       'basic_platinum']
+    # role tag first, then tenant=noisy|victim, everything else is 'other'
+    assert df['role'].tolist() == ['noisy', 'victim', 'other', 'other']
+    assert isinstance(df['tenant'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pytest
+
+from analytics.sketch import RELATIVE_ACCURACY, LatencySketch
+from analytics.verdict import bootstrap_sketch_shift, mann_whitney
+
+
+def test_mann_whitney_without_ties():
+    # Pooled ranks 1..5, contended holds 3, 4, 5: U = 12 - 3 * 4 / 2 = 6 = n1 * n2
+    # var = 3 * 2 / 12 * 6 = 3, z = (6 - 3) / sqrt(3), p = erfc(z / sqrt(2))
+    u, p_value, effect = mann_whitney(baseline=[1, 2], contended=[3, 4, 5])
+    assert u == 6
+    assert effect == 1.0
+    assert p_value == pytest.approx(0.0832645166635504)
+
+
+def test_mann_whitney_tie_correction():
+    # Pooled 1, 2, 2, 2, 3 -> ranks 1, 3, 3, 3, 5; contended ranks 1 + 3 + 3 = 7, U = 7 - 6 = 1
+    # Ties 1, 3, 1: sum(t^3 - t) = 24, var = 6 / 12 * (6 - 24 / 20) = 2.4
+    u, p_value, effect = mann_whitney(baseline=[2, 3], contended=[1, 2, 2])
+    assert u == 1
+    assert effect == pytest.approx(1 / 6)
+    assert p_value == pytest.approx(math.erfc(2 / math.sqrt(2.4) / math.sqrt(2)))
+    assert p_value == pytest.approx(0.1967056024589469)
+
+
+def test_mann_whitney_degenerate_inputs():
+    u, p_value, effect = mann_whitney([5, 5, 5], [5, 5])
+    assert (u, p_value, effect) == (3.0, 1.0, 0.5)
+    assert all(math.isnan(v) for v in mann_whitney([], [1, 2]))
+
+
+def test_bootstrap_shift_detects_shift():
+    rng = np.random.default_rng(7)
+    baseline_values = rng.normal(200, 20, 20_000)
+    contended_values = rng.normal(250, 20, 20_000)
+    baseline = LatencySketch().add_many(baseline_values)
+    contended = LatencySketch().add_many(contended_values)
+    observed, low, high = bootstrap_sketch_shift(baseline, contended, q=0.5, samples=500)
+    # Each median is within RELATIVE_ACCURACY, so the shift is within the sum of both errors
+    exact = np.median(contended_values) - np.median(baseline_values)
+    assert observed == pytest.approx(exact, abs=RELATIVE_ACCURACY * 450)
+    assert 0 < low <= observed <= high
+
+
+def test_bootstrap_shift_without_shift():
+    rng = np.random.default_rng(7)
+    baseline = LatencySketch().add_many(rng.normal(200, 20, 20_000))
+    contended = LatencySketch().add_many(rng.normal(200, 20, 20_000))
+    _, low, high = bootstrap_sketch_shift(baseline, contended, q=0.95, samples=500)
+    assert low <= 0 <= high
+    assert all(math.isnan(v) for v in bootstrap_sketch_shift(LatencySketch(), contended))
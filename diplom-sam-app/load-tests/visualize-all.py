@@ -14,6 +14,12 @@ from datetime import datetime
 import sys
 import os
 
+from analytics.loaders import load_csv as load_k6_csv
+from analytics.profiling import profiled, setup_from_argv
+from analytics.sketch import frame_sketches
+from analytics.tags import metric_groups
+from analytics.timeline import auto_freq, build_timeline
+
 # Style settings
 plt.style.use('seaborn-v0_8-whitegrid')
 COLORS = {
@@ -25,22 +31,10 @@ COLORS = {
 }
 
 def load_csv(filename):
-    """Load CSV and process timestamps"""
-    df = pd.read_csv(filename)
-    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-    return df
-
-def extract_tenant(row):
-    """Extract tenant from extra_tags"""
-    if pd.isna(row.get('extra_tags', '')):
-        return 'other'
-    tags = str(row['extra_tags'])
-    if 'tenant=noisy' in tags:
-        return 'noisy'
-    elif 'tenant=victim' in tags:
-        return 'victim'
-    return 'other'
+    """Load CSV with timestamps and tag columns (cached per file content)"""
+    return load_k6_csv(filename)
 
+@profiled('rate limiting chart')
 def create_rate_limiting_chart(df, output_file='rate-limiting-results.png'):
     """Create Rate Limiting / Noisy Neighbor visualization"""
     
@@ -48,43 +42,42 @@ def create_rate_limiting_chart(df, output_file='rate-limiting-results.png'):
     fig.suptitle('🔒 Rate Limiting Test Results\nNoisy Neighbor Isolation: BASIC vs PLATINUM', 
                  fontsize=16, fontweight='bold', y=1.02)
     
-    # Filter HTTP data
-    http_duration = df[df['metric_name'] == 'http_req_duration'].copy()
-    http_duration['tenant'] = http_duration.apply(extract_tenant, axis=1)
-    
-    noisy_data = http_duration[http_duration['tenant'] == 'noisy']
-    victim_data = http_duration[http_duration['tenant'] == 'victim']
+    # HTTP data, split by noisy/victim role
+    http_duration = df[df['metric_name'] == 'http_req_duration']
+    duration_by_role = metric_groups(df, 'http_req_duration')
+    noisy_data = duration_by_role.get('noisy', http_duration.iloc[:0])
+    victim_data = duration_by_role.get('victim', http_duration.iloc[:0])
+    role_sketches = frame_sketches(http_duration, by='role')
     
-    # 1. Response Time Scatter
+    # 1. Response Time Over Time (rolling p50-p95 band per role, fixed cost per bucket)
     ax1 = axes[0, 0]
-    if len(noisy_data) > 0:
-        ax1.scatter(noisy_data['datetime'], noisy_data['metric_value'], 
-                   alpha=0.4, s=15, c=COLORS['noisy'], label='BASIC (noisy)')
-    if len(victim_data) > 0:
-        ax1.scatter(victim_data['datetime'], victim_data['metric_value'], 
-                   alpha=0.6, s=25, c=COLORS['victim'], label='PLATINUM (victim)')
+    timeline = build_timeline(df, freq=auto_freq(df), by='role')
+    for role, label in (('noisy', 'BASIC (noisy)'), ('victim', 'PLATINUM (victim)')):
+        if role in timeline:
+            series = timeline[role]
+            ax1.fill_between(series.index, series['p50'], series['p95'],
+                             color=COLORS[role], alpha=0.2)
+            ax1.plot(series.index, series['p95'], color=COLORS[role], linewidth=1.5,
+                     label=f'{label} p95')
     ax1.set_xlabel('Time')
     ax1.set_ylabel('Response Time (ms)')
-    ax1.set_title('Response Time Over Time')
+    ax1.set_title(f'Response Time Over Time (rolling {timeline.window * timeline.bucket_seconds:g}s p50-p95)')
     ax1.legend(loc='upper right')
     ax1.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
     ax1.tick_params(axis='x', rotation=45)
     
-    # 2. Box Plot
+    # 2. Box Plot (from latency sketches)
     ax2 = axes[0, 1]
-    data_to_plot = []
-    labels = []
+    box_stats = []
     colors = []
-    if len(noisy_data) > 0:
-        data_to_plot.append(noisy_data['metric_value'].values)
-        labels.append(f'BASIC (noisy)\nn={len(noisy_data)}')
+    if 'noisy' in role_sketches:
+        box_stats.append(role_sketches['noisy'].bxp_stats(f'BASIC (noisy)\nn={len(noisy_data)}'))
         colors.append(COLORS['noisy'])
-    if len(victim_data) > 0:
-        data_to_plot.append(victim_data['metric_value'].values)
-        labels.append(f'PLATINUM (victim)\nn={len(victim_data)}')
+    if 'victim' in role_sketches:
+        box_stats.append(role_sketches['victim'].bxp_stats(f'PLATINUM (victim)\nn={len(victim_data)}'))
         colors.append(COLORS['victim'])
     
-    bp = ax2.boxplot(data_to_plot, labels=labels, patch_artist=True)
+    bp = ax2.bxp(box_stats, patch_artist=True)
     for patch, color in zip(bp['boxes'], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.6)
@@ -93,14 +86,11 @@ def create_rate_limiting_chart(df, output_file='rate-limiting-results.png'):
     
     # 3. Error Rate / Throttling
     ax3 = axes[1, 0]
-    http_failed = df[df['metric_name'] == 'http_req_failed'].copy()
-    http_failed['tenant'] = http_failed.apply(extract_tenant, axis=1)
+    http_failed = df[df['metric_name'] == 'http_req_failed']
+    error_rates = http_failed.groupby('role', observed=True)['metric_value'].mean() * 100
     
-    noisy_errors = http_failed[http_failed['tenant'] == 'noisy']
-    victim_errors = http_failed[http_failed['tenant'] == 'victim']
-    
-    noisy_error_rate = noisy_errors['metric_value'].mean() * 100 if len(noisy_errors) > 0 else 0
-    victim_error_rate = victim_errors['metric_value'].mean() * 100 if len(victim_errors) > 0 else 0
+    noisy_error_rate = error_rates.get('noisy', 0)
+    victim_error_rate = error_rates.get('victim', 0)
     
     x = np.arange(2)
     bars = ax3.bar(x, [noisy_error_rate, victim_error_rate],
@@ -122,10 +112,10 @@ def create_rate_limiting_chart(df, output_file='rate-limiting-results.png'):
     table_data = [
         ['Metric', 'BASIC (noisy)', 'PLATINUM (victim)'],
         ['Requests', f'{len(noisy_data):,}', f'{len(victim_data):,}'],
-        ['Avg Latency', f"{noisy_data['metric_value'].mean():.0f} ms" if len(noisy_data) > 0 else 'N/A',
-                        f"{victim_data['metric_value'].mean():.0f} ms" if len(victim_data) > 0 else 'N/A'],
-        ['P95 Latency', f"{noisy_data['metric_value'].quantile(0.95):.0f} ms" if len(noisy_data) > 0 else 'N/A',
-                        f"{victim_data['metric_value'].quantile(0.95):.0f} ms" if len(victim_data) > 0 else 'N/A'],
+        ['Avg Latency', f"{role_sketches['noisy'].mean:.0f} ms" if 'noisy' in role_sketches else 'N/A',
+                        f"{role_sketches['victim'].mean:.0f} ms" if 'victim' in role_sketches else 'N/A'],
+        ['P95 Latency', f"{role_sketches['noisy'].quantile(0.95):.0f} ms" if 'noisy' in role_sketches else 'N/A',
+                        f"{role_sketches['victim'].quantile(0.95):.0f} ms" if 'victim' in role_sketches else 'N/A'],
         ['Error Rate', f'{noisy_error_rate:.1f}%', f'{victim_error_rate:.1f}%'],
         ['Status', '🔴 Throttled', '✅ Isolated'],
     ]
@@ -150,6 +140,7 @@ def create_rate_limiting_chart(df, output_file='rate-limiting-results.png'):
     return fig
 
 
+@profiled('latency chart')
 def create_latency_chart(df, output_file='latency-results.png'):
     """Create CRUD Latency visualization with percentiles"""
     
@@ -165,22 +156,23 @@ def create_latency_chart(df, output_file='latency-results.png'):
         'get_orders_latency': ('Get Orders', '#1ABC9C'),      # Teal
     }
     
-    # Calculate percentiles for each metric
+    # Build one latency sketch per metric in a single pass, then read percentiles off it
+    sketches = frame_sketches(df)
     percentile_data = {}
     for metric_name, (label, color) in metrics.items():
-        metric_df = df[df['metric_name'] == metric_name]
-        if len(metric_df) > 0:
-            values = metric_df['metric_value']
+        sketch = sketches.get(metric_name)
+        if sketch is not None:
+            p50, p90, p95, p99 = sketch.quantiles([0.50, 0.90, 0.95, 0.99])
             percentile_data[label] = {
-                'min': values.min(),
-                'avg': values.mean(),
-                'p50': values.quantile(0.50),
-                'p90': values.quantile(0.90),
-                'p95': values.quantile(0.95),
-                'p99': values.quantile(0.99) if len(values) >= 100 else values.max(),
-                'max': values.max(),
+                'min': sketch.min,
+                'avg': sketch.mean,
+                'p50': p50,
+                'p90': p90,
+                'p95': p95,
+                'p99': p99 if sketch.count >= 100 else sketch.max,
+                'max': sketch.max,
                 'color': color,
-                'values': values
+                'sketch': sketch
             }
     
     # 1. Percentile Bar Chart
@@ -202,11 +194,10 @@ def create_latency_chart(df, output_file='latency-results.png'):
     
     # 2. Box Plot Distribution
     ax2 = axes[0, 1]
-    data_to_plot = [percentile_data[op]['values'].values for op in percentile_data]
-    labels = list(percentile_data.keys())
+    box_stats = [percentile_data[op]['sketch'].bxp_stats(op) for op in percentile_data]
     colors_list = [percentile_data[op]['color'] for op in percentile_data]
     
-    bp = ax2.boxplot(data_to_plot, labels=labels, patch_artist=True)
+    bp = ax2.bxp(box_stats, patch_artist=True)
     for patch, color in zip(bp['boxes'], colors_list):
         patch.set_facecolor(color)
         patch.set_alpha(0.6)
@@ -274,6 +265,44 @@ def create_latency_chart(df, output_file='latency-results.png'):
     return fig
 
 
+@profiled('timeline chart')
+def create_timeline_chart(df, output_file='timeline-results.png', freq=None):
+    """Create per-tenant throughput, 429 rate and rolling p95 timelines"""
+    
+    # 1s buckets for short runs, coarser ones for long runs
+    freq = freq or auto_freq(df)
+    timeline = build_timeline(df, freq=freq, by=('tenant', 'tier'))
+    groups = [group for group in timeline.groups if group[0] is not None]
+    
+    fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
+    fig.suptitle(f'📈 Tenant Timelines ({freq} buckets)', fontsize=16, fontweight='bold')
+    
+    colors = plt.cm.tab10(np.arange(len(groups)) % 10)
+    for (tenant, tier), color in zip(groups, colors):
+        series = timeline[(tenant, tier)]
+        label = f'{tenant} ({tier})' if tier else tenant
+        axes[0].plot(series.index, series['rps'], color=color, linewidth=1.2, label=label)
+        axes[1].plot(series.index, series['throttle_rate'], color=color, linewidth=1.2, label=label)
+        axes[2].plot(series.index, series['p95'], color=color, linewidth=1.2, label=label)
+    
+    axes[0].set_ylabel('Requests / s')
+    axes[0].set_title('Throughput per Tenant')
+    axes[0].legend(loc='upper right', fontsize=9, ncol=2)
+    axes[1].set_ylabel('429 Rate (%)')
+    axes[1].set_title('Throttling Rate per Tenant')
+    axes[1].set_ylim(0, 105)
+    axes[2].set_ylabel('Latency (ms)')
+    axes[2].set_title(f'Rolling p95 Latency ({timeline.window * timeline.bucket_seconds:g}s window)')
+    axes[2].set_xlabel('Time')
+    axes[2].xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+    axes[2].tick_params(axis='x', rotation=45)
+    
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight', facecolor='white')
+    print(f"✅ Timeline chart saved: {output_file}")
+    return fig
+
+
 def main():
     print("=" * 60)
     print("📊 Load Test Results Visualization")
@@ -288,6 +317,7 @@ def main():
         df = load_csv(rate_limit_file)
         print(f"   Records: {len(df):,}")
         create_rate_limiting_chart(df)
+        create_timeline_chart(df)
     else:
         print(f"⚠️  {rate_limit_file} not found")
     
@@ -307,4 +337,5 @@ def main():
 
 
 if __name__ == '__main__':
+    setup_from_argv()
     main()
@@ -3,12 +3,15 @@ Noisy Neighbor Test Results Visualization
 Reads k6 JSON output and creates charts
 """
 
-import json
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
-from collections import defaultdict
-import sys
+import argparse
+
+from analytics.follow import DEFAULT_IDLE_TIMEOUT, DEFAULT_INTERVAL, follow
+from analytics.loaders import load_aggregates
+from analytics.profiling import profiled, setup_from_argv
+from analytics.results import DEFAULT_RESULTS_FILE, LoadTestResults
 
 # Set style
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -16,43 +19,36 @@ plt.rcParams['font.size'] = 11
 plt.rcParams['axes.titlesize'] = 14
 plt.rcParams['axes.labelsize'] = 12
 
+def counter_totals(run):
+    """{stream: {'requests', 'throttled'}} from the <stream>_requests and
+    <stream>_throttled counters of streamed run aggregates"""
+    streams = {}
+    for metric_name in run.metrics():
+        for field in ('requests', 'throttled'):
+            if metric_name.endswith(f'_{field}'):
+                stream = metric_name[:-len(field) - 1]
+                counts = streams.setdefault(stream, {'requests': 0, 'throttled': 0})
+                counts[field] = int(run.select(metric_name).sum)
+    
+    return streams
+
 def parse_k6_json(filename):
-    """Parse k6 JSON output and extract metrics"""
-    metrics = defaultdict(lambda: {'total': 0, 'throttled': 0})
-    
-    with open(filename, 'r') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                if data.get('type') == 'Point' and data.get('metric'):
-                    metric_name = data['metric']
-                    value = data.get('data', {}).get('value', 0)
-                    
-                    # Extract counter metrics
-                    if 'requests' in metric_name or 'throttled' in metric_name:
-                        metrics[metric_name]['total'] = value
-            except json.JSONDecodeError:
-                continue
-    
-    return metrics
+    """Stream k6 JSON output and aggregate request/throttle counters"""
+    return counter_totals(load_aggregates(filename))
 
-def create_noisy_neighbor_chart():
-    """Create Noisy Neighbor test visualization from test results"""
+@profiled('noisy neighbor chart')
+def create_noisy_neighbor_chart(results, output_file='noisy-neighbor-results.png'):
+    """Create Noisy Neighbor test visualization from the results model"""
     
-    # Data from test output (captured from console)
+    # Per-scenario data computed from the k6 output
     scenarios = {
-        'Scenario 1:\nBASIC → STANDARD': {
-            'noisy': {'name': 'BasicCorp', 'tier': 'BASIC', 'requests': 7302, 'throttled': 7055, 'rate': 96.62},
-            'victim': {'name': 'StandardCorp', 'tier': 'STANDARD', 'requests': 198, 'throttled': 0, 'rate': 0.0}
-        },
-        'Scenario 2:\nBASIC → PLATINUM': {
-            'noisy': {'name': 'BasicCorp', 'tier': 'BASIC', 'requests': 7217, 'throttled': 6964, 'rate': 96.49},
-            'victim': {'name': 'PlatinumCorp', 'tier': 'PLATINUM', 'requests': 184, 'throttled': 0, 'rate': 0.0}
-        },
-        'Scenario 3:\nPREMIUM → PREMIUM': {
-            'noisy': {'name': 'PremiumNoisy', 'tier': 'PREMIUM', 'requests': 1136, 'throttled': 0, 'rate': 0.0},
-            'victim': {'name': 'PremiumCorp', 'tier': 'PREMIUM', 'requests': 201, 'throttled': 0, 'rate': 0.0}
+        f'Scenario {r.scenario.number}:\n{r.scenario.title}': {
+            'noisy': {'name': r.noisy.name, 'tier': r.noisy.tier, 'requests': r.noisy.requests,
+                      'throttled': r.noisy.throttled, 'rate': r.noisy.throttle_rate},
+            'victim': {'name': r.victim.name, 'tier': r.victim.tier, 'requests': r.victim.requests,
+                       'throttled': r.victim.throttled, 'rate': r.victim.throttle_rate},
         }
+        for r in results
     }
     
     fig = plt.figure(figsize=(16, 10))
@@ -135,10 +131,12 @@ def create_noisy_neighbor_chart():
     # ============ Chart 3: Stacked Success/Throttled ============
     ax3 = fig.add_subplot(gs[1, 0])
     
-    tenants = ['BASIC\n(Noisy 1)', 'BASIC\n(Noisy 2)', 'STANDARD\n(Victim)', 
-               'PLATINUM\n(Victim)', 'PREMIUM\n(Noisy)', 'PREMIUM\n(Victim)']
-    successful = [7302-7055, 7217-6964, 198, 184, 1136, 201]
-    throttled = [7055, 6964, 0, 0, 0, 0]
+    tenants, successful, throttled = [], [], []
+    for r in results:
+        for label, tenant in (('Noisy', r.noisy), ('Victim', r.victim)):
+            tenants.append(f'{tenant.tier}\n({label} {r.scenario.number})')
+            successful.append(tenant.successful)
+            throttled.append(tenant.throttled)
     
     x3 = np.arange(len(tenants))
     
@@ -158,9 +156,9 @@ def create_noisy_neighbor_chart():
     
     # Create a summary table-like visualization
     isolation_data = {
-        'BASIC → STANDARD': ('ISOLATED', '#27ae60', 'Different tier Usage Plans'),
-        'BASIC → PLATINUM': ('ISOLATED', '#27ae60', 'Dedicated PLATINUM Usage Plan'),
-        'PREMIUM → PREMIUM': ('ISOLATED', '#27ae60', 'Per-tenant Usage Plans')
+        r.scenario.title: ('ISOLATED', '#27ae60', r.scenario.strategy) if r.isolated
+        else ('AFFECTED', '#e74c3c', r.scenario.strategy)
+        for r in results
     }
     
     ax4.set_xlim(0, 10)
@@ -185,21 +183,53 @@ def create_noisy_neighbor_chart():
         y_pos -= 2
     
     # Add key findings box
-    findings_text = """Key Findings:
-• BASIC noisy tenant throttled at ~96% - rate limiting works
-• All victim tenants: 0% throttled - complete isolation
-• PREMIUM per-tenant limits provide individual isolation
-• PLATINUM dedicated limits prevent cross-tier impact"""
+    noisy_rates = [r.noisy.throttle_rate for r in results]
+    victim_rates = [r.victim.throttle_rate for r in results]
+    isolated = sum(r.isolated for r in results)
+    findings = [
+        f"• Noisy tenants throttled at {min(noisy_rates, default=0):.0f}-"
+        f"{max(noisy_rates, default=0):.0f}%",
+        f"• Victims isolated: {isolated}/{len(results)}"
+        f" (max {max(victim_rates, default=0):.1f}% throttled)",
+    ]
+    # One line per isolation strategy, worded from what this run measured
+    findings += [
+        f"• {r.scenario.strategy} {'isolated' if r.isolated else 'did NOT isolate'}"
+        f" {r.scenario.victim_tier} ({r.victim.throttle_rate:.1f}%)"
+        for r in results
+    ]
+    findings_text = '\n'.join(['Key Findings:'] + findings)
     
     ax4.text(0.5, 1.5, findings_text, fontsize=10, va='top', 
             bbox=dict(boxstyle='round', facecolor='#f8f9fa', edgecolor='#dee2e6'),
             family='monospace')
     
     plt.tight_layout()
-    plt.savefig('noisy-neighbor-results.png', dpi=150, bbox_inches='tight', 
+    plt.savefig(output_file, dpi=150, bbox_inches='tight', 
                 facecolor='white', edgecolor='none')
-    print("Saved: noisy-neighbor-results.png")
+    print(f"Saved: {output_file}")
     plt.close()
 
+def main():
+    parser = argparse.ArgumentParser(description='Noisy neighbor results from k6 JSON output')
+    parser.add_argument('results_file', nargs='?', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--follow', action='store_true',
+                        help='tail a running k6 --out json file and refresh a live dashboard')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='dashboard refresh interval in seconds')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='stop following after this many seconds without new data')
+    parser.add_argument('--html', metavar='FILE', help='also write a self-refreshing HTML dashboard')
+    args = parser.parse_args()
+    
+    if args.follow:
+        run = follow(args.results_file, args.interval, args.idle_timeout, args.html)
+    else:
+        run = load_aggregates(args.results_file)
+    for stream, counts in counter_totals(run).items():
+        print(f"   {stream}: {counts['requests']:,} requests, {counts['throttled']:,} throttled (429)")
+    create_noisy_neighbor_chart(LoadTestResults.from_aggregates(run, source=args.results_file))
+
 if __name__ == '__main__':
-    create_noisy_neighbor_chart()
+    setup_from_argv()
+    main()
@@ -10,72 +10,60 @@ import matplotlib.dates as mdates
 from datetime import datetime
 import sys
 
-def load_and_process_csv(filename):
-    """Load CSV and filter relevant metrics"""
-    df = pd.read_csv(filename)
-    
-    # Convert timestamp to datetime
-    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-    
-    return df
+from analytics.loaders import load_csv
+from analytics.profiling import profiled, setup_from_argv
+from analytics.sketch import frame_sketches
+from analytics.tags import metric_groups
+from analytics.timeline import auto_freq, build_timeline
 
-def extract_tenant(row):
-    """Extract tenant from extra_tags column"""
-    if pd.isna(row['extra_tags']):
-        return 'other'
-    tags = row['extra_tags']
-    if 'tenant=noisy' in tags:
-        return 'noisy'
-    elif 'tenant=victim' in tags:
-        return 'victim'
-    return 'other'
+def load_and_process_csv(filename):
+    """Load CSV with timestamps and tag columns (cached per file content)"""
+    return load_csv(filename)
 
-def create_visualizations(df):
+@profiled('noisy neighbor charts')
+def create_visualizations(df, output_file='noisy-neighbor-charts.png'):
     """Create comparison charts"""
     
-    # Filter HTTP request duration data
-    http_duration = df[df['metric_name'] == 'http_req_duration'].copy()
-    http_duration['tenant'] = http_duration.apply(extract_tenant, axis=1)
-    
-    # Filter for noisy and victim only
-    noisy_data = http_duration[http_duration['tenant'] == 'noisy']
-    victim_data = http_duration[http_duration['tenant'] == 'victim']
+    # HTTP request duration data, split by noisy/victim role
+    http_duration = df[df['metric_name'] == 'http_req_duration']
+    duration_by_role = metric_groups(df, 'http_req_duration')
+    noisy_data = duration_by_role.get('noisy', http_duration.iloc[:0])
+    victim_data = duration_by_role.get('victim', http_duration.iloc[:0])
+    role_sketches = frame_sketches(http_duration, by='role')
     
     # Create figure with subplots
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     fig.suptitle('Noisy Neighbor Test Results\nBASIC (noisy) vs PLATINUM (victim)', fontsize=14, fontweight='bold')
     
-    # 1. Response Time Over Time
+    # 1. Response Time Over Time (rolling p50-p95 band per role, fixed cost per bucket)
     ax1 = axes[0, 0]
-    if len(noisy_data) > 0:
-        ax1.scatter(noisy_data['datetime'], noisy_data['metric_value'], 
-                   alpha=0.3, s=10, c='red', label='BASIC (noisy)')
-    if len(victim_data) > 0:
-        ax1.scatter(victim_data['datetime'], victim_data['metric_value'], 
-                   alpha=0.5, s=20, c='green', label='PLATINUM (victim)')
+    timeline = build_timeline(df, freq=auto_freq(df), by='role')
+    for role, color, label in (('noisy', 'red', 'BASIC (noisy)'),
+                               ('victim', 'green', 'PLATINUM (victim)')):
+        if role in timeline:
+            series = timeline[role]
+            ax1.fill_between(series.index, series['p50'], series['p95'], color=color, alpha=0.2)
+            ax1.plot(series.index, series['p95'], color=color, linewidth=1.5, label=f'{label} p95')
     ax1.set_xlabel('Time')
     ax1.set_ylabel('Response Time (ms)')
-    ax1.set_title('Response Time Over Time')
+    ax1.set_title(f'Response Time Over Time (rolling {timeline.window * timeline.bucket_seconds:g}s p50-p95)')
     ax1.legend()
     ax1.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
     ax1.tick_params(axis='x', rotation=45)
     ax1.grid(True, alpha=0.3)
     
-    # 2. Response Time Distribution (Box Plot)
+    # 2. Response Time Distribution (Box Plot from latency sketches)
     ax2 = axes[0, 1]
-    data_to_plot = []
-    labels = []
+    box_stats = []
     colors = []
-    if len(noisy_data) > 0:
-        data_to_plot.append(noisy_data['metric_value'].values)
-        labels.append(f'BASIC (noisy)\nn={len(noisy_data)}')
+    if 'noisy' in role_sketches:
+        box_stats.append(role_sketches['noisy'].bxp_stats(f'BASIC (noisy)\nn={len(noisy_data)}'))
         colors.append('red')
-    if len(victim_data) > 0:
-        data_to_plot.append(victim_data['metric_value'].values)
-        labels.append(f'PLATINUM (victim)\nn={len(victim_data)}')
+    if 'victim' in role_sketches:
+        box_stats.append(role_sketches['victim'].bxp_stats(f'PLATINUM (victim)\nn={len(victim_data)}'))
         colors.append('green')
     
-    bp = ax2.boxplot(data_to_plot, labels=labels, patch_artist=True)
+    bp = ax2.bxp(box_stats, patch_artist=True)
     for patch, color in zip(bp['boxes'], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.5)
@@ -85,14 +73,11 @@ def create_visualizations(df):
     
     # 3. Error Rate Comparison
     ax3 = axes[1, 0]
-    http_failed = df[df['metric_name'] == 'http_req_failed'].copy()
-    http_failed['tenant'] = http_failed.apply(extract_tenant, axis=1)
-    
-    noisy_errors = http_failed[http_failed['tenant'] == 'noisy']
-    victim_errors = http_failed[http_failed['tenant'] == 'victim']
+    http_failed = df[df['metric_name'] == 'http_req_failed']
+    error_rates = http_failed.groupby('role', observed=True)['metric_value'].mean() * 100
     
-    noisy_error_rate = noisy_errors['metric_value'].mean() * 100 if len(noisy_errors) > 0 else 0
-    victim_error_rate = victim_errors['metric_value'].mean() * 100 if len(victim_errors) > 0 else 0
+    noisy_error_rate = error_rates.get('noisy', 0)
+    victim_error_rate = error_rates.get('victim', 0)
     
     bars = ax3.bar(['BASIC\n(noisy)', 'PLATINUM\n(victim)'], 
                    [noisy_error_rate, victim_error_rate],
@@ -115,15 +100,15 @@ def create_visualizations(df):
     noisy_stats = {
         'Tenant': 'BASIC (noisy)',
         'Requests': len(noisy_data),
-        'Avg Latency': f"{noisy_data['metric_value'].mean():.0f} ms" if len(noisy_data) > 0 else 'N/A',
-        'P95 Latency': f"{noisy_data['metric_value'].quantile(0.95):.0f} ms" if len(noisy_data) > 0 else 'N/A',
+        'Avg Latency': f"{role_sketches['noisy'].mean:.0f} ms" if 'noisy' in role_sketches else 'N/A',
+        'P95 Latency': f"{role_sketches['noisy'].quantile(0.95):.0f} ms" if 'noisy' in role_sketches else 'N/A',
         'Error Rate': f"{noisy_error_rate:.1f}%",
     }
     victim_stats = {
         'Tenant': 'PLATINUM (victim)',
         'Requests': len(victim_data),
-        'Avg Latency': f"{victim_data['metric_value'].mean():.0f} ms" if len(victim_data) > 0 else 'N/A',
-        'P95 Latency': f"{victim_data['metric_value'].quantile(0.95):.0f} ms" if len(victim_data) > 0 else 'N/A',
+        'Avg Latency': f"{role_sketches['victim'].mean:.0f} ms" if 'victim' in role_sketches else 'N/A',
+        'P95 Latency': f"{role_sketches['victim'].quantile(0.95):.0f} ms" if 'victim' in role_sketches else 'N/A',
         'Error Rate': f"{victim_error_rate:.1f}%",
     }
     
@@ -153,8 +138,8 @@ def create_visualizations(df):
     ax4.set_title('Summary Statistics', pad=20)
     
     plt.tight_layout()
-    plt.savefig('noisy-neighbor-charts.png', dpi=150, bbox_inches='tight')
-    print("✅ Charts saved to: noisy-neighbor-charts.png")
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"✅ Charts saved to: {output_file}")
     plt.show()
 
 def main():
@@ -171,4 +156,5 @@ def main():
     create_visualizations(df)
 
 if __name__ == '__main__':
+    setup_from_argv()
     main()
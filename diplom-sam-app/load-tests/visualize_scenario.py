@@ -0,0 +1,111 @@
+"""
+Spoločný graf pre jeden scenár hlučného suseda (miera obmedzovania a rozdelenie požiadaviek)
+Dáta sa počítajú z k6 výstupu cez analytics.results
+"""
+
+import os
+import sys
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from analytics.profiling import profiled, setup_from_argv
+from analytics.results import DEFAULT_RESULTS_FILE, load_results
+
+# Nastavenie štýlu
+plt.style.use('seaborn-v0_8-whitegrid')
+plt.rcParams['font.size'] = 12
+plt.rcParams['axes.titlesize'] = 14
+plt.rcParams['axes.labelsize'] = 12
+
+# Podnadpis a výstupný súbor podľa scenára
+SCENARIO_CHARTS = {
+    'basic_standard': ('Obmedzovanie podľa úrovne', 'scenario1_basic_standard.png'),
+    'basic_platinum': ('Vyhradený Usage Plan pre PLATINUM', 'scenario2_basic_platinum.png'),
+    'premium_premium': ('Individuálny Usage Plan pre každého nájomcu', 'scenario3_premium_premium.png'),
+}
+
+
+@profiled('scenario chart')
+def create_scenario_chart(result, output_file=None):
+    """Graf miery obmedzovania a rozdelenia požiadaviek pre jeden scenár"""
+    scenario = result.scenario
+    subtitle, default_file = SCENARIO_CHARTS[scenario.key]
+    output_file = output_file or default_file
+
+    # Dáta z testu
+    tenants = [f'{result.noisy.name or scenario.noisy_tier}\n(hlučný)',
+               f'{result.victim.name or scenario.victim_tier}\n(obeť)']
+    throttle_rates = [result.noisy.throttle_rate, result.victim.throttle_rate]
+    throttled = [result.noisy.throttled, result.victim.throttled]
+    successful = [result.noisy.successful, result.victim.successful]
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    fig.suptitle(f'Scenár {scenario.number}: {scenario.noisy_tier} (hlučný) → '
+                 f'{scenario.victim_tier} (obeť)\n{subtitle}',
+                 fontsize=16, fontweight='bold')
+
+    # Graf 1: Miera obmedzovania
+    ax1 = axes[0]
+    colors = ['#e74c3c', '#27ae60']
+    bars = ax1.bar(tenants, throttle_rates, color=colors, edgecolor='black', linewidth=1.5)
+    ax1.set_ylabel('Miera obmedzovania (%)', fontweight='bold')
+    ax1.set_title('Miera obmedzovania požiadaviek', fontweight='bold')
+    ax1.set_ylim(0, 100)
+
+    for bar, rate in zip(bars, throttle_rates):
+        ax1.annotate(f'{rate:.1f}%',
+                    xy=(bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    xytext=(0, 5), textcoords="offset points",
+                    ha='center', va='bottom', fontweight='bold', fontsize=14)
+
+    # Graf 2: Rozdelenie požiadaviek
+    ax2 = axes[1]
+    x = np.arange(len(tenants))
+    width = 0.6
+
+    ax2.bar(x, successful, width, label='Úspešné (200)',
+            color='#27ae60', edgecolor='black')
+    ax2.bar(x, throttled, width, bottom=successful,
+            label='Obmedzené (429)', color='#e74c3c', edgecolor='black')
+
+    ax2.set_ylabel('Počet požiadaviek', fontweight='bold')
+    ax2.set_title('Rozdelenie požiadaviek', fontweight='bold')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(tenants)
+    ax2.legend(loc='upper right')
+
+    # Anotácie
+    for i, (s, t) in enumerate(zip(successful, throttled)):
+        total = s + t
+        ax2.annotate(f'{total}', xy=(i, total + 10), ha='center', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=150, bbox_inches='tight',
+                facecolor='white', edgecolor='none')
+    print(f"Uložené: {output_file}")
+    plt.close()
+
+
+def load_results_from_argv():
+    """Výsledky z k6 súboru zadaného ako argument (predvolene noisy-neighbor-results.json)"""
+    results_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_RESULTS_FILE
+    if not os.path.exists(results_file):
+        print(f"⚠️  {results_file} neexistuje - najprv spustite run-noisy-test.sh")
+        sys.exit(1)
+    return load_results(results_file)
+
+
+def main(scenario_key):
+    results = load_results_from_argv()
+    if scenario_key not in results.scenarios:
+        print(f"⚠️  Scenár {scenario_key} nie je vo výsledkoch")
+        sys.exit(1)
+    create_scenario_chart(results[scenario_key])
+
+
+if __name__ == '__main__':
+    setup_from_argv()
+    results = load_results_from_argv()
+    for result in results:
+        create_scenario_chart(result)
@@ -236,6 +236,7 @@ async function getScopedCredentials(
   const roleArn = `arn:aws:iam::${awsAccountId}:role/authorizer-access-role`;
 
   try {
+    const stsStart = Date.now();
     const assumeRoleResponse = await stsClient.send(
       new AssumeRoleCommand({
         RoleArn: roleArn,
@@ -245,6 +246,8 @@ async function getScopedCredentials(
       }),
     );
 
+    console.log(`[STS LATENCY] ${cacheKey} ${Date.now() - stsStart}ms`);
+
     const credentials = assumeRoleResponse.Credentials;
 
     if (credentials) {
@@ -314,6 +317,7 @@ export const handler = async (
     let userPoolId: string;
     let appClientId: string;
     let apiKey: string;
+    let tenantTier: string | undefined;
 
     // Determine which user pool to validate against
     if (isSaaSProvider(userRole)) {
@@ -332,6 +336,7 @@ export const handler = async (
       userPoolId = tenantDetails.userPoolId || POOLED_USER_POOL_ID;
       appClientId = tenantDetails.appClientId || POOLED_APP_CLIENT_ID;
       apiKey = tenantDetails.apiKey;
+      tenantTier = tenantDetails.tenantTier;
     }
 
     // Verify JWT token
@@ -367,6 +372,10 @@ export const handler = async (
       apiKey,
     };
 
+    if (tenantTier) {
+      context.tenantTier = tenantTier;
+    }
+
     // Add STS credentials if available
     if (credentials) {
       context.accessKeyId = credentials.AccessKeyId!;
@@ -7,10 +7,16 @@ import {
   QueryCommand,
   DynamoDBDocumentClient,
 } from "@aws-sdk/lib-dynamodb";
-import { ddbDocClient } from "./ddb";
+import { ConsumedCapacity } from "@aws-sdk/client-dynamodb";
+import { ddbDocClient, scopedClientTenants } from "./ddb";
 
 type KeyShape = Record<string, string>;
 
+// Per-shard query timings for the load-tests fan-out model (python -m analytics fanout)
+const LOG_SHARD_TIMINGS = process.env.LOG_SHARD_TIMINGS === "true";
+// Per-call consumed RCU/WCU for the load-tests capacity report (python -m analytics capacity)
+const LOG_CONSUMED_CAPACITY = process.env.LOG_CONSUMED_CAPACITY === "true";
+
 export class BaseRepo<TItem extends Record<string, any>> {
   constructor(
     private tableName: string,
@@ -19,6 +25,32 @@ export class BaseRepo<TItem extends Record<string, any>> {
     private toItem: (obj: TItem) => any
   ) {}
 
+  /**
+   * Log the ConsumedCapacity returned by ReturnConsumedCapacity: "TOTAL"
+   */
+  private logCapacity(
+    operation: string,
+    shardId: string | undefined,
+    ddb: DynamoDBDocumentClient,
+    capacity?: ConsumedCapacity,
+  ) {
+    if (!LOG_CONSUMED_CAPACITY || !capacity) return;
+    const tenant = scopedClientTenants.get(ddb);
+    console.log(
+      JSON.stringify({
+        event: "consumed_capacity",
+        table: capacity.TableName ?? this.tableName,
+        operation,
+        shardId: shardId ?? null,
+        tenantId: tenant?.tenantId ?? null,
+        tier: tenant?.tenantTier ?? null,
+        capacityUnits: capacity.CapacityUnits ?? 0,
+        readCapacityUnits: capacity.ReadCapacityUnits ?? null,
+        writeCapacityUnits: capacity.WriteCapacityUnits ?? null,
+      })
+    );
+  }
+
   /**
    * Get item by key using scoped client for tenant isolation
    */
@@ -31,6 +63,7 @@ export class BaseRepo<TItem extends Record<string, any>> {
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("get", key.shardId, ddb, res.ConsumedCapacity);
     return res.Item ? this.fromItem(res.Item) : null;
   }
 
@@ -46,6 +79,7 @@ export class BaseRepo<TItem extends Record<string, any>> {
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("scan", undefined, ddb, res.ConsumedCapacity);
     return (res.Items ?? []).map(this.fromItem);
   }
 
@@ -54,13 +88,15 @@ export class BaseRepo<TItem extends Record<string, any>> {
    */
   async put(item: TItem, client?: DynamoDBDocumentClient) {
     const ddb = client || ddbDocClient;
-    await ddb.send(
+    const raw = this.toItem(item);
+    const res = await ddb.send(
       new PutCommand({
         TableName: this.tableName,
-        Item: this.toItem(item),
+        Item: raw,
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("put", raw?.shardId, ddb, res?.ConsumedCapacity);
     return item;
   }
 
@@ -98,6 +134,7 @@ export class BaseRepo<TItem extends Record<string, any>> {
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("update", key.shardId, ddb, res.ConsumedCapacity);
     return res.Attributes ? this.fromItem(res.Attributes) : null;
   }
 
@@ -114,6 +151,7 @@ export class BaseRepo<TItem extends Record<string, any>> {
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("delete", key.shardId, ddb, res.ConsumedCapacity);
     return res.Attributes ? this.fromItem(res.Attributes) : null;
   }
 
@@ -122,6 +160,7 @@ export class BaseRepo<TItem extends Record<string, any>> {
    */
   async queryByShard(shardId: string, client?: DynamoDBDocumentClient) {
     const ddb = client || ddbDocClient;
+    const start = Date.now();
     const r = await ddb.send(
       new QueryCommand({
         TableName: this.tableName,
@@ -131,6 +170,18 @@ export class BaseRepo<TItem extends Record<string, any>> {
         ReturnConsumedCapacity: "TOTAL",
       })
     );
+    this.logCapacity("query", shardId, ddb, r.ConsumedCapacity);
+    if (LOG_SHARD_TIMINGS) {
+      console.log(
+        JSON.stringify({
+          event: "shard_query",
+          table: this.tableName,
+          shardId,
+          durationMs: Date.now() - start,
+          items: r.Items?.length ?? 0,
+        })
+      );
+    }
     return (r.Items ?? []).map(this.fromItem);
   }
 }
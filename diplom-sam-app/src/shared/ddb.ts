@@ -27,11 +27,20 @@ export interface AuthorizerContext {
   userName: string;
   userPoolId: string;
   apiKey: string;
+  tenantTier?: string;
   accessKeyId?: string;
   secretAccessKey?: string;
   sessionToken?: string;
 }
 
+/**
+ * Tenant of each scoped client, for the consumed capacity log in BaseRepo
+ */
+export const scopedClientTenants = new WeakMap<
+  DynamoDBDocumentClient,
+  { tenantId: string; tenantTier?: string }
+>();
+
 /**
  * Extract authorizer context from Lambda event
  */
@@ -43,6 +52,7 @@ export function getAuthorizerContext(event: any): AuthorizerContext {
     userName: ctx.userName || "unknown",
     userPoolId: ctx.userPoolId || "",
     apiKey: ctx.apiKey || "",
+    tenantTier: ctx.tenantTier,
     accessKeyId: ctx.accessKeyId,
     secretAccessKey: ctx.secretAccessKey,
     sessionToken: ctx.sessionToken,
@@ -73,10 +83,15 @@ export function createScopedDdbClient(event: any): DynamoDBDocumentClient {
         sessionToken: ctx.sessionToken!,
       },
     });
-    return DynamoDBDocumentClient.from(scopedClient, {
+    const client = DynamoDBDocumentClient.from(scopedClient, {
       marshallOptions,
       unmarshallOptions,
     });
+    scopedClientTenants.set(client, {
+      tenantId: ctx.tenantId,
+      tenantTier: ctx.tenantTier,
+    });
+    return client;
   }
 
   // Fallback to default client (for local development or internal calls)